@@ -1,6 +1,9 @@
+import threading
+from typing import Optional
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 import os
 from dotenv import load_dotenv
 
@@ -30,24 +33,50 @@ def _build_db_url() -> str:
         "as a Reference to Postgres → DATABASE_URL."
     )
 
-DATABASE_URL = _build_db_url()
-
-# --- только для отладки ---
-safe = DATABASE_URL
-if "@" in safe:
-    scheme, rest = safe.split("://", 1)
+def _safe_url(url: str) -> str:
+    """URL без логина/пароля — для лога."""
+    if "@" not in url:
+        return url
+    scheme, rest = url.split("://", 1)
     _, host = rest.split("@", 1)
-    safe = f"{scheme}://***:***@{host}"
-print(f"[database] Using {safe}")
-# --- конец отладки ---
+    return f"{scheme}://***:***@{host}"
+
+
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """Движок создаётся при первом обращении к БД, а не при импорте."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                url = _build_db_url()
+                print(f"[database] Using {_safe_url(url)}")
+                if url.startswith("sqlite"):
+                    _engine = create_engine(url, connect_args={"check_same_thread": False}, pool_pre_ping=True)
+                else:
+                    _engine = create_engine(url, pool_pre_ping=True)
+    return _engine
+
+
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
+
+
+def SessionLocal() -> Session:
+    return _session_factory(bind=get_engine())
+
+
+def __getattr__(name: str):
+    # старые импорты `from app.database.database import engine` (скрипты) — тоже лениво
+    if name == "engine":
+        return get_engine()
+    if name == "DATABASE_URL":
+        return _build_db_url()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Движок
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False}, pool_pre_ping=True)
-else:
-    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 def get_db():
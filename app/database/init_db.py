@@ -1 +1,52 @@
-# Пустой файл для инициализации пакета
\ No newline at end of file
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.database.database import Base
+
+
+def add_missing_columns(engine: Engine) -> list:
+    """create_all не меняет существующие таблицы — докидываем новые колонки и индексы.
+
+    Только ADD COLUMN (nullable) и CREATE INDEX IF NOT EXISTS: безопасно
+    повторять на каждом старте и на SQLite, и на Postgres.
+    """
+    insp = inspect(engine)
+    added = []
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not insp.has_table(table.name):
+                continue
+            existing = {c["name"] for c in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name in existing:
+                    continue
+                col_type = col.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {col.name} {col_type}'))
+                added.append(f"{table.name}.{col.name}")
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+    return added
+
+
+def init_db(engine: Engine) -> dict:
+    """Таблицы + недостающие колонки + заполнение производных полей у старых строк."""
+    # модели должны быть импортированы, чтобы попасть в Base.metadata
+    from app.models import bet, bet_type, rollup, sync_failure, sync_state, user  # noqa: F401
+    from app.services.bet_types import backfill_bet_types
+    from app.services.bet_fields import backfill_deleted_flag, backfill_teams, backfill_totals
+
+    Base.metadata.create_all(bind=engine)
+    added = add_missing_columns(engine)
+
+    db = Session(bind=engine)
+    try:
+        backfilled = {
+            "is_deleted": backfill_deleted_flag(db),  # до всего остального: чтения фильтруют по флагу
+            "bet_types": backfill_bet_types(db),
+            "teams": backfill_teams(db),
+            "totals": backfill_totals(db),  # после bet_types: margin зависит от bet_family
+        }
+    finally:
+        db.close()
+    return {"added_columns": added, "backfilled": backfilled}
@@ -10,10 +10,18 @@ class Bet(Base):
     date = Column(DateTime, nullable=True)
     tournament = Column(String, nullable=True)
     match = Column(String, nullable=True)
+    team1 = Column(String, nullable=True, index=True)  # «Команда 1» из Notion
+    team2 = Column(String, nullable=True, index=True)  # «Команда 2» из Notion
     bet_type = Column(String, nullable=True)
+    # нормализованный тип ставки (справочник bet_types) — для индексных фильтров
+    bet_type_id = Column(Integer, nullable=True, index=True)
+    bet_category = Column(Integer, nullable=True, index=True)
+    bet_family = Column(Integer, nullable=True, index=True)
     coefficient = Column(Float, default=1.85)
     total_value = Column(Float, nullable=True)
     score = Column(String, nullable=True)  # Счет матча (например "103-95")
+    total_points = Column(Float, nullable=True, index=True)  # сумма очков из score, считается при синке
+    margin = Column(Float, nullable=True, index=True)  # total_points - total_value (только тоталы матча)
     result = Column(String, nullable=True)  # Текстовый результат из Notion
     won = Column(Boolean, nullable=True)  # Boolean для расчетов
     stake = Column(Float, default=100)  # Сумма ставки (номинал)
@@ -21,34 +29,44 @@ class Bet(Base):
     potential_profit = Column(Float, nullable=True)  # Потенциальный профит из Notion
     is_premium = Column(Boolean, default=False)
     screenshot_url = Column(String, nullable=True)
+    screenshot_image_url = Column(String, nullable=True)  # прямая ссылка на картинку скрина (резолвится после синка)
     time = Column(String, nullable=True)
     match_url = Column(String, nullable=True)  # Ссылка на матч
     season = Column(String, default='2024-2025', nullable=True)  # Сезон
+    is_deleted = Column(Boolean, default=False, index=True)  # страница удалена/в архиве Notion; чтения такие строки пропускают
+    content_hash = Column(String(32), nullable=True)  # хэш полей из Notion — синк пропускает строки без изменений
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
 
-    def calculate_points(self):
-        """Рассчитывает сумму очков из счета игры"""
-        if not self.score or '-' not in self.score:
-            return 0
-            
-        # Убираем OT и 2OT из счета
-        clean_score = self.score.replace(" (OT)", "").replace(" (2OT)", "")
-        
+    @staticmethod
+    def parse_points(score):
+        """Сумма очков из счета ("103-95", "88-88 (OT)"); None, если счет не разобрать"""
+        if not score or '-' not in score:
+            return None
+
+        # Убираем OT, 2OT и любые другие пометки в скобках
+        clean_score = score.split("(", 1)[0]
+
         try:
             # Разбиваем счет на части
             parts = clean_score.split('-')
             if len(parts) != 2:
-                return 0
-                
+                return None
+
             # Преобразуем части в числа и суммируем
             score1 = int(parts[0].strip())
             score2 = int(parts[1].strip())
-            
+
             return score1 + score2
-            
+
         except (ValueError, IndexError):
-            return 0
+            return None
+
+    def calculate_points(self):
+        """Рассчитывает сумму очков из счета игры"""
+        if self.total_points is not None:
+            return int(self.total_points)
+        return self.parse_points(self.score) or 0
 
     def calculate_profit(self):
         """Рассчитывает профит на основе результата и ставки"""
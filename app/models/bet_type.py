@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String
+from app.database.database import Base
+
+class BetType(Base):
+    """Справочник типов ставок: исходная строка из Notion + нормализованные коды."""
+    __tablename__ = "bet_types"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True, nullable=False)  # как в колонке «Ставка»
+    category = Column(Integer, nullable=False, default=0)  # см. CATEGORIES в services/bet_types.py
+    family = Column(Integer, nullable=False, default=0)    # см. FAMILIES там же
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Boolean, Date, Index
+from app.database.database import Base
+
+class BetDailyRollup(Base):
+    """Агрегаты ставок по (season, day, tournament, bet_type, is_premium)."""
+    __tablename__ = "bet_daily_rollup"
+
+    id = Column(Integer, primary_key=True, index=True)
+    season = Column(String, nullable=True)
+    day = Column(Date, nullable=True)  # NULL — ставки без даты
+    tournament = Column(String, nullable=True)
+    bet_type = Column(String, nullable=True)
+    is_premium = Column(Boolean, nullable=True)
+    bets = Column(Integer, default=0)
+    wins = Column(Integer, default=0)
+    losses = Column(Integer, default=0)
+    unknown = Column(Integer, default=0)
+
+    __table_args__ = (
+        Index("ix_bet_daily_rollup_season_day", "season", "day"),
+    )
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.database.database import Base
+from datetime import datetime
+
+class SyncFailure(Base):
+    """Страницы Notion, которые синк не смог записать, — для повтора."""
+    __tablename__ = "sync_failures"
+
+    id = Column(Integer, primary_key=True, index=True)
+    notion_id = Column(String, unique=True, index=True)
+    season = Column(String, nullable=True, index=True)
+    error = Column(String, nullable=True)
+    attempts = Column(Integer, default=1)
+    failed_at = Column(DateTime, default=datetime.utcnow)
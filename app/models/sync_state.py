@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from app.database.database import Base
+
+class SyncState(Base):
+    """Состояние планировщика синка по сезону — общее для всех воркеров."""
+    __tablename__ = "sync_state"
+
+    season = Column(String, primary_key=True)
+    last_mode = Column(String, nullable=True)         # 'full' | 'incremental'
+    last_status = Column(String, nullable=True)       # 'ok' | 'error'
+    last_error = Column(String, nullable=True)
+    last_started_at = Column(DateTime, nullable=True)
+    last_finished_at = Column(DateTime, nullable=True)
+    last_duration = Column(Float, nullable=True)      # секунды
+    last_success_at = Column(DateTime, nullable=True)  # старт последнего удачного синка — отсечка инкремента
+    last_full_at = Column(DateTime, nullable=True)
+    consecutive_failures = Column(Integer, default=0)
+    next_run_at = Column(DateTime, nullable=True)
@@ -0,0 +1,5 @@
+from pydantic import BaseModel
+from typing import List
+
+class ScreenshotBatchRequest(BaseModel):
+    urls: List[str]  # ссылки из screenshot_url ставок (prnt.sc и прямые)
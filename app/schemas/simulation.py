@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Union
+
+class LadderParams(BaseModel):
+    """Правила шкалы bank/nominal; незаданные поля берутся из LADDER_DEFAULTS."""
+    initial_bank: Optional[float] = None
+    initial_nominal: Optional[float] = None
+    nominal_pct: Optional[float] = None
+    min_nominal: Optional[float] = None
+    max_nominal: Optional[float] = None
+    reinvest_share: Optional[float] = None
+    combine_losses: Optional[bool] = None
+    win_multiplier: Optional[float] = None
+
+class SimulateRequest(BaseModel):
+    season: Optional[str] = None
+    params: LadderParams = LadderParams()
+    # сетка: имя параметра → список значений; без неё — один прогон с params
+    grid: Optional[Dict[str, List[Union[bool, float]]]] = None
+    workers: Optional[int] = Field(None, ge=1)  # не больше os.cpu_count() — урезается в sweep
+    top: Optional[int] = Field(20, ge=1, le=1000)
+    sort_by: str = "total_profit"
+
+class MonteCarloRequest(BaseModel):
+    season: Optional[str] = None
+    params: LadderParams = LadderParams()
+    runs: int = 10000
+    seed: Optional[int] = None
+    workers: int = 1
@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Union
+
+class StatsFilter(BaseModel):
+    """Набор фильтров одной карточки — те же поля, что у /api/stats."""
+    start_date: Optional[str] = None   # 'YYYY-MM-DD'
+    end_date: Optional[str] = None     # 'YYYY-MM-DD'
+    start_time: Optional[str] = None   # 'HH:MM'
+    end_time: Optional[str] = None     # 'HH:MM'
+    bet_type: Optional[str] = None
+    bet_category: Optional[str] = None  # 'over' | 'under' | 'other'
+    bet_family: Optional[str] = None    # 'total' | 'half' | 'quarter' | 'team_total' | 'other'
+    is_premium: Optional[bool] = None
+    result: Optional[str] = None       # 'WIN' | 'LOSE' | 'all'
+    month: Optional[str] = None        # 'YYYY-MM'
+    season: Optional[str] = None       # по умолчанию — season запроса
+    tournaments: Optional[Union[str, List[str]]] = None  # список или строка через запятую
+
+    def tournament_list(self) -> List[str]:
+        if not self.tournaments:
+            return []
+        items = self.tournaments.split(',') if isinstance(self.tournaments, str) else self.tournaments
+        return [t.strip() for t in items if t and t.strip()]
+
+STATS_BATCH_MAX = 50  # карточек на запрос
+
+class StatsBatchRequest(BaseModel):
+    season: Optional[str] = None
+    filters: List[StatsFilter] = Field(..., max_length=STATS_BATCH_MAX)
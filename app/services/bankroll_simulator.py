@@ -0,0 +1,117 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.services.profit_calculator import LADDER_DEFAULTS
+from app.services.vectorized_profit_calculator import VectorizedProfitCalculator, NAT
+
+MAX_GRID_SIZE = 100_000
+INLINE_GRID_SIZE = 64  # меньшие сетки считаем без пула процессов — запуск пула дороже
+SORT_KEYS = ("total_profit", "roi", "final_bank", "max_drawdown")
+
+
+def cast_param(key: str, value: Any) -> Any:
+    """Приводит значение параметра шкалы к типу его значения по умолчанию."""
+    if key not in LADDER_DEFAULTS:
+        raise ValueError(f"Unknown ladder param: {key}")
+    default = LADDER_DEFAULTS[key]
+    if isinstance(default, bool):
+        return bool(value)
+    value = float(value)
+    if isinstance(default, int) and value.is_integer():
+        return int(value)
+    return value
+
+
+def expand_grid(grid: Dict[str, List[Any]], base: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Декартово произведение значений сетки поверх базовых параметров."""
+    base = {k: cast_param(k, v) for k, v in (base or {}).items()}
+    keys = list(grid)
+    values = [[cast_param(k, v) for v in grid[k]] for k in keys]
+    size = int(np.prod([len(v) for v in values])) if values else 1
+    if size > MAX_GRID_SIZE:
+        raise ValueError(f"Grid too large: {size} combinations (max {MAX_GRID_SIZE})")
+    return [{**base, **dict(zip(keys, combo))} for combo in itertools.product(*values)]
+
+
+def summarize(params: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+    """Итог прогона шкалы: профит, ROI, финальный банк/номинал и просадка по периодам."""
+    profits = np.array([p["profit"] for p in result["periods"]], dtype=np.float64)
+    equity = np.concatenate([[0.0], np.cumsum(profits)])
+    max_drawdown = float((np.maximum.accumulate(equity) - equity).max())
+    staked = result["total_staked"]
+    return {
+        "params": params,
+        "total_profit": result["total_profit"],
+        "total_staked": staked,
+        "roi": round(result["total_profit"] / staked * 100, 2) if staked else 0.0,
+        "final_bank": result["current_bank"],
+        "final_nominal": result["current_nominal"],
+        "max_drawdown": round(max_drawdown, 2),
+    }
+
+
+def _run_chunk(counts, param_sets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Воркер пула: прогоняет кусок сетки на одних и тех же счётчиках периодов."""
+    simulator = BankrollSimulator(counts)
+    return [summarize(params, simulator.run(params)) for params in param_sets]
+
+
+class BankrollSimulator:
+    """Шкала bank/nominal с параметрами вызывающего на компактном представлении сезона.
+
+    Шкала зависит только от числа ставок/побед/поражений в каждом периоде, поэтому
+    сезон сворачивается в несколько коротких массивов (period_counts), которые
+    дёшево передавать в процессы пула при переборе сетки параметров.
+    """
+
+    def __init__(self, counts):
+        self.counts = counts  # None — в сезоне нет ставок с датой
+
+    @classmethod
+    def from_arrays(cls, ts: np.ndarray, outcome: np.ndarray) -> "BankrollSimulator":
+        if not (ts != NAT).any():
+            return cls(None)
+        return cls(VectorizedProfitCalculator().period_counts(ts, outcome))
+
+    @classmethod
+    def from_frame(cls, frame) -> "BankrollSimulator":
+        return cls.from_arrays(frame.ts, frame.outcome)
+
+    def run(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Один прогон шкалы — тот же ответ, что и у calculate_total_profit."""
+        calculator = VectorizedProfitCalculator(**(params or {}))
+        if self.counts is None:
+            return calculator.calculate_total_profit([])
+        return calculator.run_ladder(*self.counts)
+
+    def sweep(
+        self,
+        grid: Dict[str, List[Any]],
+        base: Optional[Dict[str, Any]] = None,
+        workers: Optional[int] = None,
+        top: Optional[int] = None,
+        sort_by: str = "total_profit",
+    ) -> List[Dict[str, Any]]:
+        """Перебор сетки параметров; большие сетки делятся между процессами."""
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort_by}")
+        param_sets = expand_grid(grid, base)
+        cpus = os.cpu_count() or 1
+        workers = max(1, min(workers or cpus, cpus))
+
+        if workers <= 1 or len(param_sets) <= INLINE_GRID_SIZE:
+            results = _run_chunk(self.counts, param_sets)
+        else:
+            n_chunks = min(len(param_sets), workers * 4)
+            chunks = [param_sets[i::n_chunks] for i in range(n_chunks)]
+            results = []
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for part in pool.map(_run_chunk, itertools.repeat(self.counts), chunks):
+                    results.extend(part)
+
+        results.sort(key=lambda r: r[sort_by], reverse=(sort_by != "max_drawdown"))
+        return results[:top] if top else results
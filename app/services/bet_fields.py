@@ -0,0 +1,109 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.bet import Bet
+from app.services.bet_types import FAMILY_CODES
+
+MATCH_SEPARATOR = " vs "
+
+# не входят в хэш содержимого: служебные колонки, bet_type_id — суррогатный
+# ключ справочника, своё значение в каждой базе (сам bet_type в хэше есть),
+# и screenshot_image_url — не из Notion, заполняется после синка
+_UNHASHED = ("updated_at", "created_at", "content_hash", "bet_type_id", "screenshot_image_url")
+
+
+def split_match(match: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """«A vs B» → ("A", "B"); синк собирает match именно так."""
+    if not match or MATCH_SEPARATOR not in match:
+        return None, None
+    team1, team2 = match.split(MATCH_SEPARATOR, 1)
+    return team1.strip() or None, team2.strip() or None
+
+
+def backfill_teams(db: Session, batch_size: int = 1000) -> int:
+    """team1/team2 для старых строк — из match. Коммитит."""
+    updated = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.query(Bet.id, Bet.match)
+            .filter(Bet.id > last_id, Bet.team1 == None, Bet.match.contains(MATCH_SEPARATOR))
+            .order_by(Bet.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        mappings = []
+        for bet_id, match in rows:
+            team1, team2 = split_match(match)
+            mappings.append({"id": bet_id, "team1": team1, "team2": team2})
+        db.bulk_update_mappings(Bet, mappings)
+        db.commit()
+        updated += len(mappings)
+        last_id = rows[-1].id
+    return updated
+
+
+def line_margin(total_points: Optional[float], total_value: Optional[float], bet_family: Optional[int]) -> Optional[float]:
+    """Отклонение итогового тотала от линии: > 0 — матч ушёл выше линии.
+
+    Считаем только для тоталов матча: для индивидуальных тоталов и тоталов
+    половин «Итог» (счёт матча) с линией не сравним.
+    """
+    if total_points is None or total_value is None or bet_family != FAMILY_CODES["total"]:
+        return None
+    return round(total_points - total_value, 2)
+
+
+def backfill_totals(db: Session, batch_size: int = 1000) -> int:
+    """total_points/margin для строк, где их ещё не считали. Коммитит."""
+    updated = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.query(Bet.id, Bet.score, Bet.total_value, Bet.bet_family)
+            .filter(Bet.id > last_id, Bet.total_points == None, Bet.score != None)
+            .order_by(Bet.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        mappings = []
+        for bet_id, score, total_value, bet_family in rows:
+            points = Bet.parse_points(score)
+            if points is None:
+                continue
+            mappings.append({
+                "id": bet_id,
+                "total_points": points,
+                "margin": line_margin(points, total_value, bet_family),
+            })
+        if mappings:
+            db.bulk_update_mappings(Bet, mappings)
+            db.commit()
+        updated += len(mappings)
+        last_id = rows[-1].id
+    return updated
+
+
+def backfill_deleted_flag(db: Session) -> int:
+    """is_deleted = false у строк, где колонку только что добавили (NULL). Коммитит."""
+    updated = db.query(Bet).filter(Bet.is_deleted == None).update(
+        {Bet.is_deleted: False}, synchronize_session=False
+    )
+    db.commit()
+    return updated
+
+
+def content_hash(values: Dict[str, Any]) -> str:
+    """Хэш значений колонок ставки (без служебных) — для пропуска неизменённых строк при синке."""
+    payload = json.dumps(
+        [(k, values[k]) for k in sorted(values) if k not in _UNHASHED],
+        default=str, ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
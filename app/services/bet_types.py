@@ -0,0 +1,135 @@
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.bet import Bet
+from app.models.bet_type import BetType
+
+# Коды нормализованного типа ставки (хранятся в bets.bet_category / bets.bet_family)
+CATEGORIES = {0: "other", 1: "over", 2: "under"}
+FAMILIES = {0: "other", 1: "total", 2: "half", 3: "quarter", 4: "team_total"}
+CATEGORY_CODES = {v: k for k, v in CATEGORIES.items()}
+FAMILY_CODES = {v: k for k, v in FAMILIES.items()}
+
+
+def classify(name: Optional[str]) -> Tuple[int, int]:
+    """Строка «Ставка» → (category, family).
+
+    ТБ/ИТБ — больше, ТМ/ИТМ — меньше; «И…» — индивидуальный тотал,
+    «половина»/«четверть» в названии — тотал части матча.
+    """
+    if not name:
+        return 0, 0
+    text = name.strip().upper()
+    head = text.split()[0] if text.split() else ""
+
+    if head.endswith("ТБ") or "БОЛЬШЕ" in text:
+        category = 1
+    elif head.endswith("ТМ") or "МЕНЬШЕ" in text:
+        category = 2
+    else:
+        category = 0
+
+    if head.startswith("ИТ") or "ИНДИВИД" in text:
+        family = 4
+    elif "ПОЛОВИН" in text:
+        family = 2
+    elif "ЧЕТВЕРТ" in text:
+        family = 3
+    elif category:
+        family = 1
+    else:
+        family = 0
+    return category, family
+
+
+def parse_code(value: Optional[str], codes: Dict[str, int], what: str) -> Optional[int]:
+    """'over' / '1' → код; None/'all' → без фильтра. Неизвестное значение — ValueError."""
+    if value is None or value == "all":
+        return None
+    if value.isdigit() and int(value) in codes.values():
+        return int(value)
+    if value in codes:
+        return codes[value]
+    raise ValueError(f"unknown {what} '{value}', expected one of: {', '.join(codes)}")
+
+
+class BetTypeResolver:
+    """Строка типа ставки → строка справочника (создаётся при первом появлении).
+
+    Кэш живёт в пределах одного синка/сессии: id новых строк видны только
+    после flush, а откат транзакции не должен оставлять «висящих» id в процессе.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._cache: Dict[str, Tuple[int, int, int]] = {}
+
+    def resolve(self, name: Optional[str]) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+        if not name:
+            return None, None, None
+        hit = self._cache.get(name)
+        if hit is not None:
+            return hit
+
+        row = self.db.query(BetType).filter(BetType.name == name).first()
+        if row is None:
+            category, family = classify(name)
+            row = BetType(name=name, category=category, family=family)
+            self.db.add(row)
+            self.db.flush()
+        hit = self._cache[name] = (row.id, row.category, row.family)
+        return hit
+
+
+def backfill_bet_types(db: Session) -> int:
+    """Проставляет bet_type_id/category/family ставкам, у которых их ещё нет. Коммитит."""
+    names = [r[0] for r in db.query(Bet.bet_type)
+             .filter(Bet.bet_type != None, Bet.bet_type_id == None).distinct().all()]
+    if not names:
+        return 0
+    resolver = BetTypeResolver(db)
+    updated = 0
+    for name in names:
+        type_id, category, family = resolver.resolve(name)
+        updated += db.query(Bet).filter(Bet.bet_type == name, Bet.bet_type_id == None).update(
+            {Bet.bet_type_id: type_id, Bet.bet_category: category, Bet.bet_family: family},
+            synchronize_session=False,
+        )
+    db.commit()
+    return updated
+
+
+def matching_bet_types(
+    db: Session,
+    bet_type: Optional[str] = None,
+    category: Optional[int] = None,
+    family: Optional[int] = None,
+) -> Optional[List[BetType]]:
+    """Строки справочника под фильтры /api/stats; None — фильтра по типу нет.
+
+    Подстрока bet_type ищется по маленькому справочнику, а по bets дальше
+    идёт равенство/IN по индексированному bet_type_id.
+    """
+    if not (bet_type and bet_type != 'all') and category is None and family is None:
+        return None
+    q = db.query(BetType)
+    if bet_type and bet_type != 'all':
+        q = q.filter(BetType.name.contains(bet_type))
+    if category is not None:
+        q = q.filter(BetType.category == category)
+    if family is not None:
+        q = q.filter(BetType.family == family)
+    return q.all()
+
+
+def list_bet_types(db: Session) -> List[Dict]:
+    return [
+        {
+            "id": r.id,
+            "name": r.name,
+            "category": CATEGORIES.get(r.category, "other"),
+            "family": FAMILIES.get(r.family, "other"),
+        }
+        for r in db.query(BetType).order_by(BetType.name).all()
+    ]
@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Integer, DateTime, Float, case, cast, column, extract, func, literal, select, union_all, values
+from sqlalchemy.orm import Session
+
+from app.models.bet import Bet
+
+BREAKDOWN_FIELDS = ("tournament", "bet_type", "is_premium", "weekday", "hour")
+WEEKDAYS = ("Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс")
+
+
+def _group_expr(db: Session, by: str):
+    """Выражение группировки; день недели и час — через функции конкретной СУБД."""
+    if by == "tournament":
+        return Bet.tournament
+    if by == "bet_type":
+        return Bet.bet_type
+    if by == "is_premium":
+        return Bet.is_premium
+
+    sqlite = db.get_bind().dialect.name == "sqlite"
+    if by == "weekday":  # 0 = воскресенье и в SQLite, и в Postgres
+        return cast(func.strftime("%w", Bet.date), Integer) if sqlite else cast(extract("dow", Bet.date), Integer)
+    if by == "hour":
+        return cast(func.strftime("%H", Bet.date), Integer) if sqlite else cast(extract("hour", Bet.date), Integer)
+    raise ValueError(f"by must be one of: {', '.join(BREAKDOWN_FIELDS)}")
+
+
+def _label(by: str, key):
+    if key is None:
+        return None
+    if by == "weekday":
+        return WEEKDAYS[(int(key) + 6) % 7]  # 0 (вс) → «Вс», 1 (пн) → «Пн»
+    if by == "hour":
+        return int(key)
+    return key
+
+
+class BreakdownService:
+    """Разбивка метрик сезона по одному измерению за один GROUP BY.
+
+    Ставки соединяются с таблицей периодов сезонной шкалы (VALUES-CTE
+    start/end/nominal), так что ставка каждой строки — nominal её периода,
+    как в /api/stats. Ставки вне периодов идут по начальному номиналу.
+    """
+
+    def __init__(self, calculator):
+        self.calculator = calculator
+
+    def _periods(self, season_profit: Dict[str, Any]):
+        """VALUES-CTE периодов сезонной шкалы или None, если периодов нет."""
+        season_periods = season_profit.get("periods", [])
+        if not season_periods:
+            return None
+        return values(
+            column("p_start", DateTime), column("p_end", DateTime), column("nominal", Float),
+            name="periods",
+        ).data([
+            (
+                datetime.strptime(p["start"], "%Y-%m-%d"),
+                datetime.strptime(p["end"], "%Y-%m-%d") + timedelta(hours=23, minutes=59, seconds=59),
+                float(p["nominal"]),
+            )
+            for p in season_periods
+        ]).cte("periods")
+
+    def _grouped(self, db: Session, source, key, season_profit: Dict[str, Any]):
+        """GROUP BY key по source (таблица или подзапрос с date/won) с join к периодам."""
+        periods = self._periods(season_profit)
+        if periods is not None:
+            stake = func.coalesce(periods.c.nominal, float(self.calculator.initial_nominal))
+        else:
+            stake = literal(float(self.calculator.initial_nominal))
+
+        query = db.query(
+            key,
+            func.count().label("bets"),
+            func.sum(case((source.c.won == True, 1), else_=0)).label("wins"),
+            func.sum(case((source.c.won == False, 1), else_=0)).label("losses"),
+            func.sum(case((source.c.won == True, stake), else_=0.0)).label("win_stakes"),
+            func.sum(case((source.c.won == False, stake), else_=0.0)).label("loss_stakes"),
+            func.sum(stake).label("staked"),
+        ).select_from(source)
+        if periods is not None:
+            query = query.outerjoin(
+                periods, (source.c.date >= periods.c.p_start) & (source.c.date <= periods.c.p_end)
+            )
+        return query.group_by(key)
+
+    def _group_row(self, key, r) -> Dict[str, Any]:
+        n = int(r.bets or 0)
+        wins = int(r.wins or 0)
+        staked = float(r.staked or 0.0)
+        profit = float(r.win_stakes or 0.0) * self.calculator.win_multiplier - float(r.loss_stakes or 0.0)
+        return {
+            "key": key,
+            "bets": n,
+            "wins": wins,
+            "losses": int(r.losses or 0),
+            "winRate": round(wins / n * 100, 1) if n else 0.0,
+            "profit": round(profit, 2),
+            "staked": round(staked, 2),
+            "roi": round(profit / staked * 100, 1) if staked > 0 else 0.0,
+        }
+
+    def breakdown(self, db: Session, season: Optional[str], by: str, season_profit: Dict[str, Any]) -> Dict[str, Any]:
+        key = _group_expr(db, by).label("key")
+        query = self._grouped(db, Bet.__table__, key, season_profit).filter(Bet.is_deleted == False)
+        if season:
+            query = query.filter(Bet.season == season)
+        rows = query.all()
+
+        if by == "weekday":
+            rows.sort(key=lambda r: (r.key is None, (int(r.key) + 6) % 7 if r.key is not None else 0))
+        elif by == "hour":
+            rows.sort(key=lambda r: (r.key is None, r.key or 0))
+        else:
+            rows.sort(key=lambda r: -int(r.bets or 0))
+
+        groups: List[Dict[str, Any]] = [self._group_row(_label(by, r.key), r) for r in rows]
+        return {"season": season, "by": by, "groups": groups}
+
+    def teams(self, db: Session, season: Optional[str], season_profit: Dict[str, Any],
+              tournament: Optional[str] = None) -> Dict[str, Any]:
+        """Метрики по командам: ставка считается за обе команды матча (UNION ALL team1/team2)."""
+        sides = []
+        for team_col in (Bet.team1, Bet.team2):
+            q = select(team_col.label("team"), Bet.date.label("date"), Bet.won.label("won")).where(
+                team_col != None, Bet.is_deleted == False
+            )
+            if season:
+                q = q.where(Bet.season == season)
+            if tournament:
+                q = q.where(Bet.tournament == tournament)
+            sides.append(q)
+        source = union_all(*sides).subquery("sides")
+
+        rows = self._grouped(db, source, source.c.team.label("key"), season_profit).all()
+        rows.sort(key=lambda r: (-int(r.bets or 0), r.key))
+        return {
+            "season": season,
+            "tournament": tournament,
+            "teams": [self._group_row(r.key, r) for r in rows],
+        }
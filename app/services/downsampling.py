@@ -0,0 +1,46 @@
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: индексы n_out точек, сохраняющих форму кривой."""
+    n = x.size
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)  # границы n_out-2 внутренних корзин
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # среднее следующей корзины (для последней — последняя точка)
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < edges.size else (n - 1, n)
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def minmax_buckets(y: np.ndarray, n_out: int) -> np.ndarray:
+    """По минимуму и максимуму в каждой корзине — экстремумы (пики, дно просадки) не теряются."""
+    n = y.size
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    n_buckets = (n_out - 2) // 2
+    edges = np.linspace(1, n - 1, n_buckets + 1).astype(np.int64)
+    picked = [0, n - 1]
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi <= lo:
+            continue
+        chunk = y[lo:hi]
+        picked.append(lo + int(chunk.argmin()))
+        picked.append(lo + int(chunk.argmax()))
+    return np.unique(np.array(picked, dtype=np.int64))
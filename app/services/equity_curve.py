@@ -0,0 +1,63 @@
+from typing import Any, Dict
+
+import numpy as np
+
+from app.services.downsampling import lttb, minmax_buckets
+from app.services.vectorized_profit_calculator import NAT, WIN, LOSS
+
+
+def equity_curve(frame, points: int = 500, method: str = "lttb") -> Dict[str, Any]:
+    """Кривая профита/банка сезона по ставкам с прореживанием под график.
+
+    Ставка каждой позиции — сезонный nominal её периода (как в /api/stats),
+    bank — банк периода из сезонной шкалы. Пик и просадка считаются
+    накопительными проходами по тем же массивам, затем серия прореживается
+    до points точек (LTTB или min/max по корзинам).
+    """
+    if method not in ("lttb", "minmax"):
+        raise ValueError("method must be 'lttb' or 'minmax'")
+
+    season_profit = frame.season_profit()
+    calc = frame.calculator
+
+    dated = frame.ts != NAT
+    order = np.argsort(frame.ts[dated], kind="stable")
+    ts = frame.ts[dated][order]
+    outcome = frame.outcome[dated][order]
+
+    ps, pe, nominal = calc.period_table(season_profit)
+    bank_per = np.array([p["bank"] for p in season_profit.get("periods", [])], dtype=np.float64)
+    j = calc.locate(ts, ps, pe)
+    in_period = j >= 0
+    jc = np.clip(j, 0, None)
+
+    stake = np.where(in_period, nominal[jc] if nominal.size else 0.0, float(calc.initial_nominal))
+    pnl = np.where(outcome == WIN, stake * calc.win_multiplier, np.where(outcome == LOSS, -stake, 0.0))
+    profit = np.cumsum(pnl)
+    peak = np.maximum(np.maximum.accumulate(profit), 0.0) if profit.size else profit
+    drawdown = peak - profit
+    bank = np.where(in_period, bank_per[jc] if bank_per.size else 0.0, float(calc.initial_bank))
+
+    if method == "lttb":
+        idx = lttb(ts, profit, points)
+    else:
+        idx = minmax_buckets(profit, points)
+
+    return {
+        "bets": int(ts.size),
+        "method": method,
+        "points": int(idx.size),
+        "summary": {
+            "total_profit": round(float(profit[-1]), 2) if profit.size else 0.0,
+            "peak_profit": round(float(peak.max()), 2) if peak.size else 0.0,
+            "max_drawdown": round(float(drawdown.max()), 2) if drawdown.size else 0.0,
+            "current_bank": season_profit.get("current_bank", calc.initial_bank),
+            "current_nominal": season_profit.get("current_nominal", calc.initial_nominal),
+        },
+        # колонками и с временем в мс — так ответ остаётся в пределах нескольких КБ
+        "t": (ts[idx] // 1000).tolist(),
+        "profit": np.round(profit[idx], 2).tolist(),
+        "bank": np.round(bank[idx], 2).tolist(),
+        "peak": np.round(peak[idx], 2).tolist(),
+        "drawdown": np.round(drawdown[idx], 2).tolist(),
+    }
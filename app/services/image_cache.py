@@ -0,0 +1,215 @@
+# app/services/image_cache.py
+"""Дисковый кэш картинок скринов для /api/screenshot?image=true.
+
+Включается SCREENSHOT_IMAGE_CACHE_DIR. Ключ — sha256 ссылки из запроса
+(страница prnt.sc или прямая картинка), поэтому повторный просмотр не ходит
+наружу ни за страницей, ни за картинкой. Файлы: <dir>/<ключ[:2]>/<ключ>
+(байты) и <ключ>.json (url, тип, размер, ETag). Общий размер ограничен
+SCREENSHOT_IMAGE_CACHE_BYTES, вытесняются давно не читанные (LRU).
+Скачиваются только http(s)-ссылки на prnt.sc и хосты картинок из
+SCREENSHOT_IMAGE_HOSTS — сервер не ходит по произвольным адресам из запроса.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Optional
+
+from app.services.screenshot_resolver import PAGE_HOSTS, host_in
+
+if TYPE_CHECKING:
+    import httpx
+
+IMAGE_CACHE_DIR = os.getenv("SCREENSHOT_IMAGE_CACHE_DIR", "")  # пусто — режим выключен
+IMAGE_CACHE_BYTES = int(os.getenv("SCREENSHOT_IMAGE_CACHE_BYTES", str(512 * 1024 * 1024)))
+IMAGE_MAX_BYTES = int(os.getenv("SCREENSHOT_IMAGE_MAX_BYTES", str(10 * 1024 * 1024)))  # больше — не кэшируем
+CACHE_CONTROL = "public, max-age=31536000, immutable"  # картинка по ссылке скрина не меняется
+# хосты, на которые ведут картинки со страниц prnt.sc (и прямые ссылки в базе)
+IMAGE_HOSTS = tuple(h.strip().lower() for h in os.getenv(
+    "SCREENSHOT_IMAGE_HOSTS", "image.prntscr.com,img.prnt.sc,i.imgur.com").split(",") if h.strip())
+
+
+@dataclass
+class CachedImage:
+    path: str
+    content_type: str
+    size: int
+    etag: str
+
+
+def is_allowed_source(url: str, hosts=PAGE_HOSTS + IMAGE_HOSTS) -> bool:
+    """http(s)-ссылка на страницу prnt.sc или известный хост картинок (или их поддомен)."""
+    return host_in(url, hosts)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match (список тегов через запятую, W/ или *) против нашего ETag."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def cache_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class ImageCache:
+    def __init__(self, directory: str = IMAGE_CACHE_DIR, max_bytes: int = IMAGE_CACHE_BYTES,
+                 max_image: int = IMAGE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_image = max_image
+        self._entries: "OrderedDict[str, CachedImage]" = OrderedDict()  # от давно читанных к свежим
+        self._total = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0, "errors": 0}
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _paths(self, key: str):
+        base = os.path.join(self.directory, key[:2], key)
+        return base, base + ".json"
+
+    def _load(self) -> None:
+        """Индекс с диска; порядок LRU после рестарта — по времени записи."""
+        found = []
+        for sub in os.listdir(self.directory):
+            subdir = os.path.join(self.directory, sub)
+            if not os.path.isdir(subdir):
+                continue
+            for name in os.listdir(subdir):
+                if not name.endswith(".json"):
+                    continue
+                key = name[:-5]
+                path, meta_path = self._paths(key)
+                try:
+                    with open(meta_path, encoding="utf-8") as f:
+                        meta = json.load(f)
+                    found.append((os.path.getmtime(path), key, CachedImage(path, meta["content_type"], meta["size"], meta["etag"])))
+                except (OSError, ValueError, KeyError):
+                    self._remove_files(key)  # недописанная пара — удаляем
+        for _, key, entry in sorted(found, key=lambda item: item[0]):
+            self._entries[key] = entry
+            self._total += entry.size
+        self._evict()
+
+    def get(self, url: str) -> Optional[CachedImage]:
+        key = cache_key(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None and not os.path.exists(entry.path):
+            self._drop(key)
+            return None
+        return entry
+
+    async def get_or_fetch(self, url: str, image_url: str, client: "httpx.AsyncClient") -> Optional[CachedImage]:
+        """Картинка из кэша или скачанная image_url (один download на ключ одновременно)."""
+        entry = self.get(url)
+        if entry is not None:
+            self.stats["hits"] += 1
+            return entry
+        self.stats["misses"] += 1
+        key = cache_key(url)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            entry = await self._download(url, key, image_url, client)
+            future.set_result(entry)
+            return entry
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            if future.done() and not future.cancelled():
+                future.exception()
+
+    async def _download(self, url: str, key: str, image_url: str, client: "httpx.AsyncClient") -> Optional[CachedImage]:
+        import httpx
+
+        path, meta_path = self._paths(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        digest = hashlib.blake2b(digest_size=16)
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                # без редиректов: иначе разрешённый хост мог бы увести запрос куда угодно
+                async with client.stream("GET", image_url, follow_redirects=False) as response:
+                    content_type = response.headers.get("content-type", "").split(";")[0].strip()
+                    if response.status_code != 200 or not content_type.startswith("image/"):
+                        self.stats["errors"] += 1
+                        return None
+                    async for chunk in response.aiter_bytes():
+                        size += len(chunk)
+                        if size > self.max_image:
+                            self.stats["errors"] += 1
+                            return None
+                        digest.update(chunk)
+                        f.write(chunk)
+            entry = CachedImage(path, content_type, size, f'"{digest.hexdigest()}"')
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"url": url, "image_url": image_url, "content_type": content_type,
+                           "size": size, "etag": entry.etag}, f)
+            os.replace(tmp, path)
+            tmp = None
+        except httpx.HTTPError as e:
+            print(f"Error fetching screenshot image: {e}")
+            self.stats["errors"] += 1
+            return None
+        finally:
+            if tmp is not None and os.path.exists(tmp):
+                os.remove(tmp)
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            self._total += size - (old.size if old else 0)
+            self._entries[key] = entry
+        self._evict()
+        return entry
+
+    def _evict(self) -> None:
+        while True:
+            with self._lock:
+                if self._total <= self.max_bytes or len(self._entries) <= 1:
+                    return
+                key, entry = self._entries.popitem(last=False)
+                self._total -= entry.size
+            self._remove_files(key)
+            self.stats["evicted"] += 1
+
+    def _drop(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._total -= entry.size
+        self._remove_files(key)
+
+    def _remove_files(self, key: str) -> None:
+        for p in self._paths(key):
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {"files": len(self._entries), "bytes": self._total, "max_bytes": self.max_bytes, **self.stats}
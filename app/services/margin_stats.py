@@ -0,0 +1,103 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Integer, case, cast, func
+from sqlalchemy.orm import Session
+
+from app.models.bet import Bet
+
+
+def _floor(db: Session, expr):
+    """floor() для SQLite без math-функций: CAST там отбрасывает дробную часть."""
+    if db.get_bind().dialect.name != "sqlite":
+        return func.floor(expr)
+    truncated = cast(expr, Integer)
+    return case((expr < truncated, truncated - 1), else_=truncated)
+
+
+def margin_stats(
+    db: Session,
+    season: Optional[str] = None,
+    tournament: Optional[str] = None,
+    bet_category: Optional[int] = None,
+    width: float = 5.0,
+    line_width: float = 5.0,
+) -> Dict[str, Any]:
+    """Гистограмма margin (очки матча минус линия) и попадания по корзинам линии.
+
+    Обе таблицы — GROUP BY в SQL по сохранённым total_points/margin
+    (считаются при синке), без разбора счёта в Python.
+    """
+    filters = [Bet.margin != None, Bet.is_deleted == False]
+    if season:
+        filters.append(Bet.season == season)
+    if tournament:
+        filters.append(Bet.tournament == tournament)
+    if bet_category is not None:
+        filters.append(Bet.bet_category == bet_category)
+
+    wins = func.sum(case((Bet.won == True, 1), else_=0))
+    losses = func.sum(case((Bet.won == False, 1), else_=0))
+
+    bucket = _floor(db, Bet.margin / width).label("bucket")
+    hist_rows = (
+        db.query(bucket, func.count().label("bets"), wins.label("wins"), losses.label("losses"))
+        .filter(*filters)
+        .group_by(bucket)
+        .order_by(bucket)
+        .all()
+    )
+    histogram: List[Dict[str, Any]] = [
+        {
+            "from": round(int(r.bucket) * width, 2),
+            "to": round((int(r.bucket) + 1) * width, 2),
+            "bets": int(r.bets),
+            "wins": int(r.wins or 0),
+            "losses": int(r.losses or 0),
+        }
+        for r in hist_rows
+    ]
+
+    line = _floor(db, Bet.total_value / line_width).label("line")
+    line_rows = (
+        db.query(
+            line,
+            func.count().label("bets"),
+            func.sum(case((Bet.margin > 0, 1), else_=0)).label("overs"),
+            func.sum(case((Bet.margin < 0, 1), else_=0)).label("unders"),
+            func.sum(case((Bet.margin == 0, 1), else_=0)).label("pushes"),
+            wins.label("wins"),
+            losses.label("losses"),
+            func.avg(Bet.margin).label("avg_margin"),
+        )
+        .filter(*filters)
+        .group_by(line)
+        .order_by(line)
+        .all()
+    )
+    lines: List[Dict[str, Any]] = []
+    for r in line_rows:
+        n = int(r.bets)
+        w = int(r.wins or 0)
+        l = int(r.losses or 0)
+        lines.append({
+            "from": round(int(r.line) * line_width, 2),
+            "to": round((int(r.line) + 1) * line_width, 2),
+            "bets": n,
+            "overs": int(r.overs or 0),
+            "unders": int(r.unders or 0),
+            "pushes": int(r.pushes or 0),
+            "overRate": round(int(r.overs or 0) / n * 100, 1) if n else 0.0,
+            "wins": w,
+            "losses": l,
+            "winRate": round(w / (w + l) * 100, 1) if (w + l) else 0.0,
+            "avgMargin": round(float(r.avg_margin or 0.0), 2),
+        })
+
+    return {
+        "season": season,
+        "bets": sum(h["bets"] for h in histogram),
+        "width": width,
+        "lineWidth": line_width,
+        "histogram": histogram,
+        "lines": lines,
+    }
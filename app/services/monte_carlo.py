@@ -0,0 +1,199 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.services.vectorized_profit_calculator import (
+    VectorizedProfitCalculator, NAT, WIN, LOSS, UNKNOWN, from_us,
+)
+
+_US_PER_DAY = 86_400 * 1_000_000
+MAX_RUNS = 200_000
+CHUNK_CELLS = 4_000_000  # ~runs*bets за один проход: держит пиковую память в пределах сотни МБ
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+class MonteCarloSimulator:
+    """Бутстрэп исходов сезона блоками по дням + шкала bank/nominal.
+
+    Каждый прогон — последовательность случайных (с возвращением) дней сезона,
+    обрезанная до числа ставок сезона. Позиция ставки в сезоне сохраняет свой
+    период, поэтому границы периодов и пересчёт номинала те же, что у
+    ProfitCalculator. Все прогоны считаются массивами формы (runs, bets).
+    """
+
+    def __init__(self, outcome: np.ndarray, day_first: np.ndarray, day_size: np.ndarray,
+                 pos_segment: np.ndarray, seg_starts: np.ndarray, seg_recalc: np.ndarray):
+        self.outcome = outcome          # исходы ставок сезона по времени
+        self.day_first = day_first      # индекс первой ставки дня
+        self.day_size = day_size        # ставок в дне
+        self.pos_segment = pos_segment  # сегмент (период со ставками) позиции, -1 — вне периодов
+        self.seg_starts = seg_starts    # первая позиция каждого сегмента (для reduceat)
+        self.seg_recalc = seg_recalc    # пересчитывать ли номинал после сегмента
+
+    @classmethod
+    def from_arrays(cls, ts: np.ndarray, outcome: np.ndarray) -> Optional["MonteCarloSimulator"]:
+        dated = ts != NAT
+        if not dated.any():
+            return None
+        order = np.argsort(ts[dated], kind="stable")
+        ts = ts[dated][order]
+        outcome = outcome[dated][order]
+
+        calc = VectorizedProfitCalculator()
+        end_date = from_us(ts[-1])
+        starts, ends = calc.period_bounds(from_us(ts[0]), end_date)
+        pos_period = calc.assign_periods(ts, starts, ends)
+
+        present, seg_starts = np.unique(pos_period[pos_period >= 0], return_index=True)
+        # позиции «в периоде» идут подряд, поэтому индекс в present — это номер сегмента
+        seg_starts = np.flatnonzero(pos_period >= 0)[seg_starts]
+        pos_segment = np.where(pos_period >= 0, np.searchsorted(present, pos_period), -1)
+        seg_recalc = np.array([ends[p] < end_date for p in present], dtype=bool)
+
+        _, day_first, day_size = np.unique(ts // _US_PER_DAY, return_index=True, return_counts=True)
+        return cls(outcome, day_first, day_size, pos_segment, seg_starts, seg_recalc)
+
+    @classmethod
+    def from_frame(cls, frame) -> Optional["MonteCarloSimulator"]:
+        return cls.from_arrays(frame.ts, frame.outcome)
+
+    @property
+    def n_bets(self) -> int:
+        return int(self.outcome.size)
+
+    # ---- бутстрэп ----
+
+    def resample(self, rng: np.random.Generator, runs: int) -> np.ndarray:
+        """Матрица исходов (runs, bets): случайные дни подряд, обрезка до длины сезона."""
+        n = self.n_bets
+        n_days = self.day_size.size
+        k = max(1, int(np.ceil(n / self.day_size.mean() * 1.2)))
+        days = rng.integers(0, n_days, size=(runs, k))
+        sizes = self.day_size[days]
+        short = sizes.sum(axis=1) < n
+        while short.any():  # редкий случай: выпали одни «короткие» дни — докидываем
+            extra = rng.integers(0, n_days, size=(runs, k))
+            days = np.concatenate([days, extra], axis=1)
+            sizes = self.day_size[days]
+            short = sizes.sum(axis=1) < n
+
+        flat_sizes = sizes.ravel()
+        block_start = np.cumsum(flat_sizes) - flat_sizes
+        flat_idx = np.repeat(self.day_first[days].ravel() - block_start, flat_sizes)
+        flat_idx += np.arange(flat_idx.size, dtype=flat_idx.dtype)
+
+        row_total = sizes.sum(axis=1)
+        row_start = np.cumsum(row_total) - row_total
+        take = row_start[:, None] + np.arange(n)[None, :]
+        return self.outcome[flat_idx[take]]
+
+    # ---- шкала, векторизованная по прогонам ----
+
+    def simulate(self, rng: np.random.Generator, runs: int, params: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+        calc = VectorizedProfitCalculator(**(params or {}))
+        outcome = self.resample(rng, runs)
+        in_period = self.pos_segment >= 0
+        if not in_period.all():
+            outcome = np.where(in_period, outcome, np.int8(UNKNOWN))
+        seg_wins = np.add.reduceat(outcome == WIN, self.seg_starts, axis=1, dtype=np.int32)
+        seg_losses = np.add.reduceat(outcome == LOSS, self.seg_starts, axis=1, dtype=np.int32)
+
+        n_segments = self.seg_starts.size
+        bank = np.full(runs, float(calc.initial_bank))
+        nominal = np.full(runs, float(calc.initial_nominal))
+        prev_profit = np.zeros(runs)
+        final_bank = np.full(runs, float(calc.initial_bank))
+        nominals = np.empty((runs, n_segments))
+
+        for k in range(n_segments):
+            nominals[:, k] = nominal
+            profit = seg_wins[:, k] * nominal * calc.win_multiplier - seg_losses[:, k] * nominal
+            final_bank += np.where(np.round(profit, 2) > 0, np.round(profit, 2), 0.0) * calc.reinvest_share
+            if not self.seg_recalc[k]:
+                continue
+            addition = np.where(profit > 0, profit, 0.0)
+            if calc.combine_losses:
+                combined = profit + prev_profit
+                addition = np.where((profit <= 0) & (prev_profit < 0) & (combined > 0), combined, addition)
+            grow = addition > 0
+            bank = bank + addition * calc.reinvest_share
+            new_nominal = np.clip(np.round(bank * calc.nominal_pct), calc.min_nominal, calc.max_nominal)
+            nominal = np.where(grow, new_nominal, nominal)
+            prev_profit = profit
+
+        # путь капитала по ставкам: просадка и выход за «пол» номинала
+        multiplier = np.array([0.0, -1.0, calc.win_multiplier], dtype=np.float32)  # UNKNOWN, LOSS, WIN
+        equity = nominals.astype(np.float32)[:, np.clip(self.pos_segment, 0, None)]
+        equity *= multiplier[outcome + 1]
+        np.cumsum(equity, axis=1, out=equity)
+        drawdown = np.maximum.accumulate(equity, axis=1)
+        np.maximum(drawdown, 0, out=drawdown)
+        drawdown -= equity
+        max_drawdown = drawdown.max(axis=1)
+        ruined = (calc.initial_bank + equity.min(axis=1)) < calc.min_nominal
+
+        return {
+            "final_bank": final_bank,
+            "total_profit": equity[:, -1].astype(np.float64),
+            "max_drawdown": max_drawdown.astype(np.float64),
+            "final_nominal": nominal,
+            "ruined": ruined,
+        }
+
+    def run(self, runs: int, seed: Optional[int] = None, params: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+        """runs прогонов в одном процессе, порциями по CHUNK_CELLS ячеек."""
+        rng = np.random.default_rng(seed)
+        chunk = max(1, CHUNK_CELLS // max(self.n_bets, 1))
+        parts = [self.simulate(rng, min(chunk, runs - done), params) for done in range(0, runs, chunk)]
+        return {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+
+
+def _run_worker(simulator: MonteCarloSimulator, runs: int, seed, params):
+    return simulator.run(runs, seed, params)
+
+
+def _distribution(values: np.ndarray) -> Dict[str, float]:
+    out = {"mean": round(float(values.mean()), 2)}
+    for q, v in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        out[f"p{q}"] = round(float(v), 2)
+    return out
+
+
+def run_monte_carlo(
+    simulator: MonteCarloSimulator,
+    runs: int = 10_000,
+    seed: Optional[int] = None,
+    params: Optional[Dict[str, Any]] = None,
+    workers: int = 1,
+) -> Dict[str, Any]:
+    """Распределения финального банка, профита и просадки + вероятности «пола».
+
+    p_floor — доля прогонов, закончившихся на минимальном номинале;
+    p_ruin — доля прогонов, где капитал (начальный банк + профит) опускался
+    ниже минимального номинала, т.е. не покрывал даже минимальную ставку.
+    """
+    if runs < 1 or runs > MAX_RUNS:
+        raise ValueError(f"runs must be between 1 and {MAX_RUNS}")
+
+    workers = max(1, min(workers or 1, os.cpu_count() or 1, runs))
+    if workers == 1:
+        res = simulator.run(runs, seed, params)
+    else:
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        sizes = [runs // workers + (1 if i < runs % workers else 0) for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_run_worker, [simulator] * workers, sizes, seeds, [params] * workers))
+        res = {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+
+    min_nominal = VectorizedProfitCalculator(**(params or {})).min_nominal
+    return {
+        "runs": runs,
+        "bets": simulator.n_bets,
+        "final_bank": _distribution(res["final_bank"]),
+        "total_profit": _distribution(res["total_profit"]),
+        "max_drawdown": _distribution(res["max_drawdown"]),
+        "p_floor": round(float((res["final_nominal"] <= min_nominal).mean()), 4),
+        "p_ruin": round(float(res["ruined"].mean()), 4),
+    }
@@ -27,6 +27,7 @@ class NominalCalculator:
 
         # Получаем ставки за предыдущий месяц
         prev_month_bets = db.query(Bet).filter(
+            Bet.is_deleted == False,
             Bet.date >= prev_first_monday,
             Bet.date < current_first_monday
         ).all()
@@ -40,6 +41,7 @@ class NominalCalculator:
         if total_profit <= 0:
             # Если месяц убыточный, оставляем прежний номинал
             return db.query(Bet).filter(
+                Bet.is_deleted == False,
                 Bet.date < prev_first_monday
             ).order_by(Bet.date.desc()).first().nominal or initial_nominal
         
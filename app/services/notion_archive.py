@@ -0,0 +1,94 @@
+# app/services/notion_archive.py
+"""Локальный архив сырых страниц Notion (SQLite + zlib).
+
+Каждая полученная страница сохраняется как версия (page_id, last_edited_time):
+повторный синк без правок ничего не дописывает. По архиву таблицу bets можно
+пересобрать без сети (rebuild_from_archive.py) — после reset_db.py или
+изменения схемы. Хранятся страницы в том виде, в каком их вернул Notion,
+т.е. только свойства из filter_properties.
+"""
+import json
+import os
+import sqlite3
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+ARCHIVE_PATH = os.getenv("NOTION_ARCHIVE_PATH", "notion_archive.sqlite3")  # пусто — архив выключен
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    page_id TEXT NOT NULL,
+    last_edited_time TEXT NOT NULL,
+    database_id TEXT,
+    season TEXT,
+    fetched_at TEXT NOT NULL,
+    body BLOB NOT NULL,
+    PRIMARY KEY (page_id, last_edited_time)
+);
+CREATE INDEX IF NOT EXISTS ix_pages_season ON pages (season, page_id);
+"""
+
+
+def encode_page(page: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(page, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def decode_page(body: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(body))
+
+
+class NotionArchive:
+    def __init__(self, path: str = ARCHIVE_PATH):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def store(self, pages: Iterable[Dict[str, Any]], database_id: Optional[str] = None,
+              season: Optional[str] = None) -> int:
+        """Дописывает новые версии страниц; уже известные (id, last_edited_time) пропускаются."""
+        fetched_at = datetime.utcnow().isoformat(timespec="seconds")
+        rows = [
+            (page["id"], page.get("last_edited_time") or "", database_id, season, fetched_at, encode_page(page))
+            for page in pages if page.get("id")
+        ]
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO pages (page_id, last_edited_time, database_id, season, fetched_at, body) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            return self.conn.total_changes - before
+
+    def latest(self, season: Optional[str] = None) -> Iterator[Tuple[str, Optional[str], bytes]]:
+        """(page_id, season, сжатое тело) последней версии каждой страницы."""
+        sql = (
+            "SELECT p.page_id, p.season, p.body FROM pages p "
+            "JOIN (SELECT page_id, MAX(last_edited_time) AS t FROM pages {where} GROUP BY page_id) last "
+            "ON p.page_id = last.page_id AND p.last_edited_time = last.t"
+        )
+        if season is None:
+            return iter(self.conn.execute(sql.format(where="")))
+        return iter(self.conn.execute(sql.format(where="WHERE season = ?"), (season,)))
+
+    def seasons(self) -> List[str]:
+        return [r[0] for r in self.conn.execute("SELECT DISTINCT season FROM pages WHERE season IS NOT NULL")]
+
+    def stats(self) -> Dict[str, Any]:
+        pages, versions, size = self.conn.execute(
+            "SELECT COUNT(DISTINCT page_id), COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM pages"
+        ).fetchone()
+        return {"pages": pages, "versions": versions, "compressed_bytes": size}
@@ -0,0 +1,208 @@
+# app/services/notion_fetcher.py
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Свойства, которые читает NotionSync.sync_with_notion — остальные не запрашиваем
+SYNC_PROPERTIES = (
+    "Date", "Турнир", "Команда 1", "Команда 2", "Ставка", "Значение тотала", "Итог",
+    "Результат", "Потенциальный профит", "Премиум", "Время ставки", "Скрин из бота",
+    "Ссылка на матч",
+)
+
+# Границы сезона (включительно) для фильтра по Date на стороне Notion
+SEASON_BOUNDS: Dict[str, Tuple[str, str]] = {
+    "2024":      ("2024-08-01", "2025-07-31"),
+    "2024-2025": ("2024-08-01", "2025-07-31"),
+    "2025":      ("2025-08-01", "2026-07-31"),
+    "2025-2026": ("2025-08-01", "2026-07-31"),
+}
+
+
+FETCH_PARTITIONS = int(os.getenv("NOTION_FETCH_PARTITIONS", "4"))
+RATE_LIMIT = float(os.getenv("NOTION_RATE_LIMIT", "3"))  # запросов в секунду на процесс (лимит Notion ~3 rps)
+MAX_RETRIES = 5
+
+
+class RateLimiter:
+    """Token bucket на процесс: все потоки выборки делят один лимит запросов."""
+
+    def __init__(self, rate: float, burst: int = 3):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+rate_limiter = RateLimiter(RATE_LIMIT)
+
+
+class NotionFetcher:
+    """Постраничная выборка из базы Notion только нужных свойств.
+
+    filter_properties принимает id свойств, а не имена — id берём из схемы
+    базы (databases.retrieve) один раз на фетчер. Фетчер создаётся на каждый
+    синк, так что переименованное или сменившее тип свойство подхватывается
+    следующим же синком (планировщик и вебхук живут весь процесс).
+    """
+
+    def __init__(self, client, database_id: str, properties: Iterable[str] = SYNC_PROPERTIES,
+                 date_property: str = "Date"):
+        self.client = client
+        self.database_id = database_id
+        self.properties = tuple(properties)
+        self.date_property = date_property
+        self._schema: Optional[Dict[str, Dict[str, str]]] = None  # {имя свойства: {id, type}}
+
+    def schema(self) -> Optional[Dict[str, Dict[str, str]]]:
+        """{имя свойства: {id, type}} из databases.retrieve; None — схему получить не удалось."""
+        schema = self._schema
+        if schema is None:
+            try:
+                response = self.client.databases.retrieve(database_id=self.database_id)
+            except Exception as e:
+                print(f"[notion] Schema lookup failed, fetching all properties: {e}")
+                return None
+            schema = {
+                name: {"id": prop.get("id"), "type": prop.get("type")}
+                for name, prop in response.get("properties", {}).items() if prop.get("id")
+            }
+            self._schema = schema
+        return schema
+
+    def property_types(self) -> Optional[Dict[str, str]]:
+        schema = self.schema()
+        return {name: prop["type"] for name, prop in schema.items()} if schema is not None else None
+
+    def property_ids(self) -> Optional[List[str]]:
+        """id нужных свойств; None — проекцию не используем (схему получить не удалось)."""
+        schema = self.schema()
+        if schema is None:
+            return None
+        missing = [name for name in self.properties if name not in schema]
+        if missing:
+            print(f"[notion] Properties not in schema: {', '.join(missing)}")
+        wanted = [schema[name]["id"] for name in self.properties if name in schema]
+        return wanted or None
+
+    def date_filter(self, start: Optional[str] = None, end: Optional[str] = None,
+                    include_undated: bool = True) -> Optional[Dict[str, Any]]:
+        """Фильтр по Date: start <= date <= end (ISO-даты), плюс строки без даты."""
+        conditions = []
+        if start:
+            conditions.append({"property": self.date_property, "date": {"on_or_after": start}})
+        if end:
+            conditions.append({"property": self.date_property, "date": {"on_or_before": end}})
+        if not conditions:
+            return None
+        in_range = conditions[0] if len(conditions) == 1 else {"and": conditions}
+        if not include_undated:
+            return in_range
+        # строки без даты тоже синкаем, как и раньше
+        return {"or": [in_range, {"property": self.date_property, "date": {"is_empty": True}}]}
+
+    def season_filter(self, season: Optional[str]) -> Optional[Dict[str, Any]]:
+        bounds = SEASON_BOUNDS.get(season or "")
+        return self.date_filter(*bounds) if bounds else None
+
+    def edited_since_filter(self, since: datetime, season: Optional[str] = None) -> Dict[str, Any]:
+        """Страницы с last_edited_time >= since (UTC), при известном сезоне — ещё и в его датах.
+
+        Notion допускает не больше двух уровней вложенности, поэтому
+        (edited AND (in_range OR undated)) раскрыт в
+        (edited AND start AND end) OR (edited AND undated).
+        """
+        edited = {"timestamp": "last_edited_time",
+                  "last_edited_time": {"on_or_after": since.strftime("%Y-%m-%dT%H:%M:%S.000Z")}}
+        bounds = SEASON_BOUNDS.get(season or "")
+        if not bounds:
+            return edited
+        in_range = self.date_filter(*bounds, include_undated=False)
+        undated = {"property": self.date_property, "date": {"is_empty": True}}
+        return {"or": [{"and": [edited, *in_range["and"]]}, {"and": [edited, undated]}]}
+
+    def _query(self, **kwargs) -> Dict[str, Any]:
+        """Один запрос под общим лимитом; на rate_limited — пауза и повтор."""
+        from notion_client import APIResponseError
+
+        for attempt in range(1, MAX_RETRIES + 1):
+            rate_limiter.acquire()
+            try:
+                return self.client.databases.query(**kwargs)
+            except APIResponseError as e:
+                if getattr(e, "code", None) != "rate_limited" or attempt == MAX_RETRIES:
+                    raise
+                time.sleep(attempt)
+
+    def query_all(self, filter: Optional[Dict[str, Any]] = None, project: bool = True) -> List[Dict[str, Any]]:
+        """Все страницы базы под фильтром, по 100 за запрос."""
+        kwargs: Dict[str, Any] = {"database_id": self.database_id, "page_size": 100}
+        if filter:
+            kwargs["filter"] = filter
+        if project:
+            ids = self.property_ids()
+            if ids:
+                kwargs["filter_properties"] = ids
+
+        response = self._query(**kwargs)
+        results = list(response.get("results", []))
+        while response.get("has_more"):
+            response = self._query(start_cursor=response.get("next_cursor"), **kwargs)
+            results.extend(response.get("results", []))
+        return results
+
+    def query_partitioned(self, start: str, end: str, partitions: int = FETCH_PARTITIONS,
+                          include_undated: bool = True) -> List[Dict[str, Any]]:
+        """Сезон [start, end] режется на partitions диапазонов по Date, каждый листается своим потоком.
+
+        Курсоры Notion последовательные, поэтому один цикл пагинации упирается
+        в задержку запроса; несколько диапазонов идут параллельно в пределах
+        общего rate_limiter. Соседние диапазоны перекрываются на граничный день
+        (так не важно, как Notion трактует часовой пояс даты), дубли убираются по id.
+        """
+        first, last = date.fromisoformat(start), date.fromisoformat(end)
+        partitions = max(1, min(partitions, (last - first).days + 1))
+        days = (last - first).days
+        edges = [first + timedelta(days=days * k // partitions) for k in range(partitions)] + [last]
+
+        filters = [self.date_filter(a.isoformat(), b.isoformat(), include_undated=False)
+                   for a, b in zip(edges[:-1], edges[1:])]
+        if include_undated:
+            filters.append({"property": self.date_property, "date": {"is_empty": True}})
+
+        self.property_ids()  # схема — один раз до старта потоков
+        with ThreadPoolExecutor(max_workers=len(filters)) as pool:
+            parts = list(pool.map(lambda f: self.query_all(filter=f), filters))
+
+        merged: Dict[str, Dict[str, Any]] = {}
+        for part in parts:
+            for page in part:
+                merged.setdefault(page["id"], page)
+        return list(merged.values())
+
+    def fetch_season(self, season: Optional[str], partitions: int = FETCH_PARTITIONS) -> List[Dict[str, Any]]:
+        """Весь сезон: параллельно по диапазонам дат, если границы сезона известны."""
+        bounds = SEASON_BOUNDS.get(season or "")
+        if not bounds:
+            return self.query_all()
+        if partitions <= 1:
+            return self.query_all(filter=self.season_filter(season))
+        return self.query_partitioned(*bounds, partitions=partitions)
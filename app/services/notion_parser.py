@@ -0,0 +1,182 @@
+# app/services/notion_parser.py
+"""Парсер строк базы ставок, «скомпилированный» по схеме базы Notion.
+
+Схема (имя свойства → тип) известна до разбора строк, поэтому выбор
+экстрактора по типу делается один раз: на строку остаётся проход по
+фиксированному кортежу (ключ, функция) без ветвлений по типам.
+"""
+from collections import namedtuple
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict
+
+# Поля разобранной строки — порядок совпадает с ParsedRow
+ParsedRow = namedtuple("ParsedRow", [
+    "notion_id", "date", "tournament", "team1", "team2", "match", "bet_type", "total_value",
+    "score", "result", "won", "profit", "is_premium", "time", "screenshot_url", "match_url",
+])
+
+DEFAULT_STAKE = 100.0
+WIN_MULTIPLIER = 0.85
+
+
+# ---- экстракторы по типу свойства (prop — словарь свойства или None) ----
+
+def _title(prop):
+    items = prop["title"] if prop else None
+    return items[0].get("plain_text") if items else None
+
+
+def _rich_text(prop):
+    items = prop["rich_text"] if prop else None
+    if not items:
+        return None
+    if len(items) == 1:  # обычный случай — один кусок текста
+        return items[0].get("plain_text", "")
+    return "".join(x.get("plain_text", "") for x in items)
+
+
+def _rich_text_first(prop):
+    items = prop["rich_text"] if prop else None
+    return items[0].get("plain_text") if items else None
+
+
+def _select(prop):
+    value = prop["select"] if prop else None
+    return value.get("name") if value else None
+
+
+def _number(prop):
+    return prop["number"] if prop else None
+
+
+def _formula(prop):
+    f = prop["formula"] if prop else None
+    if not f:
+        return None
+    t = f.get("type")
+    if t in ("string", "number", "boolean"):
+        return f.get(t)
+    return None
+
+
+def _formula_number(prop):
+    f = prop["formula"] if prop else None
+    return f.get("number") if f and f.get("type") == "number" else None
+
+
+def _checkbox(prop):
+    return bool(prop["checkbox"]) if prop else False
+
+
+def _url(prop):
+    return prop["url"] if prop else None
+
+
+def _url_nonempty(prop):
+    return (prop["url"] or None) if prop else None
+
+
+def _date(prop):
+    value = prop["date"] if prop else None
+    s = value.get("start") if value else None
+    if not s:
+        return None
+    try:
+        d = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    # колонка DateTime без пояса: время со смещением ("…T18:20:00.000+03:00")
+    # храним в UTC, как его и записывал psycopg2 (timestamptz → UTC сессии)
+    if d.tzinfo is not None:
+        d = d.astimezone(timezone.utc).replace(tzinfo=None)
+    return d
+
+
+def _none(prop):
+    return None
+
+
+def _false(prop):
+    return False
+
+
+# (поле, свойство Notion, {тип свойства: экстрактор}, значение при отсутствии свойства)
+_TEXT = {"title": _title, "rich_text": _rich_text, "select": _select}
+FIELD_SPECS = (
+    ("date", "Date", {"date": _date}, _none),
+    ("tournament", "Турнир", _TEXT, _none),
+    ("team1", "Команда 1", _TEXT, _none),
+    ("team2", "Команда 2", _TEXT, _none),
+    ("bet_type", "Ставка", _TEXT, _none),
+    ("total_value", "Значение тотала", {"number": _number, "formula": _formula_number}, _none),
+    ("score", "Итог", _TEXT, _none),
+    ("result", "Результат", {"formula": _formula, **_TEXT}, _none),
+    ("profit", "Потенциальный профит", {"formula": _formula, "number": _number}, _none),
+    ("is_premium", "Премиум", {"checkbox": _checkbox}, _false),
+    ("time", "Время ставки", _TEXT, _none),
+    ("screenshot_url", "Скрин из бота", {"url": _url, "rich_text": _rich_text_first}, _none),
+    ("match_url", "Ссылка на матч", {"url": _url_nonempty}, _none),
+)
+
+
+def compile_row_parser(property_types: Dict[str, str]) -> Callable[[Dict[str, Any]], ParsedRow]:
+    """Схема {имя свойства: тип} → функция page → ParsedRow.
+
+    Свойства, которых нет в схеме или чей тип не поддерживается, дают
+    значение по умолчанию (как и раньше — None/False).
+    """
+    (
+        (date_k, date_f), (tournament_k, tournament_f), (team1_k, team1_f), (team2_k, team2_f),
+        (bet_type_k, bet_type_f), (total_k, total_f), (score_k, score_f), (result_k, result_f),
+        (profit_k, profit_f), (premium_k, premium_f), (time_k, time_f), (screen_k, screen_f),
+        (match_url_k, match_url_f),
+    ) = tuple(
+        (prop_name, extractors.get(property_types.get(prop_name), missing))
+        for _, prop_name, extractors, missing in FIELD_SPECS
+    )
+
+    new_row = tuple.__new__  # без проверки числа аргументов namedtuple
+
+    def parse(page: Dict[str, Any]) -> ParsedRow:
+        g = page["properties"].get
+        team1 = team1_f(g(team1_k))
+        team2 = team2_f(g(team2_k))
+
+        # результат — формула/текст с эмодзи
+        raw_result = result_f(g(result_k))
+        if isinstance(raw_result, str) and "✅" in raw_result:
+            result, won = "WIN", True
+        elif isinstance(raw_result, str) and "❌" in raw_result:
+            result, won = "LOSE", False
+        else:
+            result, won = "-", None
+
+        profit = profit_f(g(profit_k))
+        if profit is None and won is not None:
+            profit = DEFAULT_STAKE * WIN_MULTIPLIER if won else -DEFAULT_STAKE
+
+        return new_row(ParsedRow, (
+            page["id"],
+            date_f(g(date_k)),
+            tournament_f(g(tournament_k)),
+            team1,
+            team2,
+            f"{team1} vs {team2}" if team1 and team2 else None,
+            bet_type_f(g(bet_type_k)),
+            total_f(g(total_k)),
+            score_f(g(score_k)),
+            result,
+            won,
+            profit,
+            premium_f(g(premium_k)),
+            time_f(g(time_k)),
+            screen_f(g(screen_k)),
+            match_url_f(g(match_url_k)),
+        ))
+
+    return parse
+
+
+def types_from_page(page: Dict[str, Any]) -> Dict[str, str]:
+    """Схема по самой странице — если databases.retrieve недоступен."""
+    return {name: prop.get("type") for name, prop in page.get("properties", {}).items()}
@@ -4,6 +4,14 @@ from typing import List, Dict, Any, Optional
 from notion_client import Client
 import pytz
 
+from app.services.notion_fetcher import NotionFetcher
+
+# Свойства, которые разбирает _fetch_bets
+FETCH_PROPERTIES = (
+    "Дата", "Турнир", "Команда 1", "Команда 2", "Тип ставки", "Тотал", "Счет игры",
+    "Результат", "Очки", "Профит", "Номинал", "Банк", "Премиум", "Скрин из бота",
+)
+
 class NotionService:
     def __init__(self):
         self.notion = Client(auth=os.getenv("NOTION_TOKEN"))
@@ -78,37 +86,19 @@ class NotionService:
         all_bets = []
         
         try:
-            # Формируем фильтр если нужно
-            filter_params = {}
+            # Фильтр по дате и только разбираемые свойства (filter_properties)
+            fetcher = NotionFetcher(self.notion, self.database_id, FETCH_PROPERTIES, date_property="Дата")
+            filter_params = None
             if filter_date:
                 filter_params = {
-                    "filter": {
-                        "property": "Дата",
-                        "date": {
-                            "after": filter_date.isoformat()
-                        }
+                    "property": "Дата",
+                    "date": {
+                        "after": filter_date.isoformat()
                     }
                 }
-            
-            # Первый запрос
-            response = self.notion.databases.query(
-                database_id=self.database_id,
-                page_size=100,
-                **filter_params
-            )
-            
-            results = response["results"]
-            
-            # Получаем остальные страницы
-            while response.get("has_more"):
-                response = self.notion.databases.query(
-                    database_id=self.database_id,
-                    start_cursor=response["next_cursor"],
-                    page_size=100,
-                    **filter_params
-                )
-                results.extend(response["results"])
-            
+
+            results = fetcher.query_all(filter=filter_params)
+
             print(f"Получено {len(results)} записей из Notion")
             
             # Парсим каждую запись
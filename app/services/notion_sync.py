@@ -1,13 +1,55 @@
 # app/services/notion_sync.py
 import os
-from datetime import datetime
-from typing import Any, Dict, Optional
-from notion_client import Client
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, insert, or_
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from app.models.bet import Bet
-from dotenv import load_dotenv
+from app.models.sync_failure import SyncFailure
+from app.services.rollup_service import RollupService
+from app.services.bet_types import BetTypeResolver
+from app.services.bet_fields import content_hash, line_margin
+from app.services.notion_fetcher import SEASON_BOUNDS, NotionFetcher, rate_limiter
+from app.services.notion_parser import DEFAULT_STAKE, ParsedRow, compile_row_parser, types_from_page
+from app.services.notion_archive import ARCHIVE_PATH, NotionArchive
+from app.services.screenshot_sync import RESOLVE_ON_SYNC, resolve_missing
+
+SEASON_DATE_FILTER = os.getenv("NOTION_SEASON_DATE_FILTER", "1") == "1"
+SYNC_CHUNK = int(os.getenv("NOTION_SYNC_CHUNK", "500"))  # строк на коммит
+# полный синк не удаляет больше этой доли живых строк сезона разом — скорее
+# потерян доступ к базе или сломан фильтр, чем столько страниц удалили в Notion
+REMOVE_MAX_SHARE = float(os.getenv("NOTION_REMOVE_MAX_SHARE", "0.2"))
+
+# Явный маппинг сезонов → пар переменных
+# Добавь сюда новые сезоны по мере необходимости
+SEASON_ENV = {
+    "2024":       ("NOTION_TOKEN_2024", "NOTION_DATABASE_2024"),
+    "2024-2025":  ("NOTION_TOKEN_2024", "NOTION_DATABASE_2024"),
+    "2025":       ("NOTION_TOKEN_2025", "NOTION_DATABASE_2025"),
+    "2025-2026":  ("NOTION_TOKEN_2025", "NOTION_DATABASE_2025"),
+}
+
+
+def season_credentials(season: str) -> Tuple[Optional[str], Optional[str], str, str]:
+    """(token, database_id, имя переменной токена, имя переменной базы) для сезона."""
+    token_key, db_key = SEASON_ENV.get(season, ("NOTION_TOKEN_2024", "NOTION_DATABASE_2024"))
+    token = os.getenv(token_key) or os.getenv("NOTION_TOKEN")
+    database_id = os.getenv(db_key) or os.getenv("NOTION_DATABASE_ID")
+    return token, database_id, token_key, db_key
+
+
+def season_for_database(database_id: Optional[str], seasons: Iterable[str]) -> Optional[str]:
+    """Первый из seasons, чья база Notion — database_id (id сравниваются без дефисов)."""
+    if not database_id:
+        return None
+    wanted = database_id.replace("-", "").lower()
+    for season in seasons:
+        configured = season_credentials(season)[1]
+        if configured and configured.replace("-", "").lower() == wanted:
+            return season
+    return None
 
-load_dotenv()
 
 class NotionSync:
     def __init__(self, season: Optional[str] = None):
@@ -16,99 +58,128 @@ class NotionSync:
         season = (season or os.getenv("DEFAULT_SEASON") or "2024").strip()
         self.season = season
 
-        # Явный маппинг сезонов → пар переменных
-        # Добавь сюда новые сезоны по мере необходимости
-        mapping = {
-            "2024":       ("NOTION_TOKEN_2024", "NOTION_DATABASE_2024"),
-            "2024-2025":  ("NOTION_TOKEN_2024", "NOTION_DATABASE_2024"),
-            "2025":       ("NOTION_TOKEN_2025", "NOTION_DATABASE_2025"),
-            "2025-2026":  ("NOTION_TOKEN_2025", "NOTION_DATABASE_2025"),
-        }
-
-        token_key, db_key = mapping.get(season, ("NOTION_TOKEN_2024", "NOTION_DATABASE_2024"))
-
-        token = os.getenv(token_key) or os.getenv("NOTION_TOKEN")
-        database_id = os.getenv(db_key) or os.getenv("NOTION_DATABASE_ID")
+        token, database_id, token_key, db_key = season_credentials(season)
 
         if not token or not database_id:
             print(f"WARNING: Missing Notion credentials for season '{season}' "
                   f"(checked {token_key}/{db_key} and NOTION_TOKEN/NOTION_DATABASE_ID)")
 
+        from notion_client import Client  # тяжёлый импорт — только когда синк реально нужен
+
         self.notion = Client(auth=token)
         self.database_id = database_id
 
-    # ==== Хелперы парсинга свойств Notion ====
+    # ==== Основной синк ====
 
-    def _parse_text(self, prop):
-        if not prop:
-            return None
-        t = prop.get("type")
-        if t == "title" and prop.get("title"):
-            return prop["title"][0].get("plain_text")
-        if t == "rich_text" and prop.get("rich_text"):
-            return "".join(x.get("plain_text", "") for x in prop["rich_text"])
-        if t == "select" and prop.get("select"):
-            return prop["select"].get("name")
-        return None
+    def _archive(self, results: List[Dict[str, Any]]) -> None:
+        """Сырые страницы — в локальный архив; его сбой синк не останавливает."""
+        archive = NotionArchive()
+        try:
+            added = archive.store(results, self.database_id, self.season)
+            print(f"[sync] Archived {added} new page versions")
+        except Exception as e:
+            print(f"[sync] Archive write failed: {e}")
+        finally:
+            archive.close()
 
-    def _parse_number(self, prop):
-        if not prop:
+    def _resolve_screenshots(self, db: Session) -> Optional[Dict[str, int]]:
+        """После синка — прямые ссылки на новые скрины; сбой синк не проваливает."""
+        if not RESOLVE_ON_SYNC:
             return None
-        t = prop.get("type")
-        if t == "number":
-            return prop.get("number")
-        if t == "formula":
-            f = prop.get("formula") or {}
-            if f.get("type") == "number":
-                return f.get("number")
-        return None
-
-    def _parse_formula(self, prop):
-        if not prop or prop.get("type") != "formula":
+        try:
+            return resolve_missing(db, self.season)
+        except Exception as e:
+            print(f"[sync] Screenshot resolve failed: {e}")
+            db.rollback()
             return None
-        f = prop.get("formula") or {}
-        if f.get("type") == "string":
-            return f.get("string")
-        if f.get("type") == "number":
-            return f.get("number")
-        if f.get("type") == "boolean":
-            return f.get("boolean")
-        return None
 
-    def _parse_date(self, prop):
-        if not prop:
-            return None
-        if prop.get("type") == "date" and prop.get("date"):
-            s = prop["date"].get("start")
-            if not s:
-                return None
+    @staticmethod
+    def _parse_pages(parse, pages: List[Dict[str, Any]]):
+        """Страницы → ParsedRow; неразобранные — {page_id: ошибка}."""
+        parsed: List[ParsedRow] = []
+        failed: Dict[str, str] = {}
+        for row in pages:
             try:
-                return datetime.fromisoformat(s.replace("Z", "+00:00"))
-            except Exception:
-                return None
-        return None
-
-    def _parse_checkbox(self, prop) -> bool:
-        if not prop:
-            return False
-        if prop.get("type") == "checkbox":
-            return prop.get("checkbox", False)
-        return False
+                parsed.append(parse(row))
+            except Exception as e:
+                print(f"[sync] Error processing row {row.get('id')}: {e}")
+                if row.get("id"):
+                    failed[row["id"]] = f"parse: {e}"
+        return parsed, failed
+
+    def sync_pages(self, db: Session, page_ids: Iterable[str], deleted: Iterable[str] = ()) -> Dict[str, Any]:
+        """Точечный синк страниц по id (вебхук, повтор упавших) — pages.retrieve на страницу.
+
+        deleted — id, про которые уже известно, что страницы удалены: их не
+        запрашиваем. Удалённые/в корзине страницы мягко удаляются, остальные
+        идут через apply_parsed_rows как при полном синке.
+        """
+        from notion_client import APIResponseError
+
+        removed_ids = set(i for i in deleted if i)
+        pages: List[Dict[str, Any]] = []
+        fetch_failed: Dict[str, str] = {}
+        for page_id in dict.fromkeys(i for i in page_ids if i and i not in removed_ids):
+            rate_limiter.acquire()
+            try:
+                page = self.notion.pages.retrieve(page_id=page_id)
+            except APIResponseError as e:
+                if getattr(e, "code", None) == "object_not_found":
+                    removed_ids.add(page_id)  # страницы нет или к ней больше нет доступа
+                else:
+                    fetch_failed[page_id] = f"retrieve: {e}"
+                continue
+            if page.get("archived") or page.get("in_trash"):
+                removed_ids.add(page_id)
+            else:
+                pages.append(page)
+
+        if ARCHIVE_PATH and pages:
+            self._archive(pages)
+
+        property_types = NotionFetcher(self.notion, self.database_id).property_types()
+        if property_types is None:
+            property_types = types_from_page(pages[0]) if pages else {}
+        parsed, parse_failed = self._parse_pages(compile_row_parser(property_types), pages)
+
+        stats = apply_parsed_rows(db, self.season, parsed)
+        stats["total"] = len(pages) + len(removed_ids) + len(fetch_failed)
+        stats["errors"] += len(parse_failed) + len(fetch_failed)
+        stats["removed"] = soft_delete(
+            db, db.query(Bet.id, Bet.season, Bet.date).filter(
+                Bet.notion_id.in_(list(removed_ids)), Bet.is_deleted == False
+            ).all()
+        ) if removed_ids else 0
+        if removed_ids:
+            db.query(SyncFailure).filter(SyncFailure.notion_id.in_(list(removed_ids))).delete(synchronize_session=False)
+        _record_failures(db, self.season, [], {**fetch_failed, **parse_failed}, False)
+        db.commit()
+        stats["screenshots"] = self._resolve_screenshots(db)
+        return stats
+
+    def retry_failed(self, db: Session) -> Dict[str, Any]:
+        """Повтор страниц из sync_failures сезона — по одной через pages.retrieve, без полной выборки."""
+        try:
+            ids = [r.notion_id for r in db.query(SyncFailure.notion_id).filter(SyncFailure.season == self.season)]
+            if not ids:
+                return {"success": True, "message": "Нет строк для повтора", "stats": {"total": 0}}
+            stats = self.sync_pages(db, ids)
+            print(f"[sync] Retry done. Created={stats['created']} Updated={stats['updated']} "
+                  f"Unchanged={stats['unchanged']} Removed={stats['removed']} "
+                  f"Failed={stats['failed'] + stats['errors']}")
+            return {"success": True, "message": "Повтор завершён", "stats": stats}
 
-    def _parse_url_or_text_url(self, prop):
-        if not prop:
-            return None
-        t = prop.get("type")
-        if t == "url":
-            return prop.get("url")
-        if t == "rich_text" and prop.get("rich_text"):
-            return prop["rich_text"][0].get("plain_text")
-        return None
+        except Exception as e:
+            print(f"[sync] Retry error: {e}")
+            db.rollback()
+            return {"success": False, "message": f"Ошибка повтора: {e}", "stats": None}
 
-    # ==== Основной синк ====
+    def sync_with_notion(self, db: Session, since: Optional[datetime] = None) -> Dict[str, Any]:
+        """Синхронизация данных из Notion в базу данных.
 
-    def sync_with_notion(self, db: Session) -> Dict[str, Any]:
-        """Синхронизация данных из Notion в базу данных."""
+        since — инкрементальный синк: только страницы с last_edited_time >= since
+        (UTC). Удаления он не видит — их находит только полный синк.
+        """
         try:
             if not self.database_id:
                 return {
@@ -117,142 +188,56 @@ class NotionSync:
                     "stats": None
                 }
 
-            print(f"[sync] Fetching data from Notion for season '{self.season}'...")
-            response = self.notion.databases.query(database_id=self.database_id, page_size=100)
-            results = list(response.get("results", []))
-
-            while response.get("has_more"):
-                response = self.notion.databases.query(
-                    database_id=self.database_id,
-                    start_cursor=response.get("next_cursor"),
-                    page_size=100
-                )
-                results.extend(response.get("results", []))
+            print(f"[sync] Fetching data from Notion for season '{self.season}'"
+                  f"{f' edited since {since.isoformat()}' if since else ''}...")
+            # только читаемые свойства и только даты сезона (+ строки без даты),
+            # диапазоны дат сезона листаются параллельно
+            fetcher = NotionFetcher(self.notion, self.database_id)
+            if since is not None:
+                results = fetcher.query_all(filter=fetcher.edited_since_filter(
+                    since, self.season if SEASON_DATE_FILTER else None
+                ))
+            elif SEASON_DATE_FILTER:
+                results = fetcher.fetch_season(self.season)
+            else:
+                results = fetcher.query_all()
 
             print(f"[sync] Found {len(results)} records in Notion")
 
-            stats = {"total": len(results), "created": 0, "updated": 0, "errors": 0,
-                     "wins": 0, "losses": 0, "no_result": 0}
-
-            for row in results:
-                try:
-                    p = row.get("properties", {})
-                    notion_id = row.get("id")
-
-                    date = self._parse_date(p.get("Date"))
-                    tournament = self._parse_text(p.get("Турнир"))
-
-                    team1 = self._parse_text(p.get("Команда 1"))
-                    team2 = self._parse_text(p.get("Команда 2"))
-                    match = f"{team1} vs {team2}" if team1 and team2 else None
-
-                    bet_type = self._parse_text(p.get("Ставка"))
-                    total_value = self._parse_number(p.get("Значение тотала"))
-                    score = self._parse_text(p.get("Итог"))
-
-                    # Результат (формула/текст с эмодзи)
-                    result_prop = p.get("Результат")
-                    result_text = None
-                    won = None
-
-                    if result_prop and result_prop.get("type") == "formula":
-                        result_text = self._parse_formula(result_prop)
-                    elif result_prop:
-                        result_text = self._parse_text(result_prop)
-
-                    if result_text:
-                        if "✅" in result_text:
-                            won = True
-                            result_text = "WIN"
-                            stats["wins"] += 1
-                        elif "❌" in result_text:
-                            won = False
-                            result_text = "LOSE"
-                            stats["losses"] += 1
-                        else:
-                            won = None
-                            result_text = "-"
-                            stats["no_result"] += 1
-                    else:
-                        won = None
-                        result_text = "-"
-                        stats["no_result"] += 1
-
-                    # Коэф/ставка/профит (дефолты)
-                    coefficient = 1.85
-                    stake = 100.0
-                    profit_prop = p.get("Потенциальный профит")
-                    profit = None
-                    if profit_prop and profit_prop.get("type") == "formula":
-                        profit = self._parse_formula(profit_prop)
-                    elif profit_prop:
-                        profit = self._parse_number(profit_prop)
-                    if profit is None and won is not None:
-                        profit = stake * 0.85 if won else -stake
-
-                    is_premium = self._parse_checkbox(p.get("Премиум"))
-                    time_str = self._parse_text(p.get("Время ставки"))
-                    screenshot_url = self._parse_url_or_text_url(p.get("Скрин из бота"))
-
-                    match_url = None
-                    if "Ссылка на матч" in p:
-                        prop_url = p["Ссылка на матч"]
-                        if prop_url.get("type") == "url" and prop_url.get("url"):
-                            match_url = prop_url["url"]
-
-                    existing = db.query(Bet).filter(Bet.notion_id == notion_id).first()
-                    if existing:
-                        # update
-                        existing.date = date
-                        existing.tournament = tournament
-                        existing.match = match
-                        existing.bet_type = bet_type
-                        existing.coefficient = coefficient
-                        existing.total_value = total_value
-                        existing.score = score
-                        existing.result = result_text
-                        existing.won = won
-                        existing.stake = stake
-                        existing.profit = profit or 0
-                        existing.is_premium = is_premium
-                        existing.screenshot_url = screenshot_url
-                        existing.match_url = match_url
-                        existing.time = time_str
-                        existing.season = self.season
-                        existing.updated_at = datetime.utcnow()
-                        stats["updated"] += 1
-                    else:
-                        # create
-                        db.add(Bet(
-                            notion_id=notion_id,
-                            date=date,
-                            tournament=tournament,
-                            match=match,
-                            bet_type=bet_type,
-                            coefficient=coefficient,
-                            total_value=total_value,
-                            score=score,
-                            result=result_text,
-                            won=won,
-                            stake=stake,
-                            profit=profit or 0,
-                            is_premium=is_premium,
-                            screenshot_url=screenshot_url,
-                            match_url=match_url,
-                            time=time_str,
-                            season=self.season,
-                            created_at=datetime.utcnow(),
-                            updated_at=datetime.utcnow(),
-                        ))
-                        stats["created"] += 1
-
-                except Exception as e:
-                    print(f"[sync] Error processing row {row.get('id')}: {e}")
-                    stats["errors"] += 1
-                    continue
+            if ARCHIVE_PATH:
+                self._archive(results)
+
+            # парсер собирается по схеме базы один раз на синк
+            property_types = fetcher.property_types()
+            if property_types is None:
+                property_types = types_from_page(results[0]) if results else {}
+            parse = compile_row_parser(property_types)
+
+            parsed, parse_failed = self._parse_pages(parse, results)
+            stats = apply_parsed_rows(db, self.season, parsed)
+            stats["total"] = len(results)
+            stats["errors"] += len(parse_failed)
+            _record_failures(db, self.season, [], parse_failed, False)
+
+            # полная выборка: строки сезона, которых в Notion больше нет, — мягко удаляем
+            stats["removed"] = 0
+            stats["warnings"] = []
+            if since is None and not results:
+                warning = "Notion вернул пустую выборку — удаление пропущено"
+                print(f"[sync] WARNING: {warning}")
+                stats["warnings"].append(warning)
+            elif since is None:
+                bounds = SEASON_BOUNDS.get(self.season) if SEASON_DATE_FILTER else None
+                stats["removed"], warning = remove_missing(
+                    db, self.season, [row.get("id") for row in results], *(bounds or ())
+                )
+                if warning:
+                    stats["warnings"].append(warning)
 
             db.commit()
-            print(f"[sync] Done. Created={stats['created']} Updated={stats['updated']} "
+            stats["screenshots"] = self._resolve_screenshots(db)
+            print(f"[sync] Done. Created={stats['created']} Updated={stats['updated']} Unchanged={stats['unchanged']} "
+                  f"Removed={stats['removed']} Failed={stats['failed']} "
                   f"Wins={stats['wins']} Losses={stats['losses']} NoRes={stats['no_result']}")
 
             return {"success": True, "message": "Синхронизация завершена успешно", "stats": stats}
@@ -262,3 +247,219 @@ class NotionSync:
             import traceback; traceback.print_exc()
             db.rollback()
             return {"success": False, "message": f"Ошибка синхронизации: {e}", "stats": None}
+
+
+def _existing_bets(db: Session, notion_ids: List[str], chunk: int = 500) -> Dict[str, Any]:
+    """Уже сохранённые ставки по notion_id (id, сезон, дата, скрин, хэш, флаг удаления) — пачками, а не запросом на строку."""
+    ids = [i for i in notion_ids if i]
+    found: Dict[str, Any] = {}
+    for k in range(0, len(ids), chunk):
+        rows = (
+            db.query(Bet.id, Bet.notion_id, Bet.season, Bet.date, Bet.screenshot_url, Bet.content_hash, Bet.is_deleted)
+            .filter(Bet.notion_id.in_(ids[k:k + chunk]))
+            .all()
+        )
+        for row in rows:
+            found[row.notion_id] = row
+    return found
+
+
+def apply_parsed_rows(db: Session, season: str, parsed: Iterable[ParsedRow],
+                      restore_deleted: bool = True, chunk_size: int = SYNC_CHUNK) -> Dict[str, Any]:
+    """Разобранные строки → bets (update по notion_id, новые — одним INSERT) + роллап.
+
+    Строки, чей хэш содержимого совпал с сохранённым, не пишутся вовсе
+    (и updated_at у них не меняется) — считаются как unchanged. Мягко
+    удалённая строка, чья страница снова пришла, восстанавливается, если
+    restore_deleted (синк), иначе остаётся удалённой (пересборка из архива).
+
+    Пишет и коммитит пачками по chunk_size: упавшая строка не откатывает
+    уже записанные, а транзакция не держится весь синк. Общий шаг для синка
+    из Notion и пересборки из архива.
+    """
+    parsed = list(parsed)
+    stats = {"total": len(parsed), "created": 0, "updated": 0, "unchanged": 0, "errors": 0,
+             "failed": 0, "wins": 0, "losses": 0, "no_result": 0, "rollup_rows": 0}
+    bet_types = BetTypeResolver(db)
+    has_failures = db.query(SyncFailure.id).first() is not None
+
+    for k in range(0, len(parsed), max(1, chunk_size)):
+        failed = _apply_chunk(db, season, parsed[k:k + chunk_size], bet_types, restore_deleted, stats)
+        _record_failures(db, season, [r.notion_id for r in parsed[k:k + chunk_size]], failed, has_failures)
+        has_failures = has_failures or bool(failed)
+        db.commit()
+    return stats
+
+
+def _apply_chunk(db: Session, season: str, chunk: List[ParsedRow], bet_types: BetTypeResolver,
+                 restore_deleted: bool, stats: Dict[str, Any]) -> Dict[str, str]:
+    """Одна пачка: значения, запись в savepoint, роллап дней. Возвращает {notion_id: ошибка}."""
+    touched_days = set()  # (season, day) для пересчёта bet_daily_rollup
+    existing_by_id = _existing_bets(db, [r.notion_id for r in chunk])
+    new_rows: Dict[str, Dict[str, Any]] = {}
+    changed: Dict[str, Dict[str, Any]] = {}  # notion_id → новые значения существующей строки
+    failed: Dict[str, str] = {}
+    now = datetime.utcnow()
+
+    for r in chunk:
+        if r.won is True:
+            stats["wins"] += 1
+        elif r.won is False:
+            stats["losses"] += 1
+        else:
+            stats["no_result"] += 1
+
+        try:
+            bet_type_id, bet_category, bet_family = bet_types.resolve(r.bet_type)
+            total_points = Bet.parse_points(r.score)
+            values = {
+                "date": r.date,
+                "tournament": r.tournament,
+                "match": r.match,
+                "team1": r.team1,
+                "team2": r.team2,
+                "bet_type": r.bet_type,
+                "bet_type_id": bet_type_id,
+                "bet_category": bet_category,
+                "bet_family": bet_family,
+                "coefficient": 1.85,
+                "total_value": r.total_value,
+                "score": r.score,
+                "total_points": total_points,
+                "margin": line_margin(total_points, r.total_value, bet_family),
+                "result": r.result,
+                "won": r.won,
+                "stake": DEFAULT_STAKE,
+                "profit": r.profit or 0,
+                "is_premium": r.is_premium,
+                "screenshot_url": r.screenshot_url,
+                "match_url": r.match_url,
+                "time": r.time,
+                "season": season,
+            }
+            values["content_hash"] = content_hash(values)
+        except Exception as e:
+            failed[r.notion_id] = str(e)
+            continue
+        values["is_deleted"] = False
+        values["updated_at"] = now
+
+        existing = existing_by_id.get(r.notion_id)
+        if existing:
+            if existing.is_deleted and not restore_deleted:
+                stats["unchanged"] += 1
+                continue
+            if existing.content_hash == values["content_hash"] and not existing.is_deleted:
+                stats["unchanged"] += 1
+                continue
+            # update
+            touched_days.add((season, r.date.date() if r.date else None))
+            touched_days.add((existing.season, existing.date.date() if existing.date else None))
+            changed[r.notion_id] = {"id": existing.id, **values}
+            if existing.screenshot_url != values["screenshot_url"]:
+                changed[r.notion_id]["screenshot_image_url"] = None  # скрин заменили — резолвим заново
+        else:
+            # create — одной пачкой
+            touched_days.add((season, r.date.date() if r.date else None))
+            new_rows[r.notion_id] = {"notion_id": r.notion_id, "created_at": now, **values}
+
+    try:
+        with db.begin_nested():
+            _write_rows(db, list(changed.values()), list(new_rows.values()))
+        stats["updated"] += len(changed)
+        stats["created"] += len(new_rows)
+    except SQLAlchemyError:
+        # пачка не прошла — по строке, каждая в своём savepoint: плохая строка не тянет за собой остальные
+        for notion_id, row in list(changed.items()) + list(new_rows.items()):
+            is_new = notion_id in new_rows
+            try:
+                with db.begin_nested():
+                    _write_rows(db, [] if is_new else [row], [row] if is_new else [])
+                stats["created" if is_new else "updated"] += 1
+            except SQLAlchemyError as e:
+                failed[notion_id] = str(getattr(e, "orig", None) or e)
+
+    stats["failed"] += len(failed)
+    stats["rollup_rows"] += RollupService.refresh_days(db, touched_days)
+    return failed
+
+
+def _write_rows(db: Session, changed: List[Dict[str, Any]], new_rows: List[Dict[str, Any]]) -> None:
+    if changed:
+        db.bulk_update_mappings(Bet, changed)
+    if new_rows:
+        db.execute(insert(Bet), new_rows)
+    db.flush()
+
+
+def _record_failures(db: Session, season: str, notion_ids: List[str], failed: Dict[str, str],
+                     has_failures: bool) -> None:
+    """Упавшие строки — в sync_failures (attempts растёт), записанные — оттуда убираем."""
+    if has_failures:
+        ok = [i for i in notion_ids if i and i not in failed]
+        if ok:
+            db.query(SyncFailure).filter(SyncFailure.notion_id.in_(ok)).delete(synchronize_session=False)
+    if not failed:
+        return
+    now = datetime.utcnow()
+    known = {f.notion_id: f for f in db.query(SyncFailure).filter(SyncFailure.notion_id.in_(list(failed)))}
+    for notion_id, error in failed.items():
+        print(f"[sync] Failed to write {notion_id}: {error}")
+        row = known.get(notion_id)
+        if row is None:
+            db.add(SyncFailure(notion_id=notion_id, season=season, error=error[:1000], failed_at=now))
+        else:
+            row.season, row.error, row.failed_at = season, error[:1000], now
+            row.attempts = (row.attempts or 0) + 1
+
+
+def remove_missing(db: Session, season: str, seen_ids: Iterable[str],
+                   date_from: Optional[str] = None, date_to: Optional[str] = None, chunk: int = 500,
+                   max_share: float = REMOVE_MAX_SHARE) -> Tuple[int, Optional[str]]:
+    """Мягко удаляет ставки сезона, чьих страниц нет среди полученных из Notion.
+
+    Кандидаты — живые строки сезона в пределах выборки: если синк брал
+    только даты [date_from, date_to] (+ строки без даты), строки вне этого
+    диапазона не трогаем. Разность — по одному запросу id сезона. Коммит —
+    на вызывающем; роллап затронутых дней пересчитывается.
+    Если пропало больше max_share кандидатов, ничего не удаляется —
+    возвращается (0, предупреждение).
+    """
+    seen = set(i for i in seen_ids if i)
+    query = db.query(Bet.id, Bet.notion_id, Bet.season, Bet.date).filter(
+        Bet.season == season, Bet.is_deleted == False, Bet.notion_id != None
+    )
+    if date_from or date_to:
+        in_range = []
+        if date_from:
+            in_range.append(Bet.date >= datetime.combine(date.fromisoformat(date_from), datetime.min.time()))
+        if date_to:
+            in_range.append(Bet.date < datetime.combine(date.fromisoformat(date_to) + timedelta(days=1),
+                                                        datetime.min.time()))
+        query = query.filter(or_(and_(*in_range), Bet.date == None))
+
+    candidates = query.all()
+    orphans = [row for row in candidates if row.notion_id not in seen]
+    if orphans and len(orphans) > max_share * len(candidates):
+        warning = (f"В Notion нет {len(orphans)} из {len(candidates)} строк сезона {season} "
+                   f"(больше {max_share:.0%}) — удаление пропущено")
+        print(f"[sync] WARNING: {warning}")
+        return 0, warning
+    removed = soft_delete(db, orphans, chunk)
+    if removed:
+        print(f"[sync] Soft-deleted {removed} bets missing from Notion")
+    return removed, None
+
+
+def soft_delete(db: Session, rows: List[Any], chunk: int = 500) -> int:
+    """is_deleted = true для строк (id, season, date) + роллап их дней. Коммит — на вызывающем."""
+    if not rows:
+        return 0
+    now = datetime.utcnow()
+    ids = [row.id for row in rows]
+    for k in range(0, len(ids), chunk):
+        db.query(Bet).filter(Bet.id.in_(ids[k:k + chunk])).update(
+            {Bet.is_deleted: True, Bet.updated_at: now}, synchronize_session=False
+        )
+    RollupService.refresh_days(db, {(row.season, row.date.date() if row.date else None) for row in rows})
+    return len(rows)
@@ -0,0 +1,169 @@
+# app/services/notion_webhook.py
+"""Приём вебхуков Notion: проверка подписи, очередь id страниц, дебаунс-воркер.
+
+Notion присылает событие на каждую правку страницы (page.properties_updated,
+page.created, page.deleted, ...). Воркер копит id страниц, ждёт паузу
+WEBHOOK_DEBOUNCE секунд после последнего события (но не дольше
+WEBHOOK_MAX_DELAY) и синкает пачку через NotionSync.sync_pages — по
+pages.retrieve на страницу, без выборки всего сезона. Упавшая пачка
+(база или Notion недоступны) возвращается в очередь и повторяется с
+экспоненциальной паузой: Notion событие повторно не пришлёт.
+"""
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set
+
+from app.database.database import SessionLocal
+from app.models.bet import Bet
+from app.services.notion_sync import NotionSync, season_for_database
+
+WEBHOOK_SECRET = os.getenv("NOTION_WEBHOOK_SECRET")  # verification_token подписки
+WEBHOOK_SEASONS = [s.strip() for s in os.getenv("NOTION_WEBHOOK_SEASONS", os.getenv("DEFAULT_SEASON", "2024")).split(",") if s.strip()]
+WEBHOOK_DEBOUNCE = float(os.getenv("NOTION_WEBHOOK_DEBOUNCE", "3"))   # секунд тишины перед синком
+WEBHOOK_MAX_DELAY = float(os.getenv("NOTION_WEBHOOK_MAX_DELAY", "30"))  # не дольше от первого события
+WEBHOOK_RETRY_BASE = float(os.getenv("NOTION_WEBHOOK_RETRY_BASE", "5"))     # пауза после первой неудачи
+WEBHOOK_RETRY_MAX = float(os.getenv("NOTION_WEBHOOK_RETRY_MAX", "600"))     # потолок паузы
+
+DELETE_EVENTS = ("page.deleted",)
+
+
+def verify_signature(body: bytes, signature: Optional[str], secret: Optional[str] = None) -> bool:
+    """X-Notion-Signature: "sha256=" + HMAC-SHA256(тело запроса, verification_token)."""
+    secret = secret if secret is not None else WEBHOOK_SECRET
+    if not secret or not signature:
+        return False
+    expected = "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+class WebhookQueue:
+    """Очередь изменённых страниц с дебаунсом; воркер — фоновый поток на процесс."""
+
+    def __init__(self, debounce: float = WEBHOOK_DEBOUNCE, max_delay: float = WEBHOOK_MAX_DELAY,
+                 seasons: Optional[List[str]] = None, retry_base: float = WEBHOOK_RETRY_BASE,
+                 retry_max: float = WEBHOOK_RETRY_MAX):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.seasons = seasons if seasons is not None else WEBHOOK_SEASONS
+        self._pending: Dict[str, Dict[str, Any]] = {}  # page_id → {database_id, deleted}
+        self._first_at: Optional[float] = None
+        self._last_at: Optional[float] = None
+        self._retry_at: Optional[float] = None  # после неудачи пачка ждёт до этого момента
+        self._failures = 0  # неудач подряд
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"events": 0, "batches": 0, "pages": 0, "last_batch_at": None, "last_error": None,
+                      "failed_batches": 0, "retry_in": None}
+
+    def enqueue(self, event: Dict[str, Any]) -> bool:
+        """Событие Notion → id страницы в очередь; False — событие не про страницу."""
+        entity = event.get("entity") or {}
+        if entity.get("type") != "page" or not entity.get("id"):
+            return False
+        parent = (event.get("data") or {}).get("parent") or {}
+        with self._cond:
+            now = time.monotonic()
+            item = self._pending.setdefault(entity["id"], {"database_id": None, "deleted": False})
+            if parent.get("type") == "database":
+                item["database_id"] = parent.get("id")
+            # последнее событие решает: удалили и восстановили — страницу надо перечитать
+            item["deleted"] = event.get("type") in DELETE_EVENTS
+            self._first_at = self._first_at or now
+            self._last_at = now
+            self.stats["events"] += 1
+            self._cond.notify()
+        self._ensure_worker()
+        return True
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="notion-webhook", daemon=True)
+            self._thread.start()
+
+    def _take_batch(self) -> Dict[str, Dict[str, Any]]:
+        """Ждёт дебаунс и забирает всё накопленное."""
+        with self._cond:
+            while True:
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+                now = time.monotonic()
+                due = min(self._last_at + self.debounce, self._first_at + self.max_delay)
+                if self._retry_at is not None:
+                    due = max(due, self._retry_at)
+                if now >= due:
+                    batch, self._pending = self._pending, {}
+                    self._first_at = self._last_at = self._retry_at = None
+                    return batch
+                self._cond.wait(timeout=due - now)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            try:
+                self.flush(batch)
+                self._failures = 0
+                self.stats["retry_in"] = None
+            except Exception as e:
+                self.stats["last_error"] = str(e)
+                self.stats["failed_batches"] += 1
+                delay = self._requeue(batch)
+                print(f"[webhook] Batch of {len(batch)} failed, retry in {delay:.0f}s: {e}")
+
+    def _requeue(self, batch: Dict[str, Dict[str, Any]]) -> float:
+        """Упавшая пачка — обратно в очередь; повтор не раньше чем через паузу (×2 за неудачу)."""
+        with self._cond:
+            self._failures += 1
+            delay = min(self.retry_max, self.retry_base * 2 ** (self._failures - 1))
+            now = time.monotonic()
+            for page_id, item in batch.items():
+                self._pending.setdefault(page_id, item)  # пришедшее за время синка событие новее
+            self._first_at = self._first_at or now
+            self._last_at = self._last_at or now
+            self._retry_at = now + delay
+            self.stats["retry_in"] = delay
+            self._cond.notify()
+        return delay
+
+    def flush(self, batch: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Синк пачки: страницы группируются по сезону, на сезон — один NotionSync.sync_pages."""
+        db = SessionLocal()
+        try:
+            # сезон — у уже сохранённой ставки, для новых — по базе-родителю
+            known = dict(
+                db.query(Bet.notion_id, Bet.season).filter(Bet.notion_id.in_(list(batch))).all()
+            ) if batch else {}
+            by_season: Dict[str, Dict[str, Set[str]]] = defaultdict(lambda: {"pages": set(), "deleted": set()})
+            for page_id, item in batch.items():
+                season = known.get(page_id) or season_for_database(item["database_id"], self.seasons)
+                if season is None:
+                    print(f"[webhook] Skip {page_id}: unknown database {item['database_id']}")
+                    continue
+                by_season[season]["deleted" if item["deleted"] else "pages"].add(page_id)
+
+            results = {}
+            for season, ids in by_season.items():
+                results[season] = NotionSync(season=season).sync_pages(db, ids["pages"], deleted=ids["deleted"])
+                print(f"[webhook] Season {season}: {results[season]}")
+            self.stats["batches"] += 1
+            self.stats["pages"] += len(batch)
+            self.stats["last_batch_at"] = time.time()
+            return results
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+webhook_queue = WebhookQueue()
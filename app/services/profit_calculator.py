@@ -1,12 +1,37 @@
-from typing import List, Dict, Any
+import os
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from app.models.bet import Bet
 
+# Правила мани-менеджмента и их значения по умолчанию
+LADDER_DEFAULTS = {
+    "initial_bank": 2000,
+    "initial_nominal": 100,
+    "nominal_pct": 0.05,        # номинал = % от банка
+    "min_nominal": 100,
+    "max_nominal": 1000,
+    "reinvest_share": 1 / 3,    # доля профита месяца, идущая в банк
+    "combine_losses": True,     # правило суммы с предыдущим убыточным месяцем
+    "win_multiplier": 0.85,     # выигрыш = ставка * win_multiplier
+}
+
 class ProfitCalculator:
-    def __init__(self):
-        self.initial_bank = 2000
-        self.initial_nominal = 100
-        self.max_nominal = 1000  # Максимальный номинал
+    def __init__(self, **params):
+        unknown = set(params) - set(LADDER_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown ladder params: {', '.join(sorted(unknown))}")
+        settings = {**LADDER_DEFAULTS, **params}
+        self.initial_bank = settings["initial_bank"]
+        self.initial_nominal = settings["initial_nominal"]
+        self.nominal_pct = settings["nominal_pct"]
+        self.min_nominal = settings["min_nominal"]
+        self.max_nominal = settings["max_nominal"]  # Максимальный номинал
+        self.reinvest_share = settings["reinvest_share"]
+        self.combine_losses = bool(settings["combine_losses"])
+        self.win_multiplier = settings["win_multiplier"]
+
+    def params(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in LADDER_DEFAULTS}
         
     def get_first_monday(self, year, month):
         """Получить первый понедельник месяца"""
@@ -18,13 +43,13 @@ class ProfitCalculator:
     
     def calculate_nominal(self, bank):
         """Рассчитать номинал с учетом максимального значения"""
-        nominal = round(bank * 0.05)
+        nominal = round(bank * self.nominal_pct)
         # Ограничиваем максимальным значением
         if nominal > self.max_nominal:
             nominal = self.max_nominal
-        # Минимальный номинал 100
-        if nominal < 100:
-            nominal = 100
+        # Минимальный номинал (по умолчанию 100)
+        if nominal < self.min_nominal:
+            nominal = self.min_nominal
         return nominal
     
     def calculate_total_profit(self, bets: List[Bet]) -> Dict[str, Any]:
@@ -98,7 +123,7 @@ class ProfitCalculator:
                     
                     if bet.won is True:
                         # Выигрыш = ставка * 0.85
-                        win_amount = stake * 0.85
+                        win_amount = stake * self.win_multiplier
                         period_profit += win_amount
                         total_profit += win_amount
                         total_won += stake + win_amount  # Возврат ставки + выигрыш
@@ -136,7 +161,7 @@ class ProfitCalculator:
                 if period_end < end_date:
                     if period_profit > 0:
                         # Прибыльный месяц: добавляем 1/3 профита к банку
-                        bank_addition = period_profit / 3
+                        bank_addition = period_profit * self.reinvest_share
                         current_bank += bank_addition
                         new_nominal = self.calculate_nominal(current_bank)
                         
@@ -152,10 +177,10 @@ class ProfitCalculator:
                         print(f"  -> Убыточный: банк и номинал не меняются")
                         
                         # Проверка суммы с предыдущим месяцем
-                        if previous_month_profit < 0:
+                        if self.combine_losses and previous_month_profit < 0:
                             combined = period_profit + previous_month_profit
                             if combined > 0:
-                                bank_addition = combined / 3
+                                bank_addition = combined * self.reinvest_share
                                 current_bank += bank_addition
                                 new_nominal = self.calculate_nominal(current_bank)
                                 print(f"  -> Сумма с предыдущим месяцем > 0: добавка ${bank_addition:.2f}")
@@ -175,7 +200,7 @@ class ProfitCalculator:
         final_bank = self.initial_bank
         for period in periods:
             if period['profit'] > 0:
-                final_bank += period['profit'] / 3
+                final_bank += period['profit'] * self.reinvest_share
         
         print(f"\n=== ИТОГОВАЯ СТАТИСТИКА ===")
         print(f"Всего ставок: {total_wins + total_losses}")
@@ -195,4 +220,111 @@ class ProfitCalculator:
             "current_nominal": current_nominal,
             "current_bank": round(final_bank, 2),
             "periods": periods
-        }
\ No newline at end of file
+        }
+
+    def calculate_filtered_stats(
+        self,
+        season_profit: Dict[str, Any],
+        bets: List[Bet],
+        eff_start: Optional[datetime] = None,
+        eff_end: Optional[datetime] = None,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """Метрики по отфильтрованным ставкам: ставка = сезонный nominal периода.
+
+        season_profit — результат calculate_total_profit по всему сезону.
+        Периоды берутся целыми днями (конец периода — 23:59:59), будущие скрываем.
+        """
+        season_periods = season_profit.get("periods", [])
+
+        def period_for_date(dt: datetime | None):
+            if not dt:
+                return None
+            for p in season_periods:
+                ps = datetime.strptime(p["start"], "%Y-%m-%d")
+                pe = datetime.strptime(p["end"], "%Y-%m-%d") + timedelta(hours=23, minutes=59, seconds=59)  # <— КОНЕЦ ДНЯ
+                if ps <= dt <= pe:
+                    return p
+            return None
+
+        # ---------- метрики по фильтрам, ставка = сезонный nominal ----------
+        wins = 0
+        losses = 0
+        total_profit_money = 0.0
+        total_staked = 0.0
+        total_won = 0.0
+
+        for b in bets:
+            p = period_for_date(b.date)
+            stake = (p["nominal"] if p else self.initial_nominal)
+            total_staked += stake
+
+            if b.won is True:
+                wins += 1
+                win_amount = stake * self.win_multiplier
+                total_profit_money += win_amount
+                total_won += stake + win_amount
+            elif b.won is False:
+                losses += 1
+                total_profit_money -= stake
+
+        # ---------- таблица периодов для UI ----------
+        now = now or datetime.now()
+        periods = []
+        for p in season_periods:
+            ps = datetime.strptime(p["start"], "%Y-%m-%d")
+            pe = datetime.strptime(p["end"], "%Y-%m-%d") + timedelta(hours=23, minutes=59, seconds=59)  # <— КОНЕЦ ДНЯ
+            if pe > now:
+                break  # будущее не показываем
+
+            # пересечение с eff_start/eff_end
+            if eff_start and pe < eff_start:
+                continue
+            if eff_end and ps > eff_end:
+                continue
+
+            bets_in_period = [b for b in bets if b.date and ps <= b.date <= pe]
+            stake_per = p["nominal"]
+
+            wins_p = sum(1 for b in bets_in_period if b.won is True)
+            losses_p = sum(1 for b in bets_in_period if b.won is False)
+            profit_p = wins_p * stake_per * self.win_multiplier - losses_p * stake_per
+            staked_p = len(bets_in_period) * stake_per
+
+            periods.append({
+                "start": p["start"],
+                "end": p["end"],
+                "month": p["month"],
+                "bets": len(bets_in_period),
+                "wins": wins_p,
+                "losses": losses_p,
+                "profit": round(profit_p, 2),
+                "staked": round(staked_p, 2),
+                "nominal": p["nominal"],  # из сезонной шкалы
+                "bank": p["bank"],        # из сезонной шкалы
+                "win_rate": round((wins_p / len(bets_in_period) * 100), 1) if bets_in_period else 0
+            })
+
+        return {
+            "wins": wins,
+            "losses": losses,
+            "total_profit": total_profit_money,
+            "total_staked": total_staked,
+            "total_won": total_won,
+            "periods": periods,
+        }
+
+
+def get_profit_calculator(backend: Optional[str] = None, **params) -> ProfitCalculator:
+    """Калькулятор с нужным бэкендом: 'numpy' (по умолчанию) или 'python'.
+
+    Бэкенд выбирается через PROFIT_BACKEND; без numpy откатываемся на чистый Python.
+    """
+    backend = (backend or os.getenv("PROFIT_BACKEND") or "numpy").strip().lower()
+    if backend == "numpy":
+        try:
+            from app.services.vectorized_profit_calculator import VectorizedProfitCalculator
+        except ImportError:
+            return ProfitCalculator(**params)
+        return VectorizedProfitCalculator(**params)
+    return ProfitCalculator(**params)
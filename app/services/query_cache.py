@@ -0,0 +1,55 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.bet import Bet
+
+
+def data_version(db: Session, season: Optional[str] = None) -> Tuple:
+    """Дешёвый «отпечаток» данных сезона: число строк, max(id), max(updated_at).
+
+    Синк ставит updated_at на каждую изменённую ставку, новые ставки двигают
+    max(id), удаления — count. Одного такого запроса хватает, чтобы понять,
+    можно ли отдать закэшированный агрегат.
+    """
+    q = db.query(func.count(Bet.id), func.max(Bet.id), func.max(Bet.updated_at))
+    if season:
+        q = q.filter(Bet.season == season)
+    count, max_id, max_updated = q.one()
+    return int(count or 0), max_id, str(max_updated) if max_updated is not None else None
+
+
+class VersionedCache:
+    """Небольшой LRU-кэш агрегатов: значение живёт, пока не сменилась версия данных."""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[Hashable, Tuple[Any, Any]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, version: Any, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item[0] == version:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return item[1]
+            self.misses += 1
+
+        value = compute()  # вне блокировки: параллельные промахи просто посчитают дважды
+
+        with self._lock:
+            self._items[key] = (version, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
@@ -0,0 +1,234 @@
+import zlib
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import func, case, insert, text
+from sqlalchemy.orm import Session
+
+from app.models.bet import Bet
+from app.models.rollup import BetDailyRollup
+from app.services.vectorized_profit_calculator import to_us, NAT
+
+_ALL = object()  # «все сезоны» — в отличие от season=None (ставки без сезона)
+KEY_FIELDS = ("season", "day", "tournament", "bet_type", "is_premium")
+COUNT_FIELDS = ("bets", "wins", "losses", "unknown")
+ROLLUP_LOCK_CLASS = 7_301_025  # pg_advisory_xact_lock(класс, сезон) писателей роллапа
+
+
+def _as_date(value) -> Optional[date]:
+    """func.date() в SQLite отдаёт строку, в Postgres — date."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _season_lock_id(season: Optional[str]) -> int:
+    """Второй ключ advisory-лока: crc32 сезона в диапазоне int4."""
+    h = zlib.crc32((season or "").encode("utf-8"))
+    return h - (1 << 32) if h >= (1 << 31) else h
+
+
+class RollupService:
+    """Поддержка таблицы bet_daily_rollup: пересчёт дней, полная пересборка, сверка."""
+
+    _built = False  # проверка «таблица не пустая» — один раз на процесс
+
+    @staticmethod
+    def _lock_seasons(db: Session, seasons: Iterable[Optional[str]]) -> None:
+        """Лок роллапа сезонов до конца транзакции вызывающего (только Postgres).
+
+        Ключ (season, day, …) уникальностью не защитить — day, tournament и
+        bet_type бывают NULL, — поэтому пересчёт дня «delete + insert» у
+        ручного синка, вебхука и планировщика идёт по очереди на сезон.
+        Взявший лок следующим видит закоммиченные ставки предыдущего
+        (READ COMMITTED) и пересчитывает день уже с ними. Порядок сезонов
+        фиксирован — взаимных ожиданий между писателями нет.
+        """
+        if db.get_bind().dialect.name != "postgresql":
+            return  # SQLite сериализует запись сам
+        for season in sorted(set(seasons), key=lambda s: (s is not None, s or "")):
+            db.execute(text("SELECT pg_advisory_xact_lock(:c, :s)"),
+                       {"c": ROLLUP_LOCK_CLASS, "s": _season_lock_id(season)})
+
+    @staticmethod
+    def _aggregate(db: Session, season=_ALL,
+                   day_from: Optional[date] = None, day_to: Optional[date] = None,
+                   undated: bool = False) -> List[Dict]:
+        """Агрегаты из bets (GROUP BY по ключу роллапа)."""
+        day = func.date(Bet.date)
+        query = db.query(
+            Bet.season, day, Bet.tournament, Bet.bet_type, Bet.is_premium,
+            func.count(Bet.id),
+            func.sum(case((Bet.won == True, 1), else_=0)),
+            func.sum(case((Bet.won == False, 1), else_=0)),
+            func.sum(case((Bet.won == None, 1), else_=0)),
+        ).filter(Bet.is_deleted == False)
+        if season is not _ALL:
+            query = query.filter(Bet.season == season)
+        if undated:
+            query = query.filter(Bet.date == None)
+        if day_from is not None:
+            query = query.filter(Bet.date >= datetime.combine(day_from, datetime.min.time()))
+        if day_to is not None:
+            query = query.filter(Bet.date < datetime.combine(day_to + timedelta(days=1), datetime.min.time()))
+        query = query.group_by(Bet.season, day, Bet.tournament, Bet.bet_type, Bet.is_premium)
+
+        rows = []
+        for r in query.all():
+            rows.append({
+                "season": r[0], "day": _as_date(r[1]), "tournament": r[2],
+                "bet_type": r[3], "is_premium": r[4],
+                "bets": int(r[5] or 0), "wins": int(r[6] or 0),
+                "losses": int(r[7] or 0), "unknown": int(r[8] or 0),
+            })
+        return rows
+
+    @staticmethod
+    def refresh_days(db: Session, keys: Iterable[Tuple[Optional[str], Optional[date]]]) -> int:
+        """Пересчитывает роллап для затронутых (season, day). Коммит — на вызывающем."""
+        by_season: Dict[Optional[str], Set[Optional[date]]] = defaultdict(set)
+        for season, day in keys:
+            by_season[season].add(day)
+        if not by_season:
+            return 0
+
+        db.flush()  # autoflush выключен — агрегаты должны увидеть изменения сессии
+        RollupService._lock_seasons(db, by_season)  # до агрегатов: считать по свежим данным
+        written = 0
+        for season, days in by_season.items():
+            dated = sorted(d for d in days if d is not None)
+            rows = []
+            if dated:
+                rows += [r for r in RollupService._aggregate(db, season, dated[0], dated[-1]) if r["day"] in days]
+            if None in days:
+                rows += RollupService._aggregate(db, season, undated=True)
+
+            if dated:
+                db.query(BetDailyRollup).filter(
+                    BetDailyRollup.season == season, BetDailyRollup.day.in_(dated)
+                ).delete(synchronize_session=False)
+            if None in days:
+                db.query(BetDailyRollup).filter(
+                    BetDailyRollup.season == season, BetDailyRollup.day == None
+                ).delete(synchronize_session=False)
+            if rows:
+                db.execute(insert(BetDailyRollup), rows)
+            written += len(rows)
+        return written
+
+    @staticmethod
+    def rebuild(db: Session, season: Optional[str] = None) -> int:
+        """Полная пересборка роллапа (всего или одного сезона) из bets. Коммитит."""
+        if season is not None:
+            RollupService._lock_seasons(db, [season])
+        else:
+            RollupService._lock_seasons(db, [r[0] for r in db.query(Bet.season).distinct()]
+                                        + [r[0] for r in db.query(BetDailyRollup.season).distinct()])
+        q = db.query(BetDailyRollup)
+        if season is not None:
+            q = q.filter(BetDailyRollup.season == season)
+        q.delete(synchronize_session=False)
+        rows = RollupService._aggregate(db, season if season is not None else _ALL)
+        if rows:
+            db.execute(insert(BetDailyRollup), rows)
+        db.commit()
+        return len(rows)
+
+    @staticmethod
+    def ensure_built(db: Session) -> None:
+        """Если роллап пуст, а ставки есть (новая БД, перенос данных) — собираем его."""
+        if RollupService._built:
+            return
+        if db.query(BetDailyRollup.id).first() is None and db.query(Bet.id).first() is not None:
+            RollupService.rebuild(db)
+        RollupService._built = True
+
+    @staticmethod
+    def check(db: Session, season: Optional[str] = None) -> Dict:
+        """Сверка: агрегаты из bets против содержимого bet_daily_rollup."""
+        expected: Dict[tuple, tuple] = {}
+        for r in RollupService._aggregate(db, season if season is not None else _ALL):
+            expected[tuple(r[k] for k in KEY_FIELDS)] = tuple(r[k] for k in COUNT_FIELDS)
+
+        actual: Dict[tuple, tuple] = {}
+        q = db.query(BetDailyRollup)
+        if season is not None:
+            q = q.filter(BetDailyRollup.season == season)
+        for r in q.all():
+            key = tuple(getattr(r, k) for k in KEY_FIELDS)
+            counts = tuple(getattr(r, k) for k in COUNT_FIELDS)
+            prev = actual.get(key, (0, 0, 0, 0))
+            actual[key] = tuple(a + b for a, b in zip(prev, counts))  # дубли ключа тоже ловим
+
+        def describe(key, counts=None):
+            out = {k: (v.isoformat() if isinstance(v, date) else v) for k, v in zip(KEY_FIELDS, key)}
+            if counts is not None:
+                out.update(zip(COUNT_FIELDS, counts))
+            return out
+
+        missing = [describe(k, v) for k, v in expected.items() if k not in actual]
+        extra = [describe(k, v) for k, v in actual.items() if k not in expected]
+        mismatched = [
+            {**describe(k), "expected": dict(zip(COUNT_FIELDS, v)), "actual": dict(zip(COUNT_FIELDS, actual[k]))}
+            for k, v in expected.items() if k in actual and actual[k] != v
+        ]
+        return {
+            "consistent": not (missing or extra or mismatched),
+            "rollup_rows": len(actual),
+            "expected_rows": len(expected),
+            "missing": missing,
+            "extra": extra,
+            "mismatched": mismatched,
+        }
+
+    @staticmethod
+    def filtered_counts(
+        db: Session,
+        season: Optional[str] = None,
+        eff_start: Optional[datetime] = None,
+        eff_end: Optional[datetime] = None,
+        bet_types: Optional[List[str]] = None,
+        is_premium: Optional[bool] = None,
+        result: Optional[str] = None,
+        tournaments: Optional[List[str]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Фильтры /api/stats (без времени суток) по роллапу.
+
+        bet_types — точные названия из справочника (см. matching_bet_types),
+        None — без фильтра по типу. Возвращает (начало дня в мкс, ставок,
+        побед, поражений) по строкам роллапа. Границы eff_start/eff_end
+        в /api/stats всегда целые дни.
+        """
+        q = db.query(BetDailyRollup.day, BetDailyRollup.bets, BetDailyRollup.wins, BetDailyRollup.losses)
+        if season:
+            q = q.filter(BetDailyRollup.season == season)
+        if eff_start:
+            q = q.filter(BetDailyRollup.day >= eff_start.date())
+        if eff_end:
+            q = q.filter(BetDailyRollup.day <= eff_end.date())
+        if bet_types is not None:
+            q = q.filter(BetDailyRollup.bet_type.in_(bet_types))
+        if is_premium is not None:
+            q = q.filter(BetDailyRollup.is_premium == is_premium)
+        if tournaments:
+            q = q.filter(BetDailyRollup.tournament.in_(tournaments))
+        rows = q.all()
+
+        day_us = np.array([NAT if r.day is None else to_us(datetime.combine(r.day, datetime.min.time()))
+                           for r in rows], dtype=np.int64)
+        bets = np.array([r.bets or 0 for r in rows], dtype=np.int64)
+        wins = np.array([r.wins or 0 for r in rows], dtype=np.int64)
+        losses = np.array([r.losses or 0 for r in rows], dtype=np.int64)
+
+        if result and result != 'all':
+            if result.upper() == 'WIN':
+                bets, losses = wins.copy(), np.zeros_like(losses)
+            elif result.upper() == 'LOSE':
+                bets, wins = losses.copy(), np.zeros_like(wins)
+        return day_us, bets, wins, losses
@@ -0,0 +1,181 @@
+# app/services/screenshot_resolver.py
+"""Ссылка на скрин (prnt.sc) → прямой URL картинки.
+
+Один httpx.AsyncClient на процесс (keep-alive, HTTP/2, если стоит h2),
+TTL+LRU-кэш результатов, включая неудачи (отрицательный кэш с меньшим
+TTL), single-flight: одновременные запросы одного URL ждут одну загрузку.
+Одновременных запросов наружу — не больше SCREENSHOT_CONCURRENCY.
+httpx и bs4 импортируются при первом запросе, не при импорте модуля.
+"""
+import asyncio
+import importlib.util
+import os
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    import httpx
+
+SCREENSHOT_TTL = float(os.getenv("SCREENSHOT_TTL", "86400"))
+SCREENSHOT_NEGATIVE_TTL = float(os.getenv("SCREENSHOT_NEGATIVE_TTL", "300"))
+SCREENSHOT_CACHE_SIZE = int(os.getenv("SCREENSHOT_CACHE_SIZE", "5000"))
+SCREENSHOT_CONCURRENCY = int(os.getenv("SCREENSHOT_CONCURRENCY", "8"))
+SCREENSHOT_TIMEOUT = float(os.getenv("SCREENSHOT_TIMEOUT", "10"))
+
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+PAGE_HOSTS = ("prnt.sc",)  # страницы скринов, которые резолвер скачивает и разбирает
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+_MISS = object()
+
+
+def url_host(url: str) -> Optional[str]:
+    """Хост http(s)-ссылки в нижнем регистре; None — не http(s) или не разбирается."""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+    if parts.scheme not in ("http", "https"):
+        return None
+    return (parts.hostname or "").lower() or None
+
+
+def host_in(url: str, hosts: Iterable[str]) -> bool:
+    """Ссылка ведёт на один из хостов (или его поддомен)."""
+    host = url_host(url)
+    return host is not None and any(host == h or host.endswith("." + h) for h in hosts)
+
+
+def make_client(timeout: float = SCREENSHOT_TIMEOUT) -> "httpx.AsyncClient":
+    """Общий клиент: HTTP/2 — только если установлен пакет h2 (httpx[http2])."""
+    import httpx
+
+    return httpx.AsyncClient(
+        http2=importlib.util.find_spec("h2") is not None,
+        timeout=timeout,
+        follow_redirects=True,
+        headers={'User-Agent': USER_AGENT},
+        limits=httpx.Limits(max_connections=SCREENSHOT_CONCURRENCY * 2, max_keepalive_connections=SCREENSHOT_CONCURRENCY),
+    )
+
+
+def extract_image_url(html: str) -> Optional[str]:
+    """<img id="screenshot-image" src=...> со страницы prnt.sc."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    img_tag = soup.find('img', {'id': 'screenshot-image'}) or soup.find('img', class_='no-click screenshot-image')
+    if img_tag and img_tag.get('src'):
+        img_url = img_tag['src']
+        if not img_url.startswith('http'):
+            img_url = 'https:' + img_url
+        return img_url
+    return None
+
+
+class TTLCache:
+    """LRU на OrderedDict с временем жизни у каждой записи."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Tuple[float, Optional[str]]]" = OrderedDict()
+
+    def get(self, key: str):
+        item = self._data.get(key)
+        if item is None:
+            return _MISS
+        expires, value = item
+        if expires < time.monotonic():
+            del self._data[key]
+            return _MISS
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Optional[str], ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ScreenshotResolver:
+    def __init__(self, client: Optional["httpx.AsyncClient"] = None, ttl: float = SCREENSHOT_TTL,
+                 negative_ttl: float = SCREENSHOT_NEGATIVE_TTL, maxsize: int = SCREENSHOT_CACHE_SIZE,
+                 concurrency: int = SCREENSHOT_CONCURRENCY, page_hosts: Iterable[str] = PAGE_HOSTS):
+        self.client = client
+        self.page_hosts = tuple(page_hosts)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.cache = TTLCache(maxsize)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.stats = {"hits": 0, "misses": 0, "upstream": 0, "errors": 0, "coalesced": 0}
+
+    async def start(self) -> None:
+        if self.client is None:
+            self.client = make_client()
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def resolve(self, url: str) -> Optional[str]:
+        """Прямой URL картинки; для не-prnt.sc ссылок — сама ссылка, при ошибке — None.
+
+        Наружу ходим только за страницами с хостов page_hosts — по разобранному
+        хосту, а не по подстроке ("https://evil.example/?prnt.sc" не скачивается).
+        """
+        if not url:
+            return None
+        if url.endswith(IMAGE_SUFFIXES) or not host_in(url, self.page_hosts):
+            return url
+
+        cached = self.cache.get(url)
+        if cached is not _MISS:
+            self.stats["hits"] += 1
+            return cached
+        self.stats["misses"] += 1
+
+        inflight = self._inflight.get(url)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[url] = future
+        try:
+            value, ok = await self._fetch(url)
+            self.cache.set(url, value, self.ttl if ok else self.negative_ttl)
+            future.set_result(value)
+            return value
+        except BaseException as e:  # отмена запроса-владельца не должна вешать ожидающих
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(url, None)
+            if future.done() and not future.cancelled():
+                future.exception()  # помечаем как полученное — без «never retrieved» в логах
+
+    async def _fetch(self, url: str) -> Tuple[Optional[str], bool]:
+        import httpx
+
+        if self.client is None:
+            await self.start()
+        async with self._semaphore:
+            self.stats["upstream"] += 1
+            try:
+                response = await self.client.get(url)
+            except httpx.HTTPError as e:
+                print(f"Error fetching screenshot: {e}")
+                self.stats["errors"] += 1
+                return None, False
+        if response.status_code >= 500:
+            self.stats["errors"] += 1
+            return None, False
+        # картинки на странице нет — отдаём исходную ссылку, как раньше
+        return await asyncio.to_thread(extract_image_url, response.text) or url, True
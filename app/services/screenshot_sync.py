@@ -0,0 +1,71 @@
+# app/services/screenshot_sync.py
+"""Прямые ссылки на скрины в bets.screenshot_image_url.
+
+После синка новые screenshot_url резолвятся пачкой (параллельно, не больше
+SCREENSHOT_CONCURRENCY запросов наружу) и сохраняются — карточкам ставок
+больше не нужен /api/screenshot. Неудачные (None) остаются NULL и
+пробуются снова на следующем синке.
+"""
+import asyncio
+import os
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.bet import Bet
+from app.services.screenshot_resolver import ScreenshotResolver
+
+RESOLVE_ON_SYNC = os.getenv("SCREENSHOT_RESOLVE_ON_SYNC", "1") == "1"
+RESOLVE_LIMIT = int(os.getenv("SCREENSHOT_RESOLVE_LIMIT", "1000"))  # URL за один проход после синка
+
+
+async def resolve_many(urls: Iterable[str], resolver: Optional[ScreenshotResolver] = None) -> Dict[str, Optional[str]]:
+    """url → прямой URL картинки; параллельно, ограничение — семафор резолвера."""
+    urls = list(dict.fromkeys(u for u in urls if u))
+    own = resolver is None
+    if own:
+        resolver = ScreenshotResolver()
+        await resolver.start()
+    try:
+        images = await asyncio.gather(*(resolver.resolve(u) for u in urls))
+    finally:
+        if own:
+            await resolver.close()
+    return dict(zip(urls, images))
+
+
+def store_images(db: Session, images: Dict[str, Optional[str]]) -> int:
+    """Сохраняет найденные картинки во все ставки с этим screenshot_url. Не коммитит."""
+    updated = 0
+    for url, image in images.items():
+        if not image:
+            continue
+        updated += db.query(Bet).filter(
+            Bet.screenshot_url == url, Bet.screenshot_image_url == None
+        ).update({Bet.screenshot_image_url: image}, synchronize_session=False)
+    return updated
+
+
+def pending_urls(db: Session, season: Optional[str] = None, limit: int = RESOLVE_LIMIT):
+    query = db.query(Bet.screenshot_url).filter(
+        Bet.is_deleted == False,
+        Bet.screenshot_url != None,
+        Bet.screenshot_url != "",
+        Bet.screenshot_image_url == None,
+    )
+    if season:
+        query = query.filter(Bet.season == season)
+    return [url for (url,) in query.distinct().limit(limit)]
+
+
+def resolve_missing(db: Session, season: Optional[str] = None, limit: int = RESOLVE_LIMIT) -> Dict[str, int]:
+    """Резолвит ещё не разобранные скрины сезона и коммитит. Вызывать не из event loop (синк идёт в потоках)."""
+    urls = pending_urls(db, season, limit)
+    if not urls:
+        return {"pending": 0, "resolved": 0, "rows": 0}
+    images = asyncio.run(resolve_many(urls))
+    rows = store_images(db, images)
+    db.commit()
+    resolved = sum(1 for image in images.values() if image)
+    print(f"[screenshots] Resolved {resolved}/{len(urls)} URLs, rows updated: {rows}")
+    return {"pending": len(urls), "resolved": resolved, "rows": rows}
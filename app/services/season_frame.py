@@ -0,0 +1,139 @@
+from typing import Iterable, List, Dict, Any, Optional, Tuple
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.bet import Bet
+from app.services.vectorized_profit_calculator import (
+    VectorizedProfitCalculator, bets_to_arrays, to_us, NAT, WIN, LOSS,
+)
+
+_US_PER_DAY = 86_400 * 1_000_000
+
+
+def _encode(values: List[Optional[str]]) -> Tuple[np.ndarray, List[str]]:
+    """Строки → (коды int32, список значений). None кодируется как -1."""
+    index: Dict[str, int] = {}
+    codes = np.fromiter(
+        (-1 if v is None else index.setdefault(v, len(index)) for v in values),
+        dtype=np.int32,
+        count=len(values),
+    )
+    return codes, list(index)
+
+
+def _lookup(codes: np.ndarray, flags: List[bool]) -> np.ndarray:
+    """flags[code] для каждой строки; код -1 (NULL) всегда False, как и в SQL."""
+    table = np.array(flags + [False], dtype=bool)
+    return table[codes]
+
+
+def _time_us(hhmm: str) -> int:
+    t = datetime.strptime(hhmm, "%H:%M")
+    return (t.hour * 3600 + t.minute * 60) * 1_000_000
+
+
+class SeasonFrame:
+    """Колонки сезона в numpy-массивах: одна загрузка из БД на много фильтров.
+
+    Шкала bank/nominal считается один раз на сезон, а любой набор фильтров
+    /api/stats превращается в булеву маску по этим массивам.
+    """
+
+    def __init__(self, ts, outcome, tournament_codes, tournaments, bet_type_ids, premium):
+        self.ts = ts
+        self.outcome = outcome
+        self.tournament_codes = tournament_codes
+        self.tournaments = tournaments
+        self.bet_type_ids = bet_type_ids  # bet_type_id строки, -1 — NULL
+        self.premium = premium
+        self.calculator = VectorizedProfitCalculator()
+        self._season_profit = None
+
+    @classmethod
+    def load(cls, db: Session, season: Optional[str] = None) -> "SeasonFrame":
+        """Одна выборка нужных колонок сезона (без ORM-объектов)."""
+        query = db.query(Bet.date, Bet.won, Bet.tournament, Bet.bet_type_id, Bet.is_premium).filter(Bet.is_deleted == False)
+        if season:
+            query = query.filter(Bet.season == season)
+        rows = query.all()
+
+        ts, outcome = bets_to_arrays(rows)
+        tournament_codes, tournaments = _encode([r.tournament for r in rows])
+        bet_type_ids = np.fromiter(
+            (-1 if r.bet_type_id is None else r.bet_type_id for r in rows),
+            dtype=np.int64,
+            count=len(rows),
+        )
+        premium = np.fromiter(
+            (1 if r.is_premium is True else 0 if r.is_premium is False else -1 for r in rows),
+            dtype=np.int8,
+            count=len(rows),
+        )
+        return cls(ts, outcome, tournament_codes, tournaments, bet_type_ids, premium)
+
+    def __len__(self) -> int:
+        return int(self.ts.size)
+
+    def season_profit(self) -> Dict[str, Any]:
+        """Сезонная шкала (calculate_total_profit), считается один раз."""
+        if self._season_profit is None:
+            self._season_profit = self.calculator.calculate_from_arrays(self.ts, self.outcome)
+        return self._season_profit
+
+    def mask(
+        self,
+        eff_start: Optional[datetime] = None,
+        eff_end: Optional[datetime] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        bet_type_ids: Optional[Iterable[int]] = None,
+        is_premium: Optional[bool] = None,
+        result: Optional[str] = None,
+        tournaments: Optional[List[str]] = None,
+    ) -> np.ndarray:
+        """Те же фильтры, что и в /api/stats, в виде маски по строкам сезона.
+
+        bet_type_ids — id из справочника (matching_bet_types, как в /api/stats),
+        None — без фильтра по типу.
+        """
+        keep = np.ones(self.ts.shape, dtype=bool)
+        dated = self.ts != NAT
+
+        if eff_start:
+            keep &= dated & (self.ts >= to_us(eff_start))
+        if eff_end:
+            keep &= dated & (self.ts <= to_us(eff_end))
+
+        if bet_type_ids is not None:
+            keep &= np.isin(self.bet_type_ids, np.fromiter(bet_type_ids, dtype=np.int64))
+
+        if is_premium is not None:
+            keep &= self.premium == int(is_premium)
+
+        if result and result != 'all':
+            if result.upper() == 'WIN':
+                keep &= self.outcome == WIN
+            elif result.upper() == 'LOSE':
+                keep &= self.outcome == LOSS
+
+        if tournaments:
+            wanted = set(tournaments)
+            keep &= _lookup(self.tournament_codes, [v in wanted for v in self.tournaments])
+
+        if start_time or end_time:
+            time_of_day = self.ts % _US_PER_DAY
+            keep &= dated
+            if start_time:
+                keep &= time_of_day >= _time_us(start_time)
+            if end_time:
+                keep &= time_of_day <= _time_us(end_time)
+
+        return keep
+
+    def filtered_stats(self, keep: np.ndarray, eff_start=None, eff_end=None, now=None) -> Dict[str, Any]:
+        """calculate_filtered_stats для строк маски по сезонной шкале."""
+        return self.calculator.filtered_stats_from_arrays(
+            self.season_profit(), self.ts[keep], self.outcome[keep], eff_start, eff_end, now
+        )
@@ -3,12 +3,13 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from ..models.bet import Bet
 from ..services.nominal_calculator import NominalCalculator
+from ..services.bet_types import matching_bet_types
 
 class StatsCalculator:
     @staticmethod
     def calculate_stats(db: Session, filters: Dict = None) -> Dict:
         """Рассчитывает статистику по ставкам"""
-        query = db.query(Bet)
+        query = db.query(Bet).filter(Bet.is_deleted == False)
         
         # Применяем фильтры
         if filters:
@@ -19,7 +20,9 @@ class StatsCalculator:
             if filters.get('tournaments'):
                 query = query.filter(Bet.tournament.in_(filters['tournaments']))
             if filters.get('bet_type'):
-                query = query.filter(Bet.bet_type == filters['bet_type'])
+                # как в /api/stats: подстрока по справочнику, по bets — индекс bet_type_id
+                types = matching_bet_types(db, bet_type=filters['bet_type'])
+                query = query.filter(Bet.bet_type_id.in_([t.id for t in types]))
             if filters.get('is_premium') is not None:
                 query = query.filter(Bet.is_premium == filters['is_premium'])
         
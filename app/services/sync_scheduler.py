@@ -0,0 +1,257 @@
+# app/services/sync_scheduler.py
+"""Встроенный планировщик синка Notion (включается NOTION_SYNC_SCHEDULE).
+
+  NOTION_SYNC_SCHEDULE="2024=3600,2025=300"   # сезон=интервал в секундах
+
+Каждый сезон синкается по своему интервалу (± NOTION_SYNC_JITTER доли
+интервала): инкрементально — страницы, изменённые после старта прошлого
+удачного синка, и полностью раз в NOTION_SYNC_FULL_EVERY секунд (только
+полный синк видит удаления). После ошибки интервал растёт вдвое на каждую
+неудачу подряд, до NOTION_SYNC_MAX_BACKOFF.
+
+Расписание выполняет один процесс: на Postgres лидер держит advisory lock
+на отдельном соединении, остальные воркеры периодически пробуют его взять.
+Состояние сезонов лежит в таблице sync_state — статус видит любой воркер.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.database.database import get_engine
+from app.models.sync_state import SyncState
+from app.services.notion_sync import NotionSync
+
+SCHEDULE = os.getenv("NOTION_SYNC_SCHEDULE", "")  # пусто — планировщик выключен
+JITTER = float(os.getenv("NOTION_SYNC_JITTER", "0.1"))
+FULL_EVERY = float(os.getenv("NOTION_SYNC_FULL_EVERY", "86400"))
+MAX_BACKOFF = float(os.getenv("NOTION_SYNC_MAX_BACKOFF", "3600"))
+LEADER_RETRY = 60.0       # не-лидер пробует взять лок раз в минуту
+EDIT_OVERLAP = timedelta(minutes=2)  # last_edited_time в Notion округлён до минуты
+LEADER_LOCK_KEY = 7_301_024  # ключ pg_advisory_lock планировщика
+
+
+def parse_schedule(spec: str) -> Dict[str, float]:
+    """"2024=3600,2025=300" → {"2024": 3600.0, "2025": 300.0}."""
+    schedule: Dict[str, float] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        season, _, interval = item.partition("=")
+        try:
+            seconds = float(interval)
+        except ValueError:
+            raise ValueError(f"NOTION_SYNC_SCHEDULE: bad interval in '{item.strip()}'")
+        if not season.strip() or seconds <= 0:
+            raise ValueError(f"NOTION_SYNC_SCHEDULE: bad item '{item.strip()}'")
+        schedule[season.strip()] = seconds
+    return schedule
+
+
+def next_delay(interval: float, failures: int, jitter: float = JITTER, max_backoff: float = MAX_BACKOFF) -> float:
+    """Пауза до следующего запуска: интервал × 2^неудач (с потолком) ± jitter."""
+    delay = interval if failures <= 0 else min(max(interval, max_backoff), interval * (2 ** failures))
+    return max(1.0, delay * (1 + random.uniform(-jitter, jitter)))
+
+
+class LeaderLock:
+    """Лидерство через pg_try_advisory_lock; на других СУБД процесс всегда лидер."""
+
+    def __init__(self, engine: Optional[Engine] = None, key: int = LEADER_LOCK_KEY):
+        self._engine = engine
+        self.key = key
+        self._conn: Optional[Connection] = None
+
+    @property
+    def engine(self) -> Engine:
+        return self._engine or get_engine()
+
+    @property
+    def held(self) -> bool:
+        return self._conn is not None or self.engine.dialect.name != "postgresql"
+
+    def try_acquire(self) -> bool:
+        if self._conn is not None:
+            try:
+                self._conn.execute(text("SELECT 1"))  # соединение умерло — лок потерян
+                self._conn.commit()
+            except Exception:
+                self._conn.invalidate()
+                self._conn = None
+        if self.held:
+            return True
+        conn = self.engine.connect()
+        try:
+            got = conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": self.key}).scalar()
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        if got:
+            self._conn = conn  # лок живёт, пока открыто это соединение
+        else:
+            conn.close()
+        return bool(got)
+
+    def release(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": self.key})
+                self._conn.commit()
+            finally:
+                self._conn.close()
+                self._conn = None
+
+
+class SyncScheduler:
+    def __init__(self, schedule: Dict[str, float], session_factory, engine: Optional[Engine] = None,
+                 full_every: float = FULL_EVERY):
+        self.schedule = schedule
+        self.session_factory = session_factory
+        self.full_every = full_every
+        self.leader = LeaderLock(engine)
+        self._running: Dict[str, threading.Lock] = {season: threading.Lock() for season in schedule}
+        self._task: Optional[asyncio.Task] = None
+
+    # ---- один запуск (блокирующий, в пуле потоков) ----
+
+    def run_season(self, season: str, force_full: bool = False) -> Dict[str, Any]:
+        """Синк сезона с записью результата в sync_state; занятый сезон пропускается."""
+        lock = self._running.setdefault(season, threading.Lock())
+        if not lock.acquire(blocking=False):
+            return {"season": season, "skipped": "already running"}
+        try:
+            return self._run_locked(season, force_full)
+        finally:
+            lock.release()
+
+    def _run_locked(self, season: str, force_full: bool) -> Dict[str, Any]:
+        db: Session = self.session_factory()
+        try:
+            state = db.get(SyncState, season) or SyncState(season=season, consecutive_failures=0)
+            started = datetime.utcnow()
+            full = (
+                force_full
+                or state.last_success_at is None
+                or state.last_full_at is None
+                or (started - state.last_full_at).total_seconds() >= self.full_every
+            )
+            since = None if full else state.last_success_at - EDIT_OVERLAP
+
+            t0 = time.perf_counter()
+            try:
+                result = NotionSync(season=season).sync_with_notion(db, since=since)
+            except Exception as e:  # sync_with_notion ловит сам, это на всякий случай
+                result = {"success": False, "message": str(e), "stats": None}
+            duration = time.perf_counter() - t0
+
+            state = db.merge(state)
+            state.last_mode = "full" if full else "incremental"
+            state.last_started_at = started
+            state.last_finished_at = datetime.utcnow()
+            state.last_duration = round(duration, 3)
+            if result.get("success"):
+                state.last_status, state.last_error = "ok", None
+                state.last_success_at = started
+                if full:
+                    state.last_full_at = started
+                state.consecutive_failures = 0
+            else:
+                state.last_status, state.last_error = "error", (result.get("message") or "")[:1000]
+                state.consecutive_failures = (state.consecutive_failures or 0) + 1
+            state.next_run_at = state.last_finished_at + timedelta(
+                seconds=next_delay(self.schedule.get(season, 0) or 3600, state.consecutive_failures)
+            )
+            db.commit()
+            print(f"[scheduler] {season}: {state.last_mode} {state.last_status} in {duration:.1f}s, "
+                  f"next at {state.next_run_at.isoformat(timespec='seconds')}")
+            return {"season": season, "mode": state.last_mode, "status": state.last_status,
+                    "duration": state.last_duration, "stats": result.get("stats")}
+        finally:
+            db.close()
+
+    # ---- цикл ----
+
+    def _due(self) -> List[str]:
+        db: Session = self.session_factory()
+        try:
+            states = {s.season: s for s in db.query(SyncState).filter(SyncState.season.in_(list(self.schedule)))}
+        finally:
+            db.close()
+        now = datetime.utcnow()
+        return [
+            season for season in self.schedule
+            if season not in states or states[season].next_run_at is None or states[season].next_run_at <= now
+        ]
+
+    async def run(self) -> None:
+        print(f"[scheduler] Started: {self.schedule}")
+        while True:
+            try:
+                if not await asyncio.to_thread(self.leader.try_acquire):
+                    await asyncio.sleep(LEADER_RETRY)
+                    continue
+                due = await asyncio.to_thread(self._due)
+                # сезоны независимы — идут параллельно, каждый в своём потоке
+                await asyncio.gather(*(asyncio.to_thread(self.run_season, s) for s in due))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[scheduler] Tick failed: {e}")
+            await asyncio.sleep(self._tick())
+
+    def _tick(self) -> float:
+        return max(1.0, min(30.0, min(self.schedule.values()) / 4))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.leader.release)
+
+    # ---- статус ----
+
+    def status(self, db: Session) -> Dict[str, Any]:
+        return {
+            "enabled": True,
+            "leader": self.leader.held,
+            "schedule": self.schedule,
+            "seasons": sync_states(db),
+        }
+
+
+def sync_states(db: Session) -> List[Dict[str, Any]]:
+    def iso(value):
+        return value.isoformat(timespec="seconds") if value else None
+
+    return [
+        {
+            "season": s.season,
+            "lastMode": s.last_mode,
+            "lastStatus": s.last_status,
+            "lastError": s.last_error,
+            "lastStartedAt": iso(s.last_started_at),
+            "lastFinishedAt": iso(s.last_finished_at),
+            "lastDuration": s.last_duration,
+            "lastSuccessAt": iso(s.last_success_at),
+            "lastFullAt": iso(s.last_full_at),
+            "consecutiveFailures": s.consecutive_failures or 0,
+            "nextRunAt": iso(s.next_run_at),
+        }
+        for s in db.query(SyncState).order_by(SyncState.season)
+    ]
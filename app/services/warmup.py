@@ -0,0 +1,59 @@
+# app/services/warmup.py
+"""Прогрев кэшей на старте и готовность инстанса (/api/ready).
+
+После деплоя первый пользователь дашборда платил бы за шкалу bank/nominal,
+season-data и статистику по каждому сезону. Прогрев считает их в lifespan
+фоном — по сезону в своём потоке, параллельно; пока он не закончился,
+/api/ready отвечает 503 и платформа не шлёт на инстанс трафик.
+Выключается WARMUP_ON_START=0 (тогда инстанс готов сразу).
+"""
+import asyncio
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "1") == "1"
+
+
+class Warmup:
+    def __init__(self, enabled: bool = WARMUP_ON_START):
+        self.enabled = enabled
+        self.ready = not enabled
+        self.error: Optional[str] = None
+        self.duration: Optional[float] = None
+        self.seasons: Dict[str, Dict[str, Any]] = {}
+
+    async def run(self, prepare: Callable[[], Iterable[str]], warm_season: Callable[[str], None]) -> None:
+        """prepare() — общий шаг (роллап) и список сезонов; warm_season(s) — в потоке на сезон.
+
+        Готовность ставится и при ошибках: прогрев — ускорение, а не условие работы.
+        """
+        t0 = time.perf_counter()
+        try:
+            seasons = list(await asyncio.to_thread(prepare))
+            await asyncio.gather(*(self._season(s, warm_season) for s in seasons))
+        except Exception as e:
+            self.error = str(e)
+            print(f"[warmup] Failed: {e}")
+        finally:
+            self.duration = round(time.perf_counter() - t0, 3)
+            self.ready = True
+            print(f"[warmup] Done in {self.duration:.1f}s: {self.seasons}")
+
+    async def _season(self, season: str, warm_season: Callable[[str], None]) -> None:
+        t0 = time.perf_counter()
+        try:
+            await asyncio.to_thread(warm_season, season)
+            self.seasons[season] = {"status": "ok"}
+        except Exception as e:
+            self.seasons[season] = {"status": "error", "error": str(e)}
+        self.seasons[season]["duration"] = round(time.perf_counter() - t0, 3)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "enabled": self.enabled,
+            "duration": self.duration,
+            "error": self.error,
+            "seasons": self.seasons,
+        }
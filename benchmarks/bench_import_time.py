@@ -0,0 +1,69 @@
+# benchmarks/bench_import_time.py
+"""Бюджет на импорт main: python -X importtime, без БД и без тяжёлых модулей.
+
+Запуск:  python benchmarks/bench_import_time.py [--budget-ms 1000] [--runs 5]
+
+Импорт идёт в чистом процессе без DATABASE_URL/PG*: если main при импорте
+полезет в базу, импорт упадёт. Берётся лучшее из --runs (прогретый кэш ФС).
+Код выхода 1 — бюджет превышен или загружен модуль из DEFERRED.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# нужны только синку/скриншотам — грузятся при первом использовании
+DEFERRED = ("notion_client", "httpx", "bs4")
+DB_ENV = ("DATABASE_URL", "PGHOST", "POSTGRES_HOST")
+
+PROBE = (
+    "import sys, main; "
+    f"print('LOADED', ','.join(m for m in {DEFERRED!r} if m in sys.modules))"
+)
+
+
+def measure():
+    """(микросекунды на import main, загруженные отложенные модули)."""
+    env = {k: v for k, v in os.environ.items() if k not in DB_ENV}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"import main упал:\n{proc.stderr[-2000:]}")
+    total = None
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == "main":
+            total = int(parts[1])
+    loaded = [m for m in proc.stdout.split("LOADED", 1)[1].strip().split(",") if m]
+    return total, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=1000.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results = [measure() for _ in range(args.runs)]
+    best = min(total for total, _ in results) / 1000
+    loaded = sorted(set(m for _, mods in results for m in mods))
+    print(f"import main: best {best:.0f} ms of {args.runs} (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: при импорте загружены {', '.join(loaded)}")
+        failed = True
+    if best > args.budget_ms:
+        print("FAIL: бюджет превышен")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# benchmarks/bench_notion_parser.py
+"""Скорость разбора строк Notion: прежний разбор с ветвлениями vs compile_row_parser.
+
+Запуск:  python benchmarks/bench_notion_parser.py [--rows 20000]
+         python benchmarks/bench_notion_parser.py --pages-file dump.json
+dump.json — записанный ответ Notion: список страниц или {"results": [...]}
+(например, сохранённый из синка json.dump(results, f)).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")  # модели требуют URL, БД не используется
+
+from benchmarks.notion_fixtures import make_pages, schema_of
+from app.services.notion_parser import compile_row_parser, types_from_page
+
+
+# ---- прежний разбор из NotionSync.sync_with_notion (до компиляции по схеме) ----
+
+def _parse_text(prop):
+    if not prop:
+        return None
+    t = prop.get("type")
+    if t == "title" and prop.get("title"):
+        return prop["title"][0].get("plain_text")
+    if t == "rich_text" and prop.get("rich_text"):
+        return "".join(x.get("plain_text", "") for x in prop["rich_text"])
+    if t == "select" and prop.get("select"):
+        return prop["select"].get("name")
+    return None
+
+
+def _parse_number(prop):
+    if not prop:
+        return None
+    t = prop.get("type")
+    if t == "number":
+        return prop.get("number")
+    if t == "formula":
+        f = prop.get("formula") or {}
+        if f.get("type") == "number":
+            return f.get("number")
+    return None
+
+
+def _parse_formula(prop):
+    if not prop or prop.get("type") != "formula":
+        return None
+    f = prop.get("formula") or {}
+    if f.get("type") == "string":
+        return f.get("string")
+    if f.get("type") == "number":
+        return f.get("number")
+    if f.get("type") == "boolean":
+        return f.get("boolean")
+    return None
+
+
+def _parse_date(prop):
+    if not prop:
+        return None
+    if prop.get("type") == "date" and prop.get("date"):
+        s = prop["date"].get("start")
+        if not s:
+            return None
+        try:
+            return datetime.fromisoformat(s.replace("Z", "+00:00"))
+        except Exception:
+            return None
+    return None
+
+
+def _parse_checkbox(prop):
+    if not prop:
+        return False
+    if prop.get("type") == "checkbox":
+        return prop.get("checkbox", False)
+    return False
+
+
+def _parse_url_or_text_url(prop):
+    if not prop:
+        return None
+    t = prop.get("type")
+    if t == "url":
+        return prop.get("url")
+    if t == "rich_text" and prop.get("rich_text"):
+        return prop["rich_text"][0].get("plain_text")
+    return None
+
+
+def legacy_parse(row):
+    p = row.get("properties", {})
+    date = _parse_date(p.get("Date"))
+    tournament = _parse_text(p.get("Турнир"))
+    team1 = _parse_text(p.get("Команда 1"))
+    team2 = _parse_text(p.get("Команда 2"))
+    match = f"{team1} vs {team2}" if team1 and team2 else None
+    bet_type = _parse_text(p.get("Ставка"))
+    total_value = _parse_number(p.get("Значение тотала"))
+    score = _parse_text(p.get("Итог"))
+
+    result_prop = p.get("Результат")
+    result_text = None
+    won = None
+    if result_prop and result_prop.get("type") == "formula":
+        result_text = _parse_formula(result_prop)
+    elif result_prop:
+        result_text = _parse_text(result_prop)
+    if result_text:
+        if "✅" in result_text:
+            won, result_text = True, "WIN"
+        elif "❌" in result_text:
+            won, result_text = False, "LOSE"
+        else:
+            won, result_text = None, "-"
+    else:
+        won, result_text = None, "-"
+
+    stake = 100.0
+    profit_prop = p.get("Потенциальный профит")
+    profit = None
+    if profit_prop and profit_prop.get("type") == "formula":
+        profit = _parse_formula(profit_prop)
+    elif profit_prop:
+        profit = _parse_number(profit_prop)
+    if profit is None and won is not None:
+        profit = stake * 0.85 if won else -stake
+
+    is_premium = _parse_checkbox(p.get("Премиум"))
+    time_str = _parse_text(p.get("Время ставки"))
+    screenshot_url = _parse_url_or_text_url(p.get("Скрин из бота"))
+    match_url = None
+    if "Ссылка на матч" in p:
+        prop_url = p["Ссылка на матч"]
+        if prop_url.get("type") == "url" and prop_url.get("url"):
+            match_url = prop_url["url"]
+
+    return (row.get("id"), date, tournament, team1, team2, match,
+            bet_type, total_value, score, result_text, won, profit, is_premium, time_str,
+            screenshot_url, match_url)
+
+
+def as_baseline(page, parsed):
+    """Строка compile_row_parser в виде прежнего разбора.
+
+    Прежний разбор отдавал datetime со смещением Notion, новый — наивный UTC.
+    Aware-значения сравниваются по моменту времени: сдвиг на смещение — расхождение.
+    """
+    row = tuple(parsed)
+    date = row[1]
+    start = ((page["properties"].get("Date") or {}).get("date") or {}).get("start") or ""
+    if date is not None and ("+" in start[10:] or "-" in start[10:] or start.endswith("Z")):
+        date = date.replace(tzinfo=timezone.utc)
+    return row[:1] + (date,) + row[2:]
+
+
+def rows_per_second(fn, rows, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for row in rows:
+            fn(row)
+        best = min(best, time.perf_counter() - t0)
+    return len(rows) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000, help="строк в синтетике")
+    parser.add_argument("--pages-file", default=None, help="записанные страницы Notion (JSON)")
+    args = parser.parse_args()
+
+    if args.pages_file:
+        with open(args.pages_file, encoding="utf-8") as f:
+            data = json.load(f)
+        pages = data["results"] if isinstance(data, dict) else data
+        types = types_from_page(pages[0])
+    else:
+        pages = make_pages(args.rows)
+        types = {name: p["type"] for name, p in schema_of(pages[0])["properties"].items()}
+
+    parse = compile_row_parser(types)
+    mismatched = sum(1 for row in pages if as_baseline(row, parse(row)) != legacy_parse(row))
+
+    legacy = rows_per_second(legacy_parse, pages)
+    compiled = rows_per_second(parse, pages)
+    print(f"rows: {len(pages)}  mismatched: {mismatched}")
+    print(f"legacy   {legacy:>12,.0f} rows/s")
+    print(f"compiled {compiled:>12,.0f} rows/s  (x{compiled / legacy:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/bench_profit_calculator.py
+"""Сравнение ProfitCalculator (чистый Python) и VectorizedProfitCalculator (NumPy).
+
+Запуск:  python benchmarks/bench_profit_calculator.py [--sizes 10000,100000,1000000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")  # модели требуют URL, БД не используется
+
+import numpy as np
+
+from app.services.profit_calculator import ProfitCalculator
+from app.services.vectorized_profit_calculator import VectorizedProfitCalculator, bets_to_arrays
+
+SyntheticBet = namedtuple("SyntheticBet", ["date", "won"])
+
+
+def make_bets(n: int, seed: int = 42):
+    """Детерминированный сезон: 2024-08-01 .. 2025-06-30, ~54% побед, 5% без результата."""
+    rng = np.random.default_rng(seed)
+    start = datetime(2024, 8, 1)
+    span = int((datetime(2025, 6, 30, 23, 59) - start).total_seconds())
+    seconds = np.sort(rng.integers(0, span, size=n))
+    u = rng.random(n)
+    won = [True if x < 0.54 * 0.95 else (None if x > 0.95 else False) for x in u]
+    return [SyntheticBet(start + timedelta(seconds=int(s)), w) for s, w in zip(seconds, won)]
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # ProfitCalculator печатает отчёт по периодам
+        out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def same(a, b, keys):
+    return all(abs(a[k] - b[k]) < 0.05 for k in keys)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--skip-python-above", type=int, default=None,
+                        help="не гонять чистый Python на размерах больше указанного")
+    args = parser.parse_args()
+
+    py_calc = ProfitCalculator()
+    np_calc = VectorizedProfitCalculator()
+    now = datetime(2025, 7, 15)
+
+    print(f"{'bets':>9} | {'ladder py':>10} {'ladder np':>10} {'np arrays':>10} "
+          f"| {'filtered py':>11} {'filtered np':>11} | match")
+    for n in [int(x) for x in args.sizes.split(",")]:
+        bets = make_bets(n)
+        subset = bets[::3]  # «отфильтрованные» ставки — треть сезона
+
+        np_season, t_np = timed(np_calc.calculate_total_profit, bets)
+        _, t_arr = timed(np_calc.calculate_from_arrays, *bets_to_arrays(bets))  # без конвертации объектов
+        np_filtered, tf_np = timed(np_calc.calculate_filtered_stats, np_season, subset, None, None, now)
+
+        if args.skip_python_above and n > args.skip_python_above:
+            print(f"{n:>9} | {'-':>10} {t_np:>9.3f}s {t_arr:>9.3f}s | {'-':>11} {tf_np:>10.3f}s | -")
+            continue
+
+        py_season, t_py = timed(py_calc.calculate_total_profit, bets)
+        py_filtered, tf_py = timed(py_calc.calculate_filtered_stats, py_season, subset, None, None, now)
+
+        ok = (
+            same(py_season, np_season, ["total_profit", "total_staked", "current_bank", "current_nominal"])
+            and py_season["periods"] == np_season["periods"]
+            and same(py_filtered, np_filtered, ["total_profit", "total_staked", "wins", "losses"])
+            and py_filtered["periods"] == np_filtered["periods"]
+        )
+        print(f"{n:>9} | {t_py:>9.3f}s {t_np:>9.3f}s {t_arr:>9.3f}s "
+              f"| {tf_py:>10.3f}s {tf_np:>10.3f}s | {'ok' if ok else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# benchmarks/bench_screenshot_resolver.py
+"""/api/screenshot: новый клиент на запрос (как было) vs ScreenshotResolver.
+
+Запуск:  python benchmarks/bench_screenshot_resolver.py [--requests 400] [--unique 40] [--latency 0.05]
+
+Поднимает локальный HTTP-сервер-заглушку вместо prnt.sc (страница с
+<img id="screenshot-image">, /prnt.sc/fail-* отвечает 503) и гоняет
+одновременные запросы. Проверяет, что резолвер ходит наружу один раз на
+уникальный URL (single-flight + кэш), а неудачи попадают в отрицательный кэш.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.screenshot_resolver import USER_AGENT, ScreenshotResolver, extract_image_url
+
+
+class StubServer:
+    """prnt.sc-заглушка в фоновом потоке; считает запросы и соединения."""
+
+    def __init__(self, latency: float):
+        stub = self
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                time.sleep(latency)
+                if "/fail" in self.path:
+                    body, status = b"upstream error", 503
+                else:
+                    key = self.path.rsplit("/", 1)[-1]
+                    body = (f'<html><body><img class="no-click screenshot-image" id="screenshot-image" '
+                            f'src="//image.prntscr.com/image/{key}.png"></body></html>').encode()
+                    status = 200
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}/prnt.sc"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def reset(self):
+        self.requests = self.connections = 0
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+async def old_handler(url):
+    """Прежний get_screenshot_proxy: свой AsyncClient на каждый запрос, без кэша."""
+    async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
+        response = await client.get(url, headers={'User-Agent': USER_AGENT})
+        return extract_image_url(response.text) or url
+
+
+async def run_all(resolve, urls, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(url):
+        async with semaphore:
+            return await resolve(url)
+
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(one(u) for u in urls))
+    return results, time.perf_counter() - t0
+
+
+async def main_async(args):
+    stub = StubServer(args.latency)
+    rng = random.Random(42)
+    unique = [f"{stub.base}/{i:06x}" for i in range(args.unique)]
+    urls = [rng.choice(unique) for _ in range(args.requests)]
+    try:
+        old, old_t = await run_all(old_handler, urls, args.concurrency)
+        print(f"old:      {old_t:7.3f}s  upstream={stub.requests:4d}  connections={stub.connections}")
+        stub.reset()
+
+        resolver = ScreenshotResolver(concurrency=args.concurrency, page_hosts=("127.0.0.1",))  # заглушка вместо prnt.sc
+        await resolver.start()
+        try:
+            new, new_t = await run_all(resolver.resolve, urls, args.concurrency)
+            print(f"resolver: {new_t:7.3f}s  upstream={stub.requests:4d}  connections={stub.connections}  "
+                  f"stats={resolver.stats}")
+            assert new == old, "резолвер вернул не то, что прежний обработчик"
+            assert stub.requests == len(set(urls)), "на уникальный URL должен быть один запрос наружу"
+
+            # отрицательный кэш: 503 → None, повтор не идёт наружу
+            stub.reset()
+            failed = [f"{stub.base}/fail-{i}" for i in range(5)]
+            first = await asyncio.gather(*(resolver.resolve(u) for u in failed * 3))
+            again = await asyncio.gather(*(resolver.resolve(u) for u in failed))
+            assert all(v is None for v in first + again)
+            assert stub.requests == len(failed), stub.requests
+            print(f"negative: {len(failed)} failing URLs × 4 → upstream={stub.requests}")
+        finally:
+            await resolver.close()
+        print(f"speedup:  {old_t / new_t:.1f}x")
+    finally:
+        stub.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--unique", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.05, help="задержка заглушки, сек")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
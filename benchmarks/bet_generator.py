@@ -0,0 +1,208 @@
+# benchmarks/bet_generator.py
+"""Детерминированный генератор ставок для бенчмарков (1k … 1M строк).
+
+  python benchmarks/bet_generator.py --bets 100000 --database-url sqlite:///bench.sqlite3
+  python benchmarks/bet_generator.py --bets 1000000 --csv bets.csv   # для COPY в Postgres
+
+Сезон — октябрь … середина июня, как у баскетбола. Турниры с весами и
+своим временем начала матчей по Москве (NBA ночью, Европа вечером), тип
+ставки, линия под турнир, счёт вокруг линии — исход согласован со счётом.
+~15% премиум, ~3% без результата. Один seed — одни и те же строки.
+Загрузка идёт через SQLAlchemy (SQLite и Postgres одинаково), bet_type_id
+и семейства — через BetTypeResolver, роллап собирается RollupService.
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Sequence
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# турнир → (вес, линия тотала матча, часы начала матчей по Москве)
+TOURNAMENTS = {
+    "NBA":        (0.40, 224.5, (2, 3, 3, 4, 4, 5)),
+    "Euroleague": (0.20, 161.5, (19, 20, 21, 21, 22)),
+    "VTB":        (0.15, 163.5, (15, 17, 19, 19)),
+    "NCAA":       (0.15, 141.5, (1, 2, 3, 3, 4)),
+    "ACB":        (0.10, 162.5, (17, 19, 21, 22)),
+}
+# тип ставки → (вес, доля линии матча)
+BET_TYPES = {
+    "ТБ":              (0.30, 1.0),
+    "ТМ":              (0.25, 1.0),
+    "ТБ 1-я половина": (0.12, 0.5),
+    "ТМ 1-я половина": (0.10, 0.5),
+    "ИТБ":             (0.08, 0.5),
+    "ИТМ":             (0.07, 0.5),
+    "ТБ 1-я четверть": (0.05, 0.25),
+    "ТМ 1-я четверть": (0.03, 0.25),
+}
+PREMIUM_SHARE = 0.15
+NO_RESULT_SHARE = 0.03
+STAKE = 100.0
+COEFFICIENT = 1.85
+
+COLUMNS = (
+    "notion_id", "date", "tournament", "match", "team1", "team2", "bet_type", "coefficient",
+    "total_value", "score", "total_points", "result", "won", "stake", "profit", "potential_profit",
+    "is_premium", "screenshot_url", "time", "match_url", "season", "is_deleted", "created_at", "updated_at",
+)
+
+
+def season_span(season: str):
+    """«2024» / «2024-2025» → 1 октября 2024 … 15 июня 2025."""
+    year = int(season.split("-")[0])
+    return datetime(year, 10, 1), datetime(year + 1, 6, 15)
+
+
+def generate_bets(n: int, season: str = "2024", seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """n ставок сезона в порядке дат; значения — колонки таблицы bets."""
+    rng = random.Random(f"{seed}:{season}")
+    start, end = season_span(season)
+    days = (end - start).days
+    names, weights = list(TOURNAMENTS), [t[0] for t in TOURNAMENTS.values()]
+    type_names, type_weights = list(BET_TYPES), [t[0] for t in BET_TYPES.values()]
+
+    rows = []
+    for _ in range(n):
+        tournament = rng.choices(names, weights)[0]
+        _, line, hours = TOURNAMENTS[tournament]
+        day = start + timedelta(days=rng.randrange(days))
+        rows.append((day + timedelta(hours=rng.choice(hours), minutes=rng.choice((0, 0, 15, 30, 45))), tournament, line))
+    rows.sort(key=lambda r: r[0])
+
+    for i, (date, tournament, line) in enumerate(rows):
+        team1, team2 = f"{tournament} Team {rng.randrange(30)}", f"{tournament} Team {rng.randrange(30, 60)}"
+        bet_type = rng.choices(type_names, type_weights)[0]
+        share = BET_TYPES[bet_type][1]
+        total_value = round(line * share + rng.randrange(-8, 9)) + 0.5
+
+        # счёт вокруг линии матча; исход ставки — по нужной части счёта
+        points1 = max(40, int(rng.gauss(line / 2, 11)))
+        points2 = max(40, int(rng.gauss(line / 2, 11)))
+        if bet_type.startswith("И"):
+            actual = points1
+        else:
+            actual = (points1 + points2) * share + rng.gauss(0, 4 * share)
+        over = actual > total_value
+        won = over if "ТБ" in bet_type else not over
+
+        settled = rng.random() >= NO_RESULT_SHARE
+        if not settled:
+            won = None
+        result = "" if won is None else ("✅ Выигрыш" if won else "❌ Проигрыш")
+        profit = 0.0 if won is None else (round(STAKE * (COEFFICIENT - 1), 2) if won else -STAKE)
+
+        key = f"{seed:04x}{i:012x}"
+        yield {
+            "notion_id": f"gen-{season}-{key}",
+            "date": date,
+            "tournament": tournament,
+            "match": f"{team1} vs {team2}",
+            "team1": team1,
+            "team2": team2,
+            "bet_type": bet_type,
+            "coefficient": COEFFICIENT,
+            "total_value": total_value,
+            "score": f"{points1}-{points2}" if settled else None,
+            "total_points": points1 + points2 if settled else None,
+            "result": result,
+            "won": won,
+            "stake": STAKE,
+            "profit": profit,
+            "potential_profit": round(STAKE * (COEFFICIENT - 1), 2),
+            "is_premium": rng.random() < PREMIUM_SHARE,
+            "screenshot_url": f"https://prnt.sc/{key}",
+            "time": date.strftime("%H:%M"),
+            "match_url": f"https://www.flashscore.com/match/{key}/",
+            "season": season,
+            "is_deleted": False,
+            "created_at": start,
+            "updated_at": start,
+        }
+
+
+def split_sizes(n: int, seasons: Sequence[str]) -> List[int]:
+    base, extra = divmod(n, len(seasons))
+    return [base + (1 if k < extra else 0) for k in range(len(seasons))]
+
+
+def load(db, n: int, seasons: Sequence[str] = ("2024", "2025"), seed: int = 42, chunk: int = 10000) -> int:
+    """Вставка n ставок (поровну по сезонам) + справочник типов, margin и роллап. Коммитит."""
+    from sqlalchemy import insert
+
+    from app.models.bet import Bet
+    from app.services.bet_fields import line_margin
+    from app.services.bet_types import BetTypeResolver
+    from app.services.rollup_service import RollupService
+
+    resolver = BetTypeResolver(db)
+    total = 0
+    for season, size in zip(seasons, split_sizes(n, seasons)):
+        batch: List[Dict[str, Any]] = []
+        for row in generate_bets(size, season, seed):
+            row["bet_type_id"], row["bet_category"], row["bet_family"] = resolver.resolve(row["bet_type"])
+            row["margin"] = line_margin(row["total_points"], row["total_value"], row["bet_family"])
+            batch.append(row)
+            if len(batch) >= chunk:
+                db.execute(insert(Bet), batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            db.execute(insert(Bet), batch)
+            total += len(batch)
+        db.commit()
+    RollupService.rebuild(db)
+    return total
+
+
+def write_csv(path: str, n: int, seasons: Sequence[str], seed: int) -> int:
+    """CSV для `COPY bets (колонки) FROM ... WITH (FORMAT csv, HEADER)`; bet_type_id проставит migrate.py."""
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for season, size in zip(seasons, split_sizes(n, seasons)):
+            for row in generate_bets(size, season, seed):
+                writer.writerow(["" if row[c] is None else row[c] for c in COLUMNS])
+                written += 1
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bets", type=int, default=100000)
+    parser.add_argument("--seasons", default="2024,2025")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None, help="куда грузить (таблицы создаются init_db)")
+    parser.add_argument("--csv", default=None, help="вместо загрузки — CSV для COPY")
+    args = parser.parse_args()
+    seasons = [s.strip() for s in args.seasons.split(",") if s.strip()]
+
+    t0 = time.perf_counter()
+    if args.csv:
+        written = write_csv(args.csv, args.bets, seasons, args.seed)
+        print(f"{written} ставок → {args.csv} за {time.perf_counter() - t0:.1f}s")
+        return
+    if not args.database_url:
+        parser.error("нужен --database-url или --csv")
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from app.database.database import SessionLocal, get_engine
+    from app.database.init_db import init_db
+
+    init_db(get_engine())
+    db = SessionLocal()
+    try:
+        written = load(db, args.bets, seasons, args.seed)
+    finally:
+        db.close()
+    print(f"{written} ставок загружено за {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# benchmarks/notion_fixtures.py
+"""Синтетические страницы базы ставок в формате ответа Notion API.
+
+Структура свойств повторяет то, что читает NotionSync; «лишние» свойства
+(заметки, служебные поля, формулы для UI) имитируют реальную базу, где
+колонок больше, чем нужно синку.
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+TOURNAMENTS = ["NBA", "Euroleague", "VTB", "NCAA", "ACB"]
+BET_TYPES = ["ТБ", "ТМ", "ТБ 1-я половина", "ТМ 1-я половина", "ИТБ", "ИТМ"]
+
+
+def _rich(text: Optional[str]) -> List[Dict[str, Any]]:
+    if text is None:
+        return []
+    return [{
+        "type": "text",
+        "text": {"content": text, "link": None},
+        "annotations": {"bold": False, "italic": False, "strikethrough": False,
+                        "underline": False, "code": False, "color": "default"},
+        "plain_text": text,
+        "href": None,
+    }]
+
+
+def _user(uid: str) -> Dict[str, Any]:
+    return {"object": "user", "id": uid}
+
+
+def make_page(i: int, rng: random.Random, season_start: datetime = datetime(2024, 8, 1),
+              edited: Optional[str] = None) -> Dict[str, Any]:
+    d = season_start + timedelta(seconds=rng.randrange(330 * 86400))
+    u = rng.random()
+    result = "✅ Выигрыш" if u < 0.52 else ("❌ Проигрыш" if u < 0.95 else "")
+    t1, t2 = f"Team {rng.randrange(30)}", f"Team {rng.randrange(30, 60)}"
+    line = 140.5 + rng.randrange(60)
+    s1, s2 = rng.randrange(60, 130), rng.randrange(60, 130)
+    score = f"{s1}-{s2}" + (" (OT)" if rng.random() < 0.05 else "")
+    created = (d - timedelta(hours=3)).strftime("%Y-%m-%dT%H:%M:00.000Z")
+    edited = edited or (d + timedelta(hours=4)).strftime("%Y-%m-%dT%H:%M:00.000Z")
+
+    props = {
+        "Date": {"id": "%3DdAt", "type": "date",
+                 "date": {"start": d.strftime("%Y-%m-%dT%H:%M:00.000+03:00"), "end": None, "time_zone": None}},
+        "Турнир": {"id": "tUrN", "type": "select",
+                   "select": {"id": "s" + str(i % 5), "name": TOURNAMENTS[i % len(TOURNAMENTS)], "color": "blue"}},
+        "Команда 1": {"id": "title", "type": "title", "title": _rich(t1)},
+        "Команда 2": {"id": "kM2%3F", "type": "rich_text", "rich_text": _rich(t2)},
+        "Ставка": {"id": "sTaV", "type": "select",
+                   "select": {"id": "b" + str(i % 6), "name": BET_TYPES[i % len(BET_TYPES)], "color": "green"}},
+        "Значение тотала": {"id": "zNtT", "type": "number", "number": line},
+        "Итог": {"id": "iTog", "type": "rich_text", "rich_text": _rich(score)},
+        "Результат": {"id": "rEzL", "type": "formula", "formula": {"type": "string", "string": result}},
+        "Потенциальный профит": {"id": "pPrf", "type": "formula", "formula": {"type": "number", "number": None}},
+        "Премиум": {"id": "pRem", "type": "checkbox", "checkbox": i % 5 == 0},
+        "Время ставки": {"id": "vRem", "type": "rich_text", "rich_text": _rich(d.strftime("%H:%M"))},
+        "Скрин из бота": {"id": "sKrn", "type": "url", "url": f"https://prnt.sc/{i:08x}"},
+        "Ссылка на матч": {"id": "lInk", "type": "url", "url": f"https://www.flashscore.com/match/{i:08x}/"},
+        # --- свойства, которые синк не читает ---
+        "Комментарий": {"id": "kOmm", "type": "rich_text",
+                        "rich_text": _rich("Разбор: темп высокий, ротация короткая, линия завышена. " * 3)},
+        "Теги": {"id": "tEgi", "type": "multi_select",
+                 "multi_select": [{"id": "m1", "name": "лайв", "color": "red"},
+                                  {"id": "m2", "name": "кэф 1.85", "color": "gray"}]},
+        "Коэффициент": {"id": "kOef", "type": "number", "number": 1.85},
+        "Номинал (формула)": {"id": "nOmF", "type": "formula", "formula": {"type": "number", "number": 100}},
+        "Банк (rollup)": {"id": "bAnk", "type": "rollup",
+                          "rollup": {"type": "number", "number": 2000 + i, "function": "sum"}},
+        "Месяц": {"id": "mEsc", "type": "relation",
+                  "relation": [{"id": f"00000000-0000-0000-0000-{d.month:012d}"}], "has_more": False},
+        "Создано": {"id": "cRtd", "type": "created_time", "created_time": created},
+        "Изменено": {"id": "eDtd", "type": "last_edited_time", "last_edited_time": edited},
+        "Автор": {"id": "aVtr", "type": "created_by", "created_by": _user("a6f1c1a3-0000-4000-8000-000000000001")},
+        "Статус разбора": {"id": "sTat", "type": "status",
+                           "status": {"id": "st1", "name": "Готово", "color": "green"}},
+    }
+    return {
+        "object": "page",
+        "id": f"{i:08x}-0000-4000-8000-{i:012x}",
+        "created_time": created,
+        "last_edited_time": edited,
+        "created_by": _user("a6f1c1a3-0000-4000-8000-000000000001"),
+        "last_edited_by": _user("a6f1c1a3-0000-4000-8000-000000000001"),
+        "cover": None,
+        "icon": None,
+        "parent": {"type": "database_id", "database_id": "5c4b0e1e-0000-4000-8000-000000000000"},
+        "archived": False,
+        "in_trash": False,
+        "properties": props,
+        "url": f"https://www.notion.so/{i:032x}",
+        "public_url": None,
+    }
+
+
+def make_pages(n: int, seed: int = 42, **kwargs) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [make_page(i, rng, **kwargs) for i in range(n)]
+
+
+def schema_of(page: Dict[str, Any]) -> Dict[str, Any]:
+    """Ответ databases.retrieve для базы с такими же свойствами."""
+    return {
+        "object": "database",
+        "id": page["parent"]["database_id"],
+        "properties": {name: {"id": p["id"], "name": name, "type": p["type"]}
+                       for name, p in page["properties"].items()},
+    }
+
+
+def project(page: Dict[str, Any], property_ids) -> Dict[str, Any]:
+    """Страница так, как её вернёт Notion с filter_properties."""
+    wanted = set(property_ids)
+    out = dict(page)
+    out["properties"] = {k: v for k, v in page["properties"].items() if v["id"] in wanted}
+    return out
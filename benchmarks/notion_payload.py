@@ -0,0 +1,97 @@
+# benchmarks/notion_payload.py
+"""Размер ответа Notion и время разбора JSON: все свойства vs filter_properties.
+
+Синтетика (по умолчанию, без сети):
+    python benchmarks/notion_payload.py [--pages 3000]
+Живая база сезона (нужны NOTION_TOKEN_*/NOTION_DATABASE_* как для синка):
+    python benchmarks/notion_payload.py --live --season 2024
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")  # модели требуют URL, БД не используется
+
+from benchmarks.notion_fixtures import make_pages, project, schema_of
+from app.services.notion_fetcher import NotionFetcher, SYNC_PROPERTIES
+
+
+def decode_time(bodies, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for body in bodies:
+            json.loads(body)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def synthetic_bodies(n: int):
+    pages = make_pages(n)
+    schema = schema_of(pages[0])
+    ids = [schema["properties"][name]["id"] for name in SYNC_PROPERTIES]
+
+    def responses(items):
+        out = []
+        for k in range(0, len(items), 100):
+            chunk = items[k:k + 100]
+            out.append(json.dumps({
+                "object": "list", "results": chunk, "has_more": k + 100 < len(items),
+                "next_cursor": None, "type": "page_or_database", "page_or_database": {},
+            }, ensure_ascii=False).encode("utf-8"))
+        return out
+
+    return responses(pages), responses([project(p, ids) for p in pages])
+
+
+def live_bodies(season: str):
+    from app.services.notion_sync import NotionSync
+
+    sync = NotionSync(season=season)
+    bodies = []
+
+    def record(response):
+        response.read()
+        bodies.append(response.content)
+
+    sync.notion.client.event_hooks["response"].append(record)
+    fetcher = NotionFetcher(sync.notion, sync.database_id)
+
+    fetcher.query_all(project=False)
+    full = bodies[:]
+    bodies.clear()
+    fetcher.property_ids()  # схема базы — отдельный запрос, в замер не входит
+    bodies.clear()
+    fetcher.query_all(filter=fetcher.season_filter(season))
+    return full, bodies[:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=3000, help="страниц в синтетике")
+    parser.add_argument("--live", action="store_true", help="мерить на живой базе Notion")
+    parser.add_argument("--season", default=os.getenv("DEFAULT_SEASON", "2024"))
+    args = parser.parse_args()
+
+    full, slim = live_bodies(args.season) if args.live else synthetic_bodies(args.pages)
+
+    rows = []
+    for name, bodies in (("all properties", full), ("filter_properties", slim)):
+        size = sum(len(b) for b in bodies)
+        pages = sum(len(json.loads(b).get("results", [])) for b in bodies)
+        rows.append((name, len(bodies), pages, size, decode_time(bodies)))
+
+    print(f"{'mode':<18} {'requests':>8} {'pages':>7} {'bytes':>12} {'KB/page':>8} {'json.loads':>11}")
+    for name, n_req, pages, size, t in rows:
+        per_page = size / 1024 / max(pages, 1)
+        print(f"{name:<18} {n_req:>8} {pages:>7} {size:>12,} {per_page:>8.2f} {t * 1000:>9.1f}ms")
+    (_, _, _, full_size, full_t), (_, _, _, slim_size, slim_t) = rows
+    if full_size:
+        print(f"payload: -{(1 - slim_size / full_size) * 100:.0f}%, decode: -{(1 - slim_t / full_t) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
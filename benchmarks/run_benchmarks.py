@@ -0,0 +1,211 @@
+# benchmarks/run_benchmarks.py
+"""Набор бенчмарков горячих путей на синтетических сезонах, результат — JSON.
+
+  python benchmarks/run_benchmarks.py [--sizes 1000,10000,100000] [--out bench.json]
+  python benchmarks/run_benchmarks.py --sizes 1000000 --database-url postgresql://... --reset
+  python benchmarks/run_benchmarks.py --out new.json --compare old.json   # сравнить коммиты
+
+На каждый размер база пересоздаётся (drop_all + init_db) и заполняется
+bet_generator с одним и тем же seed. Эндпоинты гоняются через TestClient
+(с сериализацией ответа), агрегатный кэш перед каждым замером чистится —
+меряется расчёт, а не попадание в кэш (кроме *_cached). Синк — разбор
+синтетических страниц Notion и apply_parsed_rows: новые строки и повтор
+без изменений. Postgres сносит все таблицы базы — только с --reset.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def timed(fn: Callable[[], Any], repeat: int, before: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    runs = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # калькулятор и синк печатают отчёты
+            fn()
+        runs.append((time.perf_counter() - t0) * 1000)
+    return {
+        "best_ms": round(min(runs), 3),
+        "median_ms": round(statistics.median(runs), 3),
+        "mean_ms": round(statistics.fmean(runs), 3),
+        "runs": len(runs),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_size(n: int, args, seasons: List[str]) -> List[Dict[str, Any]]:
+    from fastapi.testclient import TestClient
+
+    import main
+    from app.database.database import Base, SessionLocal, get_engine
+    from app.database.init_db import init_db
+    from app.models.bet import Bet
+    from app.services.notion_parser import compile_row_parser, types_from_page
+    from app.services.notion_sync import apply_parsed_rows
+    from app.services.profit_calculator import ProfitCalculator
+    from app.services.rollup_service import RollupService
+    from app.services.vectorized_profit_calculator import VectorizedProfitCalculator
+    from benchmarks.bet_generator import load
+    from benchmarks.notion_fixtures import make_pages
+
+    engine = get_engine()
+    Base.metadata.drop_all(bind=engine)
+    init_db(engine)
+    RollupService._built = False
+    main.aggregate_cache.clear()
+
+    results: List[Dict[str, Any]] = []
+
+    def record(op: str, stats: Dict[str, float]) -> None:
+        results.append({"bets": n, "op": op, **stats})
+        print(f"{n:>9} {op:<26} best {stats['best_ms']:>10.2f} ms   median {stats['median_ms']:>10.2f} ms")
+
+    db = SessionLocal()
+    try:
+        record("load", timed(lambda: load(db, n, seasons, args.seed), 1))
+
+        season = seasons[-1]
+        first_month = db.query(Bet.date).filter(Bet.season == season).order_by(Bet.date).first()[0].strftime("%Y-%m")
+        client = TestClient(main.app)  # без with: lifespan (прогрев, планировщик) не нужен
+        cold = main.aggregate_cache.clear
+
+        def get(path: str, **params):
+            def call():
+                response = client.get(path, params=params)
+                response.raise_for_status()
+            return call
+
+        record("get_bets", timed(get("/api/bets"), args.repeat))
+        record("get_bets_month", timed(get("/api/bets", month=first_month), args.repeat))
+        record("get_stats", timed(get("/api/stats", season=season), args.repeat, cold))
+        record("get_stats_cached", timed(get("/api/stats", season=season), args.repeat))
+        record("get_stats_filtered", timed(get("/api/stats", season=season, tournaments="NBA,VTB",
+                                               bet_category="over", is_premium="false"), args.repeat, cold))
+        record("get_stats_time_of_day", timed(get("/api/stats", season=season, start_time="18:00",
+                                                  end_time="23:59"), args.repeat, cold))
+        record("get_periods", timed(get("/api/periods", season=season), args.repeat, cold))
+        record("get_season_data", timed(get("/api/season-data", season=season), args.repeat, cold))
+
+        ladder_rows = (db.query(Bet.date, Bet.won)
+                       .filter(Bet.season == season, Bet.is_deleted == False)
+                       .order_by(Bet.date.asc()).all())
+        if n <= args.python_max:
+            python_calc = ProfitCalculator()
+            record("calculate_total_profit_py", timed(lambda: python_calc.calculate_total_profit(ladder_rows), args.repeat))
+        vector_calc = VectorizedProfitCalculator()
+        record("calculate_total_profit_np", timed(lambda: vector_calc.calculate_total_profit(ladder_rows), args.repeat))
+
+        # синк: разбор страниц и запись — в отдельный сезон, чтобы не задеть данные выше
+        pages = make_pages(min(n, args.sync_max), seed=args.seed)
+        parse = compile_row_parser(types_from_page(pages[0]))
+        record("sync_parse", timed(lambda: [parse(p) for p in pages], args.repeat))
+        parsed = [parse(p) for p in pages]
+
+        def upsert():
+            apply_parsed_rows(db, "bench-sync", parsed)
+            db.commit()
+
+        def clear_sync_season():
+            db.query(Bet).filter(Bet.season == "bench-sync").delete(synchronize_session=False)
+            db.commit()
+
+        record("sync_upsert_new", timed(upsert, 1, clear_sync_season))
+        record("sync_upsert_unchanged", timed(upsert, args.repeat))
+        clear_sync_season()
+    finally:
+        db.close()
+    return results
+
+
+def compare(current: Dict[str, Any], baseline_path: str, threshold: float) -> bool:
+    """Печатает сравнение с прошлым прогоном; True — есть замедления больше порога."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    old = {(r["bets"], r["op"]): r for r in baseline["results"]}
+    print(f"\nСравнение с {baseline_path} ({baseline['meta'].get('commit')} → {current['meta'].get('commit')}):")
+    regressed = False
+    for r in current["results"]:
+        prev = old.get((r["bets"], r["op"]))
+        if prev is None or r["op"] == "load" or not prev["best_ms"]:
+            continue
+        ratio = r["best_ms"] / prev["best_ms"]
+        mark = ""
+        if ratio > 1 + threshold:
+            mark, regressed = "  REGRESSION", True
+        print(f"{r['bets']:>9} {r['op']:<26} {prev['best_ms']:>10.2f} → {r['best_ms']:>10.2f} ms  x{ratio:.2f}{mark}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--seasons", default="2024,2025")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default=None, help="по умолчанию — временный SQLite-файл")
+    parser.add_argument("--reset", action="store_true", help="разрешить drop_all на не-SQLite базе")
+    parser.add_argument("--python-max", type=int, default=200000, help="чистый Python-калькулятор — до этого размера")
+    parser.add_argument("--sync-max", type=int, default=20000, help="страниц Notion в бенчмарке синка, не больше")
+    parser.add_argument("--out", default="bench.json")
+    parser.add_argument("--compare", default=None, help="JSON прошлого прогона")
+    parser.add_argument("--threshold", type=float, default=0.2, help="доля замедления, считающаяся регрессией")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='betbench-'), 'bench.sqlite3')}"
+    if not url.startswith("sqlite") and not args.reset:
+        parser.error("бенчмарк пересоздаёт все таблицы базы — для не-SQLite добавьте --reset")
+    os.environ["DATABASE_URL"] = url
+    os.environ.setdefault("WARMUP_ON_START", "0")
+    os.environ.setdefault("SCREENSHOT_RESOLVE_ON_SYNC", "0")
+
+    seasons = [s.strip() for s in args.seasons.split(",") if s.strip()]
+    results: List[Dict[str, Any]] = []
+    for n in [int(x) for x in args.sizes.split(",")]:
+        results += run_size(n, args, seasons)
+
+    from app.database.database import get_engine
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": get_engine().dialect.name,
+            "seed": args.seed,
+            "seasons": seasons,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты: {args.out}")
+
+    if args.compare and compare(report, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
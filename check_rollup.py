@@ -0,0 +1,40 @@
+# check_rollup.py
+"""Сверка bet_daily_rollup с таблицей bets.
+
+  python check_rollup.py [--season 2024] [--fix]
+"""
+import argparse
+
+from app.database.database import SessionLocal, engine
+from app.models.bet import Base
+from app.models.rollup import BetDailyRollup  # noqa: F401
+from app.services.rollup_service import RollupService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--season", default=None)
+    parser.add_argument("--fix", action="store_true", help="пересобрать роллап, если есть расхождения")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        report = RollupService.check(db, args.season)
+        print(f"Строк в роллапе: {report['rollup_rows']}, ожидается: {report['expected_rows']}")
+        print(f"Нет в роллапе: {len(report['missing'])}, лишних: {len(report['extra'])}, "
+              f"расходятся: {len(report['mismatched'])}")
+        for item in (report["missing"] + report["extra"] + report["mismatched"])[:20]:
+            print(f"  {item}")
+
+        if report["consistent"]:
+            print("OK: роллап совпадает с bets")
+        elif args.fix:
+            rows = RollupService.rebuild(db, args.season)
+            print(f"Роллап пересобран: {rows} строк")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
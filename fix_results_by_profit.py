@@ -1,5 +1,8 @@
+from datetime import datetime
+
 from app.database.database import SessionLocal
 from app.models.bet import Bet
+from app.services.rollup_service import RollupService
 
 def fix_results_by_profit():
     db = SessionLocal()
@@ -17,16 +20,21 @@ def fix_results_by_profit():
                 # Положительный профит = выигрыш
                 bet.won = True
                 bet.result = "WIN"
+                bet.updated_at = datetime.utcnow()
+                bet.content_hash = None  # правка в обход синка — следующий синк перепишет строку из Notion
                 wins_count += 1
             elif bet.profit < 0:
                 # Отрицательный профит = проигрыш
                 bet.won = False
                 bet.result = "LOSE"
+                bet.updated_at = datetime.utcnow()
+                bet.content_hash = None
                 losses_count += 1
         else:
             no_result_count += 1
     
     db.commit()
+    RollupService.rebuild(db)  # won поменялся в обход синка — дневной роллап пересобираем
     
     print(f"\n=== РЕЗУЛЬТАТЫ ИСПРАВЛЕНИЯ ===")
     print(f"Выигрышей: {wins_count}")
@@ -1,36 +1,83 @@
-from fastapi import Header, FastAPI, Depends, HTTPException, Query
+from fastapi import Header, FastAPI, Depends, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, Response
 from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional, List
-import os, logging
+import asyncio, os, logging, json
 from calendar import monthrange
+from contextlib import asynccontextmanager
 
 
-from dotenv import load_dotenv
 from sqlalchemy import text, func, case
 
-from app.database.database import engine, SessionLocal, Base as DBBase, get_db
-from app.models.bet import Base, Bet  # используем Base из моделей для create_all
+# .env читает app.database.database при импорте — до констант ниже
+from app.database.database import SessionLocal, get_db, get_engine
+from app.models.bet import Bet
+from app.models.sync_failure import SyncFailure
 from app.services.notion_sync import NotionSync
-from app.services.profit_calculator import ProfitCalculator
+from app.services.notion_webhook import WEBHOOK_SECRET, verify_signature, webhook_queue
+from app.services.sync_scheduler import SCHEDULE, SyncScheduler, parse_schedule, sync_states
+from app.services.screenshot_resolver import ScreenshotResolver
+from app.services.screenshot_sync import resolve_many, store_images
+from app.services.image_cache import CACHE_CONTROL, IMAGE_CACHE_DIR, ImageCache, etag_matches, is_allowed_source
+from app.services.warmup import Warmup
+from app.services.profit_calculator import get_profit_calculator
+from app.services.season_frame import SeasonFrame
+from app.services.bankroll_simulator import BankrollSimulator, cast_param, summarize
+from app.services.equity_curve import equity_curve
+from app.services.rollup_service import RollupService
+from app.services.breakdown_service import BreakdownService, BREAKDOWN_FIELDS
+from app.services.query_cache import VersionedCache, data_version
+from app.services.margin_stats import margin_stats
+from app.services.bet_types import (
+    CATEGORY_CODES, FAMILY_CODES, list_bet_types, matching_bet_types, parse_code,
+)
+from app.services.monte_carlo import MonteCarloSimulator, run_monte_carlo
+from app.services.vectorized_profit_calculator import VectorizedProfitCalculator
+from app.schemas.stats import StatsBatchRequest
+from app.schemas.simulation import SimulateRequest, MonteCarloRequest
+from app.schemas.screenshot import ScreenshotBatchRequest
 
 
 # ===== env / init =====
-load_dotenv()
+# схема БД — отдельным шагом (python migrate.py), импорт main в базу не ходит
+logging.getLogger("uvicorn").info(f"PORT env = {os.getenv('PORT')}")
 
-# создаём таблицы при старте (на нужной БД)
-Base.metadata.create_all(bind=engine)
+SYNC_SCHEDULE = parse_schedule(SCHEDULE)
+scheduler = SyncScheduler(SYNC_SCHEDULE, SessionLocal) if SYNC_SCHEDULE else None
+image_cache = ImageCache() if IMAGE_CACHE_DIR else None  # /api/screenshot?image=true
+warmup = Warmup()
 
-logging.getLogger("uvicorn").info(f"PORT env = {os.getenv('PORT')}")
 
-app = FastAPI(title="BetReports API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # один HTTP-клиент и кэш резолвера скриншотов на процесс (клиент — при первом запросе)
+    app.state.screenshots = ScreenshotResolver()
+    warmup_task = asyncio.create_task(warmup.run(_warmup_prepare, _warm_season)) if warmup.enabled else None
+    if scheduler is not None:
+        scheduler.start()
+    try:
+        yield
+    finally:
+        if warmup_task is not None and not warmup_task.done():
+            warmup_task.cancel()
+        if scheduler is not None:
+            await scheduler.stop()
+        await app.state.screenshots.close()
+
+
+app = FastAPI(title="BetReports API", lifespan=lifespan)
 
 
 
 ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
 DEFAULT_SEASON = os.getenv("DEFAULT_SEASON", "2024")
+STATS_FROM_ROLLUP = os.getenv("STATS_FROM_ROLLUP", "1") == "1"
+
+# агрегаты, которые живут до смены данных сезона (см. data_version)
+aggregate_cache = VersionedCache(maxsize=256)
 
 
 # ===== health =====
@@ -38,9 +85,16 @@ DEFAULT_SEASON = os.getenv("DEFAULT_SEASON", "2024")
 def health():
     return {"api": "ok"}
 
+@app.get("/api/ready")
+def ready():
+    """200 — прогрев кэшей закончен и инстанс можно пускать в балансировку."""
+    if not warmup.ready:
+        raise HTTPException(status_code=503, detail=warmup.status())
+    return warmup.status()
+
 @app.get("/api/health/db")
 def health_db():
-    with engine.connect() as conn:
+    with get_engine().connect() as conn:
         conn.execute(text("SELECT 1"))
     return {"db": "ok"}
 
@@ -62,6 +116,22 @@ def read_root():
 
 
 # ===== Bets =====
+def _bet_type_filter(db: Session, bet_type: Optional[str], bet_category: Optional[str], bet_family: Optional[str]):
+    """Подходящие строки справочника типов ставок; None — фильтра по типу нет."""
+    try:
+        category = parse_code(bet_category, CATEGORY_CODES, "bet_category")
+        family = parse_code(bet_family, FAMILY_CODES, "bet_family")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return matching_bet_types(db, bet_type, category, family)
+
+
+@app.get("/api/bet-types")
+def get_bet_types(db: Session = Depends(get_db)):
+    """Справочник типов ставок (для выпадающих списков фильтров)."""
+    return {"bet_types": list_bet_types(db)}
+
+
 @app.get("/api/bets")
 def get_bets(
     start_date: Optional[str] = None,
@@ -73,12 +143,14 @@ def get_bets(
     result: Optional[str] = None,
     month: Optional[str] = None,
     tournaments: Optional[str] = Query(None),
+    bet_category: Optional[str] = None,  # 'over' | 'under' | 'other'
+    bet_family: Optional[str] = None,    # 'total' | 'half' | 'quarter' | 'team_total' | 'other'
     limit: int = 10000,
     offset: int = 0,
     db: Session = Depends(get_db)
 ):
     """Получение списка ставок с фильтрацией"""
-    query = db.query(Bet)
+    query = db.query(Bet).filter(Bet.is_deleted == False)
 
     # Фильтр по месяцу YYYY-MM
     if month:
@@ -98,9 +170,10 @@ def get_bets(
         end_dt = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
         query = query.filter(Bet.date < end_dt)
 
-    # Тип ставки
-    if bet_type and bet_type != 'all':
-        query = query.filter(Bet.bet_type.contains(bet_type))
+    # Тип ставки — через справочник, по bets фильтр по индексу bet_type_id
+    bet_types = _bet_type_filter(db, bet_type, bet_category, bet_family)
+    if bet_types is not None:
+        query = query.filter(Bet.bet_type_id.in_([t.id for t in bet_types]))
 
     # Премиум
     if is_premium is not None:
@@ -144,6 +217,88 @@ def get_bets(
 
 
 # ===== Stats =====
+def _stats_window(month: Optional[str], start_date: Optional[str], end_date: Optional[str]):
+    """Пересечение month и date-range → (eff_start, eff_end, конфликт фильтров)."""
+    eff_start = None
+    eff_end = None
+
+    m_start = m_end = None
+    if month:
+        try:
+            y, m = month.split('-')
+            y = int(y); m = int(m)
+            m_start = datetime(y, m, 1)
+            m_end = datetime(y, m, monthrange(y, m)[1], 23, 59, 59)
+        except Exception:
+            pass
+
+    d_start = datetime.strptime(start_date, "%Y-%m-%d") if start_date else None
+    d_end = (datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1) - timedelta(seconds=1)) if end_date else None
+
+    if m_start or d_start:
+        eff_start = max([d for d in [m_start, d_start] if d], default=None)
+        eff_end   = min([d for d in [m_end, d_end] if d],   default=None)
+        if eff_start and eff_end and eff_start > eff_end:
+            return eff_start, eff_end, True
+    return eff_start, eff_end, False
+
+
+def _season_ladder(db: Session, season: Optional[str], calculator) -> dict:
+    """Сезонная шкала bank/nominal по всем ставкам сезона (кэш до смены данных сезона)."""
+    def compute():
+        season_q = db.query(Bet.date, Bet.won).filter(Bet.is_deleted == False)
+        if season:
+            season_q = season_q.filter(Bet.season == season)
+        season_bets_all = season_q.order_by(Bet.date.asc()).all()
+        return calculator.calculate_total_profit(season_bets_all)
+
+    key = ("ladder", season, type(calculator).__name__)
+    return aggregate_cache.get_or_compute(key, data_version(db, season), compute)
+
+
+def _empty_stats(filter_conflict: bool) -> dict:
+    return {
+        "filterConflict": filter_conflict,
+        "totalBets": 0,
+        "winRate": 0.0,
+        "totalProfit": 0.0,
+        "totalStaked": 0.0,
+        "totalWon": 0.0,
+        "roi": 0.0,
+        "wins": 0,
+        "losses": 0,
+        "currentNominal": 100,
+        "currentBank": 2000,
+        "periods": []
+    }
+
+
+def _stats_response(total_bets: int, filtered: dict, season_profit: dict) -> dict:
+    """Ответ /api/stats из метрик calculate_filtered_stats и сезонной шкалы."""
+    wins = filtered["wins"]
+    losses = filtered["losses"]
+    total_profit_money = filtered["total_profit"]
+    total_staked = filtered["total_staked"]
+
+    win_rate = (wins / total_bets * 100) if total_bets > 0 else 0.0
+    roi = (total_profit_money / total_staked * 100) if total_staked > 0 else 0.0
+
+    return {
+        "filterConflict": False,
+        "totalBets": total_bets,
+        "winRate": round(win_rate, 1),
+        "totalProfit": round(total_profit_money, 2),
+        "totalStaked": round(total_staked, 2),
+        "totalWon": round(filtered["total_won"], 2),
+        "roi": round(roi, 1),
+        "wins": int(wins),
+        "losses": int(losses),
+        "currentNominal": season_profit.get("current_nominal", 100),
+        "currentBank": season_profit.get("current_bank", 2000),
+        "periods": filtered["periods"]
+    }
+
+
 @app.get("/api/stats")
 def get_stats(
     # даты
@@ -159,6 +314,8 @@ def get_stats(
     month: Optional[str] = None,        # 'YYYY-MM'
     season: Optional[str] = None,
     tournaments: Optional[str] = Query(None),
+    bet_category: Optional[str] = None,  # 'over' | 'under' | 'other'
+    bet_family: Optional[str] = None,    # 'total' | 'half' | 'quarter' | 'team_total' | 'other'
 
     db: Session = Depends(get_db)
 ):
@@ -166,44 +323,59 @@ def get_stats(
     Считаем шкалу bank/nominal на всём сезоне, а метрики — по фильтрам,
     используя сезонный nominal каждого периода. Будущие периоды скрываем.
     """
-    # ---------- 1) пересечение month и date-range ----------
-    eff_start = None
-    eff_end = None
-
-    m_start = m_end = None
-    if month:
-        try:
-            y, m = month.split('-')
-            y = int(y); m = int(m)
-            m_start = datetime(y, m, 1)
-            m_end = datetime(y, m, monthrange(y, m)[1], 23, 59, 59)
-        except Exception:
-            pass
+    filters = (start_date, end_date, start_time, end_time, bet_type, month, tournaments, bet_category, bet_family)
+    if not any(filters) and is_premium is None and result in (None, "", "all"):
+        # карточка дашборда по умолчанию — кэш до смены данных сезона, прогревается на старте
+        return aggregate_cache.get_or_compute(
+            ("stats", season), data_version(db, season), lambda: _compute_stats(db, season=season)
+        )
+    return _compute_stats(
+        db, start_date, end_date, start_time, end_time, bet_type, is_premium, result,
+        month, season, tournaments, bet_category, bet_family,
+    )
 
-    d_start = datetime.strptime(start_date, "%Y-%m-%d") if start_date else None
-    d_end = (datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1) - timedelta(seconds=1)) if end_date else None
 
-    if m_start or d_start:
-        eff_start = max([d for d in [m_start, d_start] if d], default=None)
-        eff_end   = min([d for d in [m_end, d_end] if d],   default=None)
-        if eff_start and eff_end and eff_start > eff_end:
-            return {
-                "filterConflict": True,
-                "totalBets": 0,
-                "winRate": 0.0,
-                "totalProfit": 0.0,
-                "totalStaked": 0.0,
-                "totalWon": 0.0,
-                "roi": 0.0,
-                "wins": 0,
-                "losses": 0,
-                "currentNominal": 100,
-                "currentBank": 2000,
-                "periods": []
-            }
+def _compute_stats(
+    db: Session,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    bet_type: Optional[str] = None,
+    is_premium: Optional[bool] = None,
+    result: Optional[str] = None,
+    month: Optional[str] = None,
+    season: Optional[str] = None,
+    tournaments: Optional[str] = None,
+    bet_category: Optional[str] = None,
+    bet_family: Optional[str] = None,
+) -> dict:
+    # ---------- 1) пересечение month и date-range ----------
+    eff_start, eff_end, conflict = _stats_window(month, start_date, end_date)
+    if conflict:
+        return _empty_stats(filter_conflict=True)
+
+    calculator = get_profit_calculator()
+    t_list = [t.strip() for t in tournaments.split(',') if t.strip()] if tournaments else []
+    bet_types = _bet_type_filter(db, bet_type, bet_category, bet_family)
+
+    # ---------- 2a) без времени суток — из дневного роллапа ----------
+    if STATS_FROM_ROLLUP and not (start_time or end_time) and isinstance(calculator, VectorizedProfitCalculator):
+        RollupService.ensure_built(db)
+        day_us, n, w, l = RollupService.filtered_counts(
+            db, season, eff_start, eff_end,
+            [t.name for t in bet_types] if bet_types is not None else None,
+            is_premium, result, t_list,
+        )
+        total_bets = int(n.sum())
+        if total_bets == 0:
+            return _empty_stats(filter_conflict=False)
+        season_profit = _season_ladder(db, season, calculator)
+        filtered = calculator.filtered_stats_from_counts(season_profit, day_us, n, w, l, eff_start, eff_end)
+        return _stats_response(total_bets, filtered, season_profit)
 
     # ---------- 2) базовый запрос + фильтры ----------
-    query = db.query(Bet)
+    query = db.query(Bet.date, Bet.won).filter(Bet.is_deleted == False)
 
     if season:
         query = query.filter(Bet.season == season)
@@ -213,8 +385,8 @@ def get_stats(
     if eff_end:
         query = query.filter(Bet.date <= eff_end)
 
-    if bet_type and bet_type != 'all':
-        query = query.filter(Bet.bet_type.contains(bet_type))
+    if bet_types is not None:
+        query = query.filter(Bet.bet_type_id.in_([t.id for t in bet_types]))
 
     if is_premium is not None:
         query = query.filter(Bet.is_premium == is_premium)
@@ -225,142 +397,152 @@ def get_stats(
         elif result.upper() == 'LOSE':
             query = query.filter(Bet.won == False)
 
-    if tournaments:
-        t_list = [t.strip() for t in tournaments.split(',') if t.strip()]
-        if t_list:
-            query = query.filter(Bet.tournament.in_(t_list))
+    if t_list:
+        query = query.filter(Bet.tournament.in_(t_list))
 
     bets = query.all()
 
     # фильтр по времени суток
     if start_time or end_time:
+        st = datetime.strptime(start_time, "%H:%M").time() if start_time else None
+        et = datetime.strptime(end_time, "%H:%M").time() if end_time else None
+
         def within_time(b):
             if not b.date:
                 return False
             bt = b.date.time()
-            if start_time:
-                st = datetime.strptime(start_time, "%H:%M").time()
-                if bt < st:
-                    return False
-            if end_time:
-                et = datetime.strptime(end_time, "%H:%M").time()
-                if bt > et:
-                    return False
+            if st and bt < st:
+                return False
+            if et and bt > et:
+                return False
             return True
         bets = [b for b in bets if within_time(b)]
 
     total_bets = len(bets)
     if total_bets == 0:
-        return {
-            "filterConflict": False,
-            "totalBets": 0,
-            "winRate": 0.0,
-            "totalProfit": 0.0,
-            "totalStaked": 0.0,
-            "totalWon": 0.0,
-            "roi": 0.0,
-            "wins": 0,
-            "losses": 0,
-            "currentNominal": 100,
-            "currentBank": 2000,
-            "periods": []
-        }
+        return _empty_stats(filter_conflict=False)
 
     # ---------- 3) сезонная шкала bank/nominal на всём сезоне ----------
-    season_q = db.query(Bet)
-    if season:
-        season_q = season_q.filter(Bet.season == season)
-    season_bets_all = season_q.order_by(Bet.date.asc()).all()
-
-    season_calc = ProfitCalculator()
-    season_profit = season_calc.calculate_total_profit(season_bets_all)
-    season_periods = season_profit.get("periods", [])
-
-    def period_for_date(dt: datetime | None):
-        if not dt:
-            return None
-        for p in season_periods:
-            ps = datetime.strptime(p["start"], "%Y-%m-%d")
-            pe = datetime.strptime(p["end"], "%Y-%m-%d") + timedelta(hours=23, minutes=59, seconds=59)  # <— КОНЕЦ ДНЯ
-            if ps <= dt <= pe:
-                return p
-        return None
-
-    # ---------- 4) метрики по фильтрам, ставка = сезонный nominal ----------
-    wins = 0
-    losses = 0
-    total_profit_money = 0.0
-    total_staked = 0.0
-    total_won = 0.0
-
-    for b in bets:
-        p = period_for_date(b.date)
-        stake = (p["nominal"] if p else 100)
-        total_staked += stake
-
-        if b.won is True:
-            wins += 1
-            win_amount = stake * 0.85
-            total_profit_money += win_amount
-            total_won += stake + win_amount
-        elif b.won is False:
-            losses += 1
-            total_profit_money -= stake
+    season_profit = _season_ladder(db, season, calculator)
+
+    # ---------- 4-5) метрики по фильтрам и таблица периодов ----------
+    filtered = calculator.calculate_filtered_stats(season_profit, bets, eff_start, eff_end)
+    return _stats_response(total_bets, filtered, season_profit)
 
-    win_rate = (wins / total_bets * 100) if total_bets > 0 else 0.0
-    roi = (total_profit_money / total_staked * 100) if total_staked > 0 else 0.0
 
-    # ---------- 5) таблица периодов для UI ----------
-    now = datetime.now()
-    periods = []
-    for p in season_periods:
-        ps = datetime.strptime(p["start"], "%Y-%m-%d")
-        pe = datetime.strptime(p["end"], "%Y-%m-%d") + timedelta(hours=23, minutes=59, seconds=59)  # <— КОНЕЦ ДНЯ
-        if pe > now:
-            break  # будущее не показываем
-
-        # пересечение с eff_start/eff_end
-        if eff_start and pe < eff_start:
+@app.post("/api/stats/batch")
+def get_stats_batch(payload: StatsBatchRequest, db: Session = Depends(get_db)):
+    """
+    Несколько наборов фильтров за один запрос: сезон грузится и ладдер считается
+    один раз, каждый фильтр — одна маска по массивам сезона. Порядок как в запросе.
+    """
+    frames = {}
+    type_ids = {}  # (bet_type, category, family) → id справочника — тот же подбор, что в /api/stats
+    results = []
+    for f in payload.filters:
+        eff_start, eff_end, conflict = _stats_window(f.month, f.start_date, f.end_date)
+        if conflict:
+            results.append(_empty_stats(filter_conflict=True))
             continue
-        if eff_end and ps > eff_end:
+
+        type_key = (f.bet_type, f.bet_category, f.bet_family)
+        if type_key not in type_ids:
+            bet_types = _bet_type_filter(db, *type_key)
+            type_ids[type_key] = None if bet_types is None else [t.id for t in bet_types]
+
+        season = f.season or payload.season
+        frame = frames.get(season)
+        if frame is None:
+            frame = frames[season] = SeasonFrame.load(db, season)
+
+        keep = frame.mask(
+            eff_start=eff_start,
+            eff_end=eff_end,
+            start_time=f.start_time,
+            end_time=f.end_time,
+            bet_type_ids=type_ids[type_key],
+            is_premium=f.is_premium,
+            result=f.result,
+            tournaments=f.tournament_list(),
+        )
+        total_bets = int(keep.sum())
+        if total_bets == 0:
+            results.append(_empty_stats(filter_conflict=False))
             continue
 
-        bets_in_period = [b for b in bets if b.date and ps <= b.date <= pe]
-        stake_per = p["nominal"]
-
-        wins_p = sum(1 for b in bets_in_period if b.won is True)
-        losses_p = sum(1 for b in bets_in_period if b.won is False)
-        profit_p = wins_p * stake_per * 0.85 - losses_p * stake_per
-        staked_p = len(bets_in_period) * stake_per
-
-        periods.append({
-            "start": p["start"],
-            "end": p["end"],
-            "month": p["month"],
-            "bets": len(bets_in_period),
-            "wins": wins_p,
-            "losses": losses_p,
-            "profit": round(profit_p, 2),
-            "staked": round(staked_p, 2),
-            "nominal": p["nominal"],  # из сезонной шкалы
-            "bank": p["bank"],        # из сезонной шкалы
-            "win_rate": round((wins_p / len(bets_in_period) * 100), 1) if bets_in_period else 0
-        })
+        filtered = frame.filtered_stats(keep, eff_start, eff_end)
+        results.append(_stats_response(total_bets, filtered, frame.season_profit()))
 
-    return {
-        "filterConflict": False,
-        "totalBets": total_bets,
-        "winRate": round(win_rate, 1),
-        "totalProfit": round(total_profit_money, 2),
-        "totalStaked": round(total_staked, 2),
-        "totalWon": round(total_won, 2),
-        "roi": round(roi, 1),
-        "wins": int(wins),
-        "losses": int(losses),
-        "currentNominal": season_profit.get("current_nominal", 100),
-        "currentBank": season_profit.get("current_bank", 2000),
-        "periods": periods
-    }
+    return {"results": results}
+
+
+@app.get("/api/stats/breakdown")
+def get_stats_breakdown(
+    by: str = Query("tournament", pattern="^(" + "|".join(BREAKDOWN_FIELDS) + ")$"),
+    season: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Ставок, побед, win rate, профит и ROI по турнирам / типам ставок / премиуму /
+    дню недели / часу. Один GROUP BY по ставкам, соединённым с периодами сезонной
+    шкалы; результат кэшируется до изменения данных сезона.
+    """
+    season = season or None
+
+    def compute():
+        calculator = get_profit_calculator()
+        season_profit = _season_ladder(db, season, calculator)
+        return BreakdownService(calculator).breakdown(db, season, by, season_profit)
+
+    return aggregate_cache.get_or_compute(("breakdown", season, by), data_version(db, season), compute)
+
+
+@app.get("/api/stats/teams")
+def get_stats_teams(
+    season: Optional[str] = None,
+    tournament: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Ставок, win rate, профит и ROI по командам (ставка на матч учитывается за обе
+    команды). Профит — по nominal периодов сезонной шкалы, кэш до изменения данных.
+    """
+    season = season or None
+    tournament = tournament or None
+
+    def compute():
+        calculator = get_profit_calculator()
+        season_profit = _season_ladder(db, season, calculator)
+        return BreakdownService(calculator).teams(db, season, season_profit, tournament)
+
+    return aggregate_cache.get_or_compute(("teams", season, tournament), data_version(db, season), compute)
+
+
+@app.get("/api/stats/margins")
+def get_stats_margins(
+    season: Optional[str] = None,
+    tournament: Optional[str] = None,
+    bet_category: Optional[str] = None,  # 'over' | 'under'
+    width: float = Query(5.0, gt=0, le=100),
+    line_width: float = Query(5.0, gt=0, le=100),
+    db: Session = Depends(get_db),
+):
+    """
+    Тоталы матча: гистограмма margin (очки - линия) и доля «выше линии» /
+    win rate по корзинам линии. Считается в SQL, кэш до изменения данных сезона.
+    """
+    season = season or None
+    tournament = tournament or None
+    try:
+        category = parse_code(bet_category, CATEGORY_CODES, "bet_category")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    key = ("margins", season, tournament, category, width, line_width)
+    return aggregate_cache.get_or_compute(
+        key, data_version(db, season),
+        lambda: margin_stats(db, season, tournament, category, width, line_width),
+    )
 
 
 @app.get("/api/periods")
@@ -375,6 +557,8 @@ def get_periods(
     month: Optional[str] = None,
     season: Optional[str] = None,
     tournaments: Optional[str] = Query(None),
+    bet_category: Optional[str] = None,
+    bet_family: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """Только периоды (nominal/bank), с теми же фильтрами, без будущих месяцев."""
@@ -389,6 +573,8 @@ def get_periods(
         month=month,
         season=season,
         tournaments=tournaments,
+        bet_category=bet_category,
+        bet_family=bet_family,
         db=db
     )
     # если фильтры в конфликте — отдадим пустой массив
@@ -406,7 +592,7 @@ def get_periods_breakdown(
     db: Session = Depends(get_db)
 ):
     """Разбивка по периодам"""
-    query = db.query(Bet)
+    query = db.query(Bet.date, Bet.won).filter(Bet.is_deleted == False)
     if start_date:
         query = query.filter(Bet.date >= start_date)
     if end_date:
@@ -414,7 +600,7 @@ def get_periods_breakdown(
         query = query.filter(Bet.date < end_dt)
 
     bets = query.all()
-    calculator = ProfitCalculator()
+    calculator = get_profit_calculator()
     profit_data = calculator.calculate_total_profit(bets)
 
     return {
@@ -431,15 +617,35 @@ def get_periods_breakdown(
     }
 
 
+# ===== equity curve =====
+@app.get("/api/equity")
+def get_equity(
+    season: Optional[str] = None,
+    points: int = Query(500, ge=10, le=5000),
+    method: str = Query("lttb", pattern="^(lttb|minmax)$"),
+    db: Session = Depends(get_db),
+):
+    """Кривая профита/банка по сезонной шкале, прореженная до points точек."""
+    frame = SeasonFrame.load(db, season)
+    return equity_curve(frame, points=points, method=method)
+
+
 # ===== season data =====
 @app.get("/api/season-data")
 def get_season_data(season: str = "2024-2025", db: Session = Depends(get_db)):
     """Данные для выбранного сезона"""
+    scope = season if season and season != "2024-2025" else None
+    return aggregate_cache.get_or_compute(
+        ("season-data", scope), data_version(db, scope), lambda: _season_data(db, season)
+    )
+
+
+def _season_data(db: Session, season: str) -> dict:
     try:
         if season and season != "2024-2025":
-            bets = db.query(Bet).filter(Bet.season == season).all()
+            bets = db.query(Bet).filter(Bet.season == season, Bet.is_deleted == False).all()
         else:
-            bets = db.query(Bet).all()
+            bets = db.query(Bet).filter(Bet.is_deleted == False).all()
 
         tournaments = list(set([bet.tournament for bet in bets if bet.tournament]))
         tournaments.sort()
@@ -472,10 +678,78 @@ def get_season_data(season: str = "2024-2025", db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ===== warm-up =====
+def _warmup_prepare() -> List[str]:
+    """Роллап (если БД новая) и список сезонов с данными."""
+    db = SessionLocal()
+    try:
+        RollupService.ensure_built(db)
+        return [s for (s,) in db.query(Bet.season).filter(Bet.is_deleted == False).distinct() if s]
+    finally:
+        db.close()
+
+
+def _warm_season(season: str) -> None:
+    """Всё, что дашборд просит первым: статистика без фильтров (с шкалой) и season-data."""
+    db = SessionLocal()
+    try:
+        get_stats(season=season, tournaments=None, db=db)
+        get_season_data(season=season, db=db)
+    finally:
+        db.close()
+
+
+# ===== simulation =====
+@app.post("/api/simulate")
+def simulate(payload: SimulateRequest, db: Session = Depends(get_db)):
+    """
+    Прогон шкалы bank/nominal на реальной истории сезона с заданными правилами.
+    С grid — перебор сетки параметров (в пуле процессов), без него — один прогон.
+    """
+    frame = SeasonFrame.load(db, payload.season)
+    simulator = BankrollSimulator.from_frame(frame)
+    try:
+        base = {k: cast_param(k, v) for k, v in payload.params.model_dump(exclude_none=True).items()}
+        if payload.grid:
+            results = simulator.sweep(
+                payload.grid, base=base, workers=payload.workers,
+                top=payload.top, sort_by=payload.sort_by,
+            )
+            return {"bets": len(frame), "results": results}
+
+        result = simulator.run(base)
+        return {
+            "bets": len(frame),
+            "params": VectorizedProfitCalculator(**base).params(),
+            "summary": summarize(base, result),
+            "result": result,
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/api/simulate/monte-carlo")
+def simulate_monte_carlo(payload: MonteCarloRequest, db: Session = Depends(get_db)):
+    """
+    Бутстрэп исходов сезона блоками по дням: распределение финального банка,
+    максимальной просадки и вероятность упереться в минимальный номинал.
+    """
+    frame = SeasonFrame.load(db, payload.season)
+    simulator = MonteCarloSimulator.from_frame(frame)
+    if simulator is None:
+        raise HTTPException(status_code=404, detail="No dated bets for season")
+    try:
+        params = {k: cast_param(k, v) for k, v in payload.params.model_dump(exclude_none=True).items()}
+        return run_monte_carlo(simulator, runs=payload.runs, seed=payload.seed, params=params, workers=payload.workers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # ===== sync =====
 @app.post("/api/sync")
 async def sync_data(
     season: str | None = Query(None),
+    retry_failed: bool = Query(False),  # только строки из sync_failures, без полной выборки
     x_admin_token: str | None = Header(default=None, alias="X-ADMIN-TOKEN"),
     db: Session = Depends(get_db),
 ):
@@ -487,7 +761,7 @@ async def sync_data(
     syncer = NotionSync(season=(season or DEFAULT_SEASON))
 
     # тяжёлая работа в пуле потоков
-    result = await run_in_threadpool(syncer.sync_with_notion, db)
+    result = await run_in_threadpool(syncer.retry_failed if retry_failed else syncer.sync_with_notion, db)
 
     if not result.get("success"):
         raise HTTPException(status_code=500, detail=result.get("message", "Sync failed"))
@@ -495,44 +769,132 @@ async def sync_data(
     return result
 
 
+@app.get("/api/sync/status")
+def sync_status(db: Session = Depends(get_db)):
+    """Планировщик синка: последние запуски по сезонам (из sync_state — одинаково в любом воркере)."""
+    if scheduler is None:
+        return {"enabled": False, "leader": False, "schedule": {}, "seasons": sync_states(db)}
+    return scheduler.status(db)
+
+
+# ===== webhook Notion =====
+@app.post("/api/notion/webhook")
+async def notion_webhook(
+    request: Request,
+    x_notion_signature: str | None = Header(default=None, alias="X-Notion-Signature"),
+):
+    """События подписки Notion: id изменённых страниц → очередь точечного синка."""
+    body = await request.body()
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
+
+    # подтверждение подписки: токен один раз приходит без подписи. Это секрет
+    # подписи вебхуков — в лог только начало, сам токен виден в UI Notion
+    if "verification_token" in payload and "type" not in payload:
+        token = str(payload["verification_token"])
+        logging.getLogger("uvicorn").warning(
+            f"Notion webhook verification request received (token {token[:6]}…): copy the token from "
+            f"the subscription page in Notion, confirm it there and put it into NOTION_WEBHOOK_SECRET"
+        )
+        return {"ok": True}
+
+    if not WEBHOOK_SECRET:
+        raise HTTPException(status_code=503, detail="NOTION_WEBHOOK_SECRET is not configured")
+    if not verify_signature(body, x_notion_signature):
+        raise HTTPException(status_code=401, detail="Invalid signature")
+
+    queued = webhook_queue.enqueue(payload)
+    return {"queued": queued, "pending": webhook_queue.pending()}
+
+
+@app.get("/api/notion/webhook/status")
+def notion_webhook_status():
+    return {"pending": webhook_queue.pending(), **webhook_queue.stats}
+
+
 # ===== прочие утилиты =====
 @app.get("/api/test-db")
 def test_database(db: Session = Depends(get_db)):
     """Тест соединения с БД"""
     try:
-        count = db.query(Bet).count()
+        count = db.query(Bet).filter(Bet.is_deleted == False).count()
         return {"status": "connected", "bets_count": count}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
+def _screenshots(request: Request) -> ScreenshotResolver:
+    """Резолвер из lifespan; без lifespan (тестовый клиент без with) — создаём лениво."""
+    resolver = getattr(request.app.state, "screenshots", None)
+    if resolver is None:
+        resolver = request.app.state.screenshots = ScreenshotResolver()
+    return resolver
+
+
 @app.get("/api/screenshot")
-async def get_screenshot_proxy(url: str):
-    """Прокси для получения скриншотов с prnt.sc"""
-    import httpx
-    from bs4 import BeautifulSoup
+async def get_screenshot_proxy(url: str, request: Request, image: bool = False):
+    """Прокси для получения скриншотов с prnt.sc.
+
+    image=true — сами байты картинки из дискового кэша (нужен
+    SCREENSHOT_IMAGE_CACHE_DIR), с ETag/Cache-Control и Range.
+    """
+    resolver = _screenshots(request)
+    if not image:
+        return {"image_url": await resolver.resolve(url)}
+    if image_cache is None:
+        raise HTTPException(status_code=404, detail="Кэш картинок выключен (SCREENSHOT_IMAGE_CACHE_DIR)")
+    if not is_allowed_source(url):
+        raise HTTPException(status_code=400, detail="Картинки отдаются только для ссылок prnt.sc и известных хостов")
+
+    entry = image_cache.get(url)
+    if entry is not None:
+        image_cache.stats["hits"] += 1
+    else:
+        image_url = await resolver.resolve(url)
+        if not image_url:
+            raise HTTPException(status_code=502, detail="Не удалось получить скриншот")
+        if not is_allowed_source(image_url):
+            raise HTTPException(status_code=502, detail="Картинка скриншота на неизвестном хосте")
+        await resolver.start()
+        entry = await image_cache.get_or_fetch(url, image_url, resolver.client)
+        if entry is None:
+            raise HTTPException(status_code=502, detail="Не удалось скачать картинку")
+
+    headers = {"ETag": entry.etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(entry.path, media_type=entry.content_type, headers=headers)
+
+
+SCREENSHOT_BATCH_MAX = 500
+
+
+@app.post("/api/screenshot/batch")
+async def resolve_screenshot_batch(payload: ScreenshotBatchRequest, request: Request, db: Session = Depends(get_db)):
+    """Прямые ссылки для скринов, которые синк ещё не разобрал; найденное сохраняется в bets."""
+    if len(payload.urls) > SCREENSHOT_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"Не больше {SCREENSHOT_BATCH_MAX} ссылок за запрос")
+    images = await resolve_many(payload.urls, _screenshots(request))
+
+    def save():
+        rows = store_images(db, images)
+        db.commit()
+        return rows
+
+    return {"images": images, "stored": await run_in_threadpool(save)}
+
+
+@app.get("/api/screenshot/stats")
+async def get_screenshot_stats(request: Request):
+    resolver = _screenshots(request)
+    return {
+        "cached": len(resolver.cache),
+        **resolver.stats,
+        "image_cache": image_cache.info() if image_cache is not None else None,
+    }
 
-    try:
-        if url.endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp')):
-            return {"image_url": url}
-
-        if 'prnt.sc' in url:
-            async with httpx.AsyncClient() as client:
-                headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-                response = await client.get(url, headers=headers, follow_redirects=True)
-                soup = BeautifulSoup(response.text, 'html.parser')
-
-                img_tag = soup.find('img', {'id': 'screenshot-image'}) or soup.find('img', class_='no-click screenshot-image')
-                if img_tag and img_tag.get('src'):
-                    img_url = img_tag['src']
-                    if not img_url.startswith('http'):
-                        img_url = 'https:' + img_url
-                    return {"image_url": img_url}
-
-        return {"image_url": url}
-    except Exception as e:
-        print(f"Error fetching screenshot: {e}")
-        return {"image_url": None}
 
 @app.get("/api/debug/result-breakdown")
 def debug_result_breakdown(
@@ -545,6 +907,7 @@ def debug_result_breakdown(
         func.sum(case((Bet.won == False, 1), else_=0)).label("losses"),
         func.sum(case((Bet.won == None, 1), else_=0)).label("unknown"),
         func.sum(case((Bet.notion_id == None, 1), else_=0)).label("no_notion_id"),
+        func.sum(case((Bet.is_deleted == True, 1), else_=0)).label("deleted"),
     )
 
     # фильтр по сезону (август-главная логика; при необходимости подстроим)
@@ -570,8 +933,58 @@ def debug_result_breakdown(
         "losses": int(row.losses or 0),
         "unknown": int(row.unknown or 0),
         "no_notion_id": int(row.no_notion_id or 0),
+        "deleted": int(row.deleted or 0),  # мягко удалённые (страницы пропали из Notion)
         "dupe_notion_ids_sample": [{"notion_id": d[0], "count": int(d[1])} for d in dupes],
     }
+
+@app.get("/api/debug/rollup-check")
+def debug_rollup_check(season: Optional[str] = Query(None), db: Session = Depends(get_db)):
+    """Сверка bet_daily_rollup с bets (только чтение; починка — POST /api/debug/rollup-rebuild)."""
+    return RollupService.check(db, season)
+
+
+@app.post("/api/debug/rollup-rebuild")
+def debug_rollup_rebuild(
+    season: Optional[str] = Query(None),
+    x_admin_token: str | None = Header(default=None, alias="X-ADMIN-TOKEN"),
+    db: Session = Depends(get_db),
+):
+    """Сверка роллапа и, если он расходится с bets, пересборка (с токеном)."""
+    if not ADMIN_TOKEN or x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    report = RollupService.check(db, season)
+    if not report["consistent"]:
+        report["rebuilt_rows"] = RollupService.rebuild(db, season)
+    return report
+
+
+@app.get("/api/debug/sync-failures")
+def debug_sync_failures(
+    season: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    """Страницы, которые синк не смог записать (повтор — POST /api/sync?retry_failed=true)."""
+    q = db.query(SyncFailure)
+    if season:
+        q = q.filter(SyncFailure.season == season)
+    total = q.count()
+    rows = q.order_by(SyncFailure.failed_at.desc()).limit(limit).all()
+    return {
+        "total": total,
+        "failures": [
+            {
+                "notion_id": f.notion_id,
+                "season": f.season,
+                "error": f.error,
+                "attempts": f.attempts,
+                "failed_at": f.failed_at.isoformat() if f.failed_at else None,
+            }
+            for f in rows
+        ],
+    }
+
+
 # ===== локальный запуск =====
 if __name__ == "__main__":
     import uvicorn
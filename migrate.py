@@ -0,0 +1,24 @@
+# migrate.py
+"""Схема БД: таблицы, недостающие колонки и индексы, заполнение производных полей.
+
+  python migrate.py
+
+Отдельный шаг перед стартом сервера (см. Procfile): импорт main в базу не
+ходит. Повторный запуск безопасен — init_db только добавляет.
+"""
+import argparse
+
+from app.database.database import get_engine
+from app.database.init_db import init_db
+
+
+def main():
+    argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter).parse_args()
+    report = init_db(get_engine())
+    print(f"Добавлены колонки: {', '.join(report['added_columns']) or 'нет'}")
+    for name, count in report["backfilled"].items():
+        print(f"  {name}: {count}")
+
+
+if __name__ == "__main__":
+    main()
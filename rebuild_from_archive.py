@@ -0,0 +1,103 @@
+# rebuild_from_archive.py
+"""Пересборка таблицы bets из локального архива страниц Notion — без сети.
+
+  python rebuild_from_archive.py [--season 2024] [--workers 4] [--archive notion_archive.sqlite3] [--truncate]
+
+Берётся последняя версия каждой страницы, разбор идёт параллельно
+в процессах, загрузка — тем же шагом, что и синк (update по notion_id,
+новые строки одним INSERT, затем дневной роллап).
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from app.database.database import SessionLocal, engine
+from app.database.init_db import init_db
+from app.models.bet import Bet
+from app.services.notion_archive import ARCHIVE_PATH, NotionArchive, decode_page
+from app.services.notion_parser import ParsedRow, compile_row_parser, types_from_page
+from app.services.notion_sync import apply_parsed_rows
+from app.services.rollup_service import RollupService
+
+CHUNK = 2000
+
+
+def _parse_chunk(bodies: List[bytes]) -> Tuple[List[ParsedRow], int]:
+    """Распаковка и разбор пачки страниц (в процессе-воркере)."""
+    pages = [decode_page(b) for b in bodies]
+    if not pages:
+        return [], 0
+    # в архиве страницы уже спроецированы — схему берём с самой страницы
+    parse = compile_row_parser(types_from_page(pages[0]))
+    rows, errors = [], 0
+    for page in pages:
+        try:
+            rows.append(parse(page))
+        except Exception as e:
+            print(f"[rebuild] Error processing row {page.get('id')}: {e}")
+            errors += 1
+    return rows, errors
+
+
+def rebuild(season: Optional[str], archive_path: str, workers: int, truncate: bool) -> None:
+    archive = NotionArchive(archive_path)
+    seasons = [season] if season else archive.seasons()
+    init_db(engine)
+
+    db = SessionLocal()
+    try:
+        for s in seasons:
+            started = time.perf_counter()
+            bodies = [body for _, _, body in archive.latest(s)]
+            chunks = [bodies[k:k + CHUNK] for k in range(0, len(bodies), CHUNK)]
+
+            parsed: List[ParsedRow] = []
+            errors = 0
+            if workers > 1 and len(chunks) > 1:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    for rows, errs in pool.map(_parse_chunk, chunks):
+                        parsed.extend(rows)
+                        errors += errs
+            else:
+                for chunk in chunks:
+                    rows, errs = _parse_chunk(chunk)
+                    parsed.extend(rows)
+                    errors += errs
+
+            if truncate:
+                db.query(Bet).filter(Bet.season == s).delete(synchronize_session=False)
+
+            # архив не знает об удалениях — мягко удалённые строки не воскрешаем
+            stats = apply_parsed_rows(db, s, parsed, restore_deleted=False)
+            db.commit()
+            if truncate:
+                RollupService.rebuild(db, s)
+
+            print(f"[rebuild] Season {s}: pages={len(bodies)} created={stats['created']} "
+                  f"updated={stats['updated']} errors={errors} "
+                  f"in {time.perf_counter() - started:.2f}s")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+        archive.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--season", default=None, help="по умолчанию — все сезоны из архива")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--archive", default=ARCHIVE_PATH or "notion_archive.sqlite3")
+    parser.add_argument("--truncate", action="store_true", help="сначала удалить ставки сезона из bets")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.archive):
+        parser.error(f"архив не найден: {args.archive}")
+    rebuild(args.season, args.archive, args.workers, args.truncate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# replay_webhook_events.py
+"""Отправитель-заглушка вебхуков Notion: переигрывает записанные события.
+
+  python replay_webhook_events.py events.jsonl [--url http://localhost:8080/api/notion/webhook] [--speed 0]
+  python replay_webhook_events.py --page <page_id> [--page <page_id> ...] [--type page.properties_updated]
+
+events.jsonl — по событию Notion на строку (как пришли в вебхук). Каждое
+тело подписывается NOTION_WEBHOOK_SECRET (или --secret) так же, как это
+делает Notion. --speed 1 — паузы между событиями как в записи (по
+timestamp), 0 — без пауз.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+
+def sign(body: bytes, secret: str) -> str:
+    """Подпись как у Notion: "sha256=" + HMAC-SHA256(тело, verification_token)."""
+    return "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _synthetic(page_ids, event_type, database_id):
+    now = datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+    events = []
+    for page_id in page_ids:
+        event = {
+            "id": str(uuid.uuid4()),
+            "timestamp": now,
+            "type": event_type,
+            "entity": {"id": page_id, "type": "page"},
+            "data": {},
+        }
+        if database_id:
+            event["data"]["parent"] = {"id": database_id, "type": "database"}
+        events.append(event)
+    return events
+
+
+def _ts(event):
+    try:
+        return datetime.fromisoformat(event["timestamp"].replace("Z", "+00:00")).timestamp()
+    except (KeyError, ValueError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("events", nargs="?", help="JSONL с записанными событиями")
+    parser.add_argument("--url", default="http://localhost:8080/api/notion/webhook")
+    parser.add_argument("--secret", default=os.getenv("NOTION_WEBHOOK_SECRET"))
+    parser.add_argument("--speed", type=float, default=0.0, help="множитель пауз из записи; 0 — без пауз")
+    parser.add_argument("--max-pause", type=float, default=10.0, help="потолок одной паузы, сек")
+    parser.add_argument("--page", action="append", default=[], help="id страницы для синтетического события")
+    parser.add_argument("--type", default="page.properties_updated")
+    parser.add_argument("--database", default=None, help="id базы-родителя для синтетических событий")
+    args = parser.parse_args()
+
+    if not args.secret:
+        parser.error("нужен --secret или NOTION_WEBHOOK_SECRET")
+    events = _load(args.events) if args.events else []
+    events += _synthetic(args.page, args.type, args.database)
+    if not events:
+        parser.error("нет событий: укажите файл или --page")
+
+    failed = 0
+    prev = None
+    with httpx.Client(timeout=10) as client:
+        for event in events:
+            ts = _ts(event)
+            if args.speed > 0 and prev is not None and ts is not None:
+                time.sleep(min(args.max_pause, max(0.0, (ts - prev) * args.speed)))
+            prev = ts if ts is not None else prev
+
+            body = json.dumps(event, ensure_ascii=False).encode("utf-8")
+            response = client.post(args.url, content=body, headers={
+                "Content-Type": "application/json",
+                "X-Notion-Signature": sign(body, args.secret),
+            })
+            if response.status_code >= 400:
+                failed += 1
+            print(f"{event.get('type')} {event.get('entity', {}).get('id')} → {response.status_code} {response.text}")
+
+    print(f"Отправлено: {len(events)}, ошибок: {failed}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
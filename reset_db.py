@@ -1,6 +1,10 @@
 from app.database.database import Base, engine
 from app.models.user import User
 from app.models.bet import Bet
+from app.models.rollup import BetDailyRollup
+from app.models.bet_type import BetType
+from app.models.sync_failure import SyncFailure
+from app.models.sync_state import SyncState
 
 print("Dropping all tables...")
 Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,76 @@
+# simulate.py
+"""Прогон шкалы bank/nominal с заданными правилами на истории сезона.
+
+Примеры:
+  python simulate.py --season 2024 --param nominal_pct=0.07
+  python simulate.py --season 2024 --grid nominal_pct=0.03,0.05,0.07 \\
+      --grid reinvest_share=0.25,0.333,0.5 --grid max_nominal=500,1000,2000 --workers 4 --top 10
+"""
+import argparse
+import json
+
+from app.database.database import SessionLocal
+from app.services.bankroll_simulator import BankrollSimulator, cast_param, summarize
+from app.services.profit_calculator import LADDER_DEFAULTS
+from app.services.season_frame import SeasonFrame
+
+
+def _parse_value(raw: str):
+    if raw.lower() in ("true", "false"):
+        return raw.lower() == "true"
+    return float(raw)
+
+
+def _parse_pairs(items, multi: bool):
+    out = {}
+    for item in items or []:
+        key, _, raw = item.partition("=")
+        key = key.strip()
+        if key not in LADDER_DEFAULTS:
+            raise SystemExit(f"Неизвестный параметр '{key}'. Доступны: {', '.join(LADDER_DEFAULTS)}")
+        if multi:
+            out[key] = [_parse_value(v) for v in raw.split(",") if v.strip()]
+        else:
+            out[key] = cast_param(key, _parse_value(raw))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--season", default=None)
+    parser.add_argument("--param", action="append", help="key=value — базовый параметр шкалы")
+    parser.add_argument("--grid", action="append", help="key=v1,v2,... — значения для перебора")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--sort-by", default="total_profit")
+    parser.add_argument("--json", action="store_true", help="вывести результат в JSON")
+    args = parser.parse_args()
+
+    base = _parse_pairs(args.param, multi=False)
+    grid = _parse_pairs(args.grid, multi=True)
+
+    db = SessionLocal()
+    try:
+        frame = SeasonFrame.load(db, args.season)
+    finally:
+        db.close()
+    simulator = BankrollSimulator.from_frame(frame)
+
+    if grid:
+        results = simulator.sweep(grid, base=base, workers=args.workers, top=args.top, sort_by=args.sort_by)
+    else:
+        results = [summarize(base, simulator.run(base))]
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    print(f"Ставок в сезоне: {len(frame)}")
+    for r in results:
+        params = ", ".join(f"{k}={v}" for k, v in r["params"].items()) or "по умолчанию"
+        print(f"profit={r['total_profit']:>10.2f}  roi={r['roi']:>6.2f}%  bank={r['final_bank']:>9.2f}  "
+              f"nominal={r['final_nominal']:>6}  dd={r['max_drawdown']:>9.2f}  | {params}")
+
+
+if __name__ == "__main__":
+    main()